@@ -0,0 +1,17 @@
+# gunicorn settings (see Procfile)
+import os
+
+# Import the app, apply migrations and load configs / prompts / the plan catalog once in the master.
+# Workers are forked from it and share that memory copy-on-write instead of each repeating the work.
+# SQLite connections are per request and the write queue starts lazily per pid, so neither crosses
+# the fork.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes', 'on')
+
+# Threaded workers: the LLM-bound routes (/submit, /proposed_plans, /client_details,
+# /ai/get-justification) spend nearly all their time waiting on Gemini, during which the GIL is
+# released, so one process serves dozens of them at once. CPU-bound scoring is bounded separately
+# by ANALYSIS_CPU_SLOTS. Per-request state (SQLite connections, traces) lives on the app context.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '32'))
+# Long Gemini calls must not be mistaken for a hung worker
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
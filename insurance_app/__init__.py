@@ -1,7 +1,8 @@
 import os
 import logging
 import base64
-from flask import Flask, send_from_directory, render_template, Response, request, redirect, url_for, abort
+import zlib
+from flask import Flask, send_from_directory, render_template, Response, request, redirect, url_for, abort, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -16,6 +17,8 @@ logging.info(">>> DEBUG: GEMINI_API_KEY loaded: %s", masked)
 
 def create_app():
     """Create and configure an instance of the Flask application."""
+    from .resources import StartupTimings
+    timings = StartupTimings()
     app = Flask(__name__, instance_relative_config=True)
     CORS(app)
 
@@ -26,7 +29,8 @@ def create_app():
         pass
 
     # Load configurations from config.py
-    app.config.from_pyfile(os.path.join(os.path.dirname(app.root_path), 'insurance_app', 'config.py'))
+    with timings.phase('config'):
+        app.config.from_pyfile(os.path.join(os.path.dirname(app.root_path), 'insurance_app', 'config.py'))
 
     # Configure database paths to point to the instance folder
     app.config['DATABASE_PATH'] = os.path.join(app.instance_path, 'insurance_form.db')
@@ -34,32 +38,78 @@ def create_app():
     app.config['USER_DB_PATH'] = os.path.join(app.instance_path, 'users.db')
     # New: append-only audit DB for Final_* changes
     app.config['APPLICATION_STATUS_DB_PATH'] = os.path.join(app.instance_path, 'Application_Status.db')
+    # Compressed, indexed store for per-client justification reports
+    app.config['JUSTIFICATION_DB_PATH'] = os.path.join(app.instance_path, 'justification_reports.db')
+    # On-demand analysis traces (enabled per request via X-Analysis-Trace header or ?trace=1)
+    app.config['ANALYSIS_TRACE_DIR'] = os.path.join(app.instance_path, 'analysis_traces')
+    # Content-addressed policy document files (metadata lives in insurance_form.db)
+    app.config['POLICY_BLOB_DIR'] = os.path.join(app.instance_path, 'policy_blobs')
+    # Precompressed variants of fingerprinted static assets (see assets.py)
+    app.config['ASSET_CACHE_DIR'] = os.path.join(app.instance_path, 'asset_cache')
+    # Lock files backing the cross-worker model call slots (see llm_limiter.py)
+    app.config['LLM_SLOT_DIR'] = os.path.join(app.instance_path, 'llm_slots')
 
     # --- Logging for app ---
     app.logger.setLevel(logging.INFO)
 
     # --- Database Initialization ---
     from . import database
-    with app.app_context():
-        database.init_db()
+    database.init_app(app)
+    with timings.phase('database'), app.app_context():
+        # Application_Status.db first: insurance_form.db connections attach it for the audit trigger
         database.init_application_status_db()
+        database.init_db()
+        database.init_justification_db()
+        database.init_user_db()
+        database.init_derived_db()
+        database.set_journal_mode(app)
         app.logger.info("Database initialized.")
 
     # --- Register Blueprints ---
-    from .blueprints import auth, submission, analysis, dashboard, actions, superadmin, approvals, ai_assistant
-    app.register_blueprint(auth.auth_bp)
-    app.register_blueprint(submission.submission_bp)
-    app.register_blueprint(analysis.analysis_bp)
-    app.register_blueprint(dashboard.dashboard_bp)
-    app.register_blueprint(actions.actions_bp)
-    app.register_blueprint(superadmin.superadmin_bp)
-    app.register_blueprint(approvals.approvals_bp)
-    app.register_blueprint(ai_assistant.ai_assistant_bp)
-    app.logger.info("All blueprints registered.")
+    with timings.phase('blueprints'):
+        from .blueprints import auth, submission, analysis, dashboard, actions, superadmin, approvals, ai_assistant, batch
+        app.register_blueprint(auth.auth_bp)
+        app.register_blueprint(submission.submission_bp)
+        app.register_blueprint(analysis.analysis_bp)
+        app.register_blueprint(dashboard.dashboard_bp)
+        app.register_blueprint(actions.actions_bp)
+        app.register_blueprint(superadmin.superadmin_bp)
+        app.register_blueprint(approvals.approvals_bp)
+        app.register_blueprint(ai_assistant.ai_assistant_bp)
+        app.register_blueprint(batch.batch_bp)
+        app.logger.info("All blueprints registered.")
+
+    # Fingerprinted, precompressed static assets and the asset_url() template helper
+    from . import assets
+    with timings.phase('assets'):
+        assets.init_app(app)
+
+    # Templates that need no request context are rendered once and served from memory
+    from . import page_cache
+    with timings.phase('page_cache'):
+        page_cache.init_app(app)
+
+    # Configs, prompts and the plan catalog (once in the gunicorn master with preload_app)
+    if app.config.get('PRELOAD_RESOURCES'):
+        from . import resources
+        with timings.phase('preload'):
+            loaded = resources.warm(app)
+        app.logger.info(f"Preloaded: {', '.join(loaded) or 'nothing'}")
+
+    # Model calls refused by admission control become 429 / 503 with Retry-After
+    from .llm_limiter import LLMOverloaded, overloaded_response
+    app.register_error_handler(LLMOverloaded, overloaded_response)
+
+    # Persist analysis traces for requests that opted in
+    from .analysis.trace import persist_trace
+    app.after_request(persist_trace)
 
     # --- Static File and Root Routes ---
     @app.route('/')
     def login_page():
+        cached = page_cache.serve('Main_login.html')
+        if cached is not None:
+            return cached
         return render_template('Main_login.html')
 
     @app.route('/html/<path:filename>')
@@ -69,8 +119,11 @@ def create_app():
             uid = request.args.get('unique_id')
             if uid:
                 # Use the analysis blueprint route which prepares all required context
-                return redirect(url_for('analysis_bp.get_proposed_plans', unique_id=uid), code=302)
+                return redirect(url_for('analysis_bp.get_proposed_plans', unique_id=uid, user=request.args.get('user')), code=302)
             # No UID provided; fall through to render with safe defaults in template
+        cached = page_cache.serve(filename)
+        if cached is not None:
+            return cached
         # Render templates so Jinja (e.g., url_for) is processed
         return render_template(filename)
 
@@ -82,12 +135,32 @@ def create_app():
     def serve_css(filename):
         return send_from_directory(os.path.join(app.static_folder, 'css'), filename)
 
-    # Serve justification reports stored outside static: ../justification_reports/<client_id>.json
+    # Serve justification reports from the compressed store (legacy ../justification_reports/<client_id>.json as fallback)
     @app.route('/justification_reports/<client_id>.json')
     def serve_justification_report(client_id):
+        from .analysis.justification_store import get_pending_report, load_report, legacy_reports_dir
         try:
-            # app.root_path -> .../insurance_app ; go one level up and into justification_reports
-            base_dir = os.path.abspath(os.path.join(app.root_path, '..', 'justification_reports'))
+            # A report still queued for the background writer is served from memory
+            pending = get_pending_report(client_id)
+            if pending is not None:
+                return jsonify(pending)
+            stored = load_report(client_id)
+            if stored is not None:
+                payload, content_hash = stored
+                etag = content_hash[:32]
+                if etag in request.if_none_match:
+                    resp = Response(status=304)
+                elif 'deflate' in (request.headers.get('Accept-Encoding') or '').lower():
+                    # Stored payload is a zlib stream, which is exactly HTTP "deflate"
+                    resp = Response(payload, mimetype='application/json')
+                    resp.headers['Content-Encoding'] = 'deflate'
+                else:
+                    resp = Response(zlib.decompress(payload), mimetype='application/json')
+                resp.set_etag(etag)
+                resp.headers['Cache-Control'] = 'no-cache'
+                resp.vary.add('Accept-Encoding')
+                return resp
+            base_dir = legacy_reports_dir(app)
             filename = f'{client_id}.json'
             file_path = os.path.join(base_dir, filename)
             if not os.path.isfile(file_path):
@@ -112,5 +185,9 @@ def create_app():
         png_bytes = base64.b64decode(transparent_png_b64)
         return Response(png_bytes, mimetype='image/png')
 
+    report = timings.report()
+    app.extensions['startup_timings'] = report
+    phases = ', '.join(f"{name} {ms}ms" for name, ms in report['phases_ms'].items())
+    app.logger.info(f"Startup timings (pid {report['pid']}): {phases}; total {report['total_ms']}ms")
     return app
 
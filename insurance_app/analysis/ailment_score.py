@@ -6,6 +6,8 @@ from copy import deepcopy
 import numpy as np
 import pandas as pd
 
+from ..resources import app_json
+
 # ---------------------------
 
 # ---------------------------
@@ -105,9 +107,7 @@ def compute_member_aware_scores(plans_df: pd.DataFrame, derived_features: dict,
     df = plans_df.copy()
 
     # Load configuration once at the top
-    config_path = os.path.join(app.root_path, 'select_plans_config.json')
-    with open(config_path, 'r') as f:
-        scoring_config = json.load(f)
+    scoring_config = app_json('select_plans_config.json', root=app.root_path)
 
     # 1) Extract ailments for each member from the derived_features
     member_ailments = {}
@@ -6,6 +6,7 @@ import sys
 
 from flask import current_app, g
 from insurance_app.database import get_derived_db_connection
+from insurance_app.resources import app_json
 from .plan_utils import is_plan_valid_for_family
 
 import json
@@ -34,9 +35,7 @@ def _safe_float(val, default=0.0):
 
 def fetch_plans(summary: dict, client_data: dict) -> dict:
     # Load configuration from the JSON file
-    config_path = os.path.join(current_app.root_path, 'proposed_plans_config.json')
-    with open(config_path, 'r') as f:
-        config = json.load(f)
+    config = app_json('proposed_plans_config.json')
 
     # --- Get family structure directly from the AI response (robust casting) ---
     num_adults = _safe_int(summary.get('num_adults', 0), 0)
@@ -0,0 +1,103 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..database import _connect, connection_pragmas, get_justification_db_path, get_justification_db_connection
+
+# Justification reports are stored zlib-compressed in justification_reports.db, one row per client,
+# with a content hash that doubles as the HTTP ETag. Writes happen off the request thread on a
+# single background writer; until a write commits the report is kept in _PENDING so
+# /justification_reports/<id>.json can still serve it to the dashboard that triggered it.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='justification-report')
+_PENDING = {}
+_LOCK = threading.Lock()
+
+
+def legacy_reports_dir(app) -> str:
+    # Reports written before the SQLite store lived in ../justification_reports/<id>.json
+    return os.path.abspath(os.path.join(app.root_path, '..', 'justification_reports'))
+
+
+def _safe_client_id(client_id) -> str:
+    return ''.join(c for c in str(client_id) if c.isalnum() or c in ('-', '_', '.')) or 'report'
+
+
+def encode_report(report):
+    """Return (compressed_payload, content_hash, raw_size) for a report dict."""
+    raw = json.dumps(report, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return zlib.compress(raw, 6), hashlib.sha256(raw).hexdigest(), len(raw)
+
+
+def _write_report(db_path, pragmas, client_id, report, logger):
+    conn = None
+    try:
+        payload, content_hash, raw_size = encode_report(report)
+        conn = _connect(db_path, pragmas=pragmas)
+        conn.execute(
+            '''
+            INSERT INTO justification_reports (client_id, content_hash, payload, raw_size, updated_at)
+            VALUES (?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(client_id) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                payload = excluded.payload,
+                raw_size = excluded.raw_size,
+                updated_at = excluded.updated_at
+            WHERE justification_reports.content_hash != excluded.content_hash
+            ''',
+            (client_id, content_hash, payload, raw_size)
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Failed to save justification report for {client_id}: {e}")
+    finally:
+        if conn:
+            conn.close()
+        with _LOCK:
+            # Only drop the entry if a newer report for the same client has not replaced it
+            if _PENDING.get(client_id) is report:
+                _PENDING.pop(client_id, None)
+
+
+def save_report_async(app, client_id, report):
+    """Queue the report for persistence and return the client id it is stored under."""
+    client_id = _safe_client_id(client_id)
+    db_path = get_justification_db_path()
+    with _LOCK:
+        _PENDING[client_id] = report
+    _EXECUTOR.submit(_write_report, db_path, connection_pragmas(app.config), client_id, report, app.logger)
+    return client_id
+
+
+def get_pending_report(client_id):
+    """Return a report that has been queued but not yet written, or None."""
+    with _LOCK:
+        return _PENDING.get(_safe_client_id(client_id))
+
+
+def load_report(client_id):
+    """Return (compressed_payload, content_hash) for a stored report, or None."""
+    conn = get_justification_db_connection()
+    try:
+        row = conn.execute(
+            'SELECT payload, content_hash FROM justification_reports WHERE client_id = ?',
+            (_safe_client_id(client_id),)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return row['payload'], row['content_hash']
+
+
+def purge_reports():
+    """Delete every stored report in one statement; returns the number of rows removed."""
+    conn = get_justification_db_connection()
+    try:
+        cur = conn.execute('DELETE FROM justification_reports')
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
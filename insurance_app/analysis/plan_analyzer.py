@@ -1,9 +1,10 @@
 from collections import Counter, defaultdict
 from itertools import chain, combinations
-import json
-from datetime import datetime
 import pandas as pd
 
+from .result_serializer import plans_to_records
+from .trace import current_trace, trace_data
+
 
 # Helper function to parse plan capacity from Policy_Code
 def get_plan_capacity(policy_code):
@@ -57,11 +58,10 @@ def bundle_plans_by_score(initial_plans: dict, ranked_plans_df: pd.DataFrame, fa
             by=['AilmentScore', 'Adult_Surplus', 'Child_Surplus'],
             ascending=[False, True, True]
         )
-    # Clean for JSON serialization before converting
-    safe_best_floaters_df = best_floaters_df.where(pd.notnull(best_floaters_df), None)
+    # Project to the dashboard columns; NaN/NaT are converted to None in the same pass
     option_1_full_family_plans = {
         "covered_members": ["Entire Family"],
-        "plans": safe_best_floaters_df.to_dict(orient='records')
+        "plans": plans_to_records(best_floaters_df)
     }
 
     # 3. Generate Hybrid Combination Packages (Option 2)
@@ -81,9 +81,7 @@ def bundle_plans_by_score(initial_plans: dict, ranked_plans_df: pd.DataFrame, fa
             if score_col in individual_plans_df.columns:
                 member_specific_plans = individual_plans_df[individual_plans_df[score_col] > 0]
                 if not member_specific_plans.empty:
-                    # Clean for JSON serialization before converting
-                    safe_member_specific_plans = member_specific_plans.where(pd.notnull(member_specific_plans), None)
-                    top_plans_for_high_need[member_name] = safe_member_specific_plans.sort_values(by=score_col, ascending=False).to_dict(orient='records')
+                    top_plans_for_high_need[member_name] = plans_to_records(member_specific_plans.sort_values(by=score_col, ascending=False))
 
     # Part B: Find the single best small floater for the general members group
     best_floater_for_general = None
@@ -100,11 +98,9 @@ def bundle_plans_by_score(initial_plans: dict, ranked_plans_df: pd.DataFrame, fa
             if not fittable_floaters.empty:
                 fittable_floaters['Adult_Surplus'] = fittable_floaters['Plan_Adults'] - num_general_adults
                 fittable_floaters['Child_Surplus'] = fittable_floaters['Plan_Children'] - num_general_children
-                # Clean for JSON serialization before converting
-                safe_fittable_floaters = fittable_floaters.where(pd.notnull(fittable_floaters), None)
-                best_floater_for_general = safe_fittable_floaters.sort_values(
+                best_floater_for_general = plans_to_records(fittable_floaters.sort_values(
                     by=['Adult_Surplus', 'Child_Surplus', 'AilmentScore'], ascending=[True, True, False]
-                ).iloc[0].to_dict()
+                ).head(1))[0]
 
     # Part C: Generate and rank all hybrid combinations
     combination_packages = []
@@ -151,41 +147,18 @@ def bundle_plans_by_score(initial_plans: dict, ranked_plans_df: pd.DataFrame, fa
         "ranked_packages": sorted(combination_packages, key=lambda x: x['total_score'], reverse=True)
     }
 
-    # --- Terminal Printing for Debugging --- #
-    # Define the column order for printing
-    all_score_cols = sorted([col for col in df.columns if col.startswith('Score_') and col != 'AilmentScore'])
-    member_score_cols = [col for col in all_score_cols if col != 'Score_MemberAware']
-
-    # --- Essential Table (All Scored Plans) --- #
-    print("\n--- Essential Table (Sorted by Ailment Score) ---")
-    total_family_members = family_structure.get('adults', 0) + family_structure.get('children', 0)
-    
-    # Note: Family_Fit is already calculated in the blueprint, so we don't need to recalculate it here.
-    essential_table_df = df.sort_values(by='AilmentScore', ascending=False)
-    
-    # Explicitly define the column order as requested
-    essential_cols = ['Plan Name', 'Family_Fit', 'AilmentScore'] + all_score_cols
-    display_cols = [col for col in essential_cols if col in essential_table_df.columns]
-    print(f"Client Family Size: {total_family_members}")
-    print(essential_table_df[display_cols].to_string())
-    print("--- --- --- ---")
-
-    print("\n--- Best Floater Plans ---")
-    if not best_floaters_df.empty:
-        print(best_floaters_df[['Plan Name', 'AilmentScore']].to_string(index=False))
-    else:
-        print("No suitable floater plans found.")
-    print("--- --- --- ---")
-
-    print("\n--- Best Combination Packages ---")
-    if option_2_combination_plans.get('ranked_packages'):
-        for i, package in enumerate(option_2_combination_plans['ranked_packages']):
-            print(f"\n--- Package #{i+1} (Total Score: {package['total_score']:.2f}) ---")
-            package_df = pd.DataFrame(package['plans'])
-            print(package_df.to_string(index=False))
-    else:
-        print("No combination packages could be generated.")
-    print("--- --- --- ---")
+    # --- Debug trace (only recorded when the request enabled tracing) --- #
+    trace = current_trace()
+    if trace is not None:
+        all_score_cols = sorted([col for col in df.columns if col.startswith('Score_') and col != 'AilmentScore'])
+        # Note: Family_Fit is already calculated in the blueprint, so we don't need to recalculate it here.
+        essential_table_df = df.sort_values(by='AilmentScore', ascending=False)
+        essential_cols = ['Plan Name', 'Family_Fit', 'AilmentScore'] + all_score_cols
+        display_cols = [col for col in essential_cols if col in essential_table_df.columns]
+        trace.add_data('client_family_size', family_structure.get('adults', 0) + family_structure.get('children', 0))
+        trace.add_frame('essential_table', essential_table_df[display_cols])
+        trace.add_frame('best_floaters', best_floaters_df[[c for c in ('Plan Name', 'AilmentScore') if c in best_floaters_df.columns]])
+        trace.add_data('combination_packages', option_2_combination_plans.get('ranked_packages', []))
     # --- End of Final Logic --- #
 
     return {
@@ -339,22 +312,13 @@ def analyze_plan_intersections(plans_data: dict) -> dict:
                     intersection_key = " & ".join(combo_names)
                     option_2_combination_plans["combo_plans"][intersection_key] = combo_intersection
 
-    # Save the results to a timestamped JSON file
     results_to_save = {
         "option_1_full_family_plans": option_1_full_family_plans,
         "option_2_combination_plans": option_2_combination_plans,
         "ranked_by_commonality": ranked_by_commonality
     }
 
-    # Debug printing
-    print('*' * 50)
-    print(json.dumps(results_to_save, indent=2))
-    print('*' * 50)
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"analysis_results_{timestamp}.json"
-    with open(filename, 'w') as f:
-        json.dump(results_to_save, f, indent=4)
-    print(f"Analysis results saved to {filename}")
+    # Debug output goes to the request trace (stored only when tracing is enabled)
+    trace_data('plan_intersections', results_to_save)
 
     return results_to_save
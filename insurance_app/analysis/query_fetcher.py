@@ -1,28 +1,42 @@
 import os
 import json
+import threading
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
-from google.api_core import exceptions as google_exceptions
 from flask import current_app
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from ..resources import app_text
+from ..llm_limiter import llm_slot
 
 load_dotenv()
 
 # --- Performance Improvements ---
-# Initialize the client once to be reused across all requests.
-GEMINI_CLIENT = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# The google SDKs are imported and the client created on first use, so importing the app (and
+# every worker boot) does not pay for them. The client is then reused across all requests.
+GEMINI_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
 
-# Load the system prompt once using a lazy-loading approach.
-SYSTEM_PROMPT = None
 
-# Add a retry decorator to handle transient API errors
-@retry(
-    retry=retry_if_exception_type((
+def get_client():
+    global GEMINI_CLIENT
+    if GEMINI_CLIENT is None:
+        with _CLIENT_LOCK:
+            if GEMINI_CLIENT is None:
+                from google import genai
+                GEMINI_CLIENT = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+    return GEMINI_CLIENT
+
+
+def _is_transient(exc) -> bool:
+    from google.api_core import exceptions as google_exceptions
+    return isinstance(exc, (
         google_exceptions.ServiceUnavailable, # 503
         google_exceptions.DeadlineExceeded,   # 504
         google_exceptions.ResourceExhausted,  # 429
-    )),
+    ))
+
+# Add a retry decorator to handle transient API errors
+@retry(
+    retry=retry_if_exception(_is_transient),
     wait=wait_exponential(multiplier=1, min=1, max=10),
     stop=stop_after_attempt(3),
     before_sleep=lambda retry_state: current_app.logger.warning(
@@ -31,19 +45,15 @@ SYSTEM_PROMPT = None
 )
 def generate(text, system_prompt_text=None):
     """Generates content using the Gemini API with efficient, cached resources."""
-    global SYSTEM_PROMPT
+    from google.genai import types
 
-    # Use the provided system prompt, or lazy-load the default one.
+    # Use the provided system prompt, or the default one (loaded once, see resources.warm).
     if system_prompt_text is None:
-        if SYSTEM_PROMPT is None:
-            try:
-                prompt_path = os.path.join(current_app.root_path, 'prompt.txt')
-                with open(prompt_path, 'r') as f:
-                    SYSTEM_PROMPT = f.read()
-            except Exception as e:
-                current_app.logger.error(f"Failed to load default system prompt: {e}")
-                raise
-        prompt_to_use = SYSTEM_PROMPT
+        try:
+            prompt_to_use = app_text('prompt.txt')
+        except Exception as e:
+            current_app.logger.error(f"Failed to load default system prompt: {e}")
+            raise
     else:
         prompt_to_use = system_prompt_text
 
@@ -62,14 +72,17 @@ def generate(text, system_prompt_text=None):
         system_instruction=[types.Part.from_text(text=prompt_to_use)],
     )
 
+    # Each attempt holds an upstream slot only while streaming, not across the retry backoff;
+    # LLMOverloaded is not transient, so a full queue is never retried here.
     result = ""
-    for chunk in GEMINI_CLIENT.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
-    ):
-        if chunk.text:
-            result += chunk.text
+    with llm_slot():
+        for chunk in get_client().models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=generate_content_config,
+        ):
+            if chunk.text:
+                result += chunk.text
     return result
 
 
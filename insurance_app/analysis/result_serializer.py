@@ -0,0 +1,74 @@
+import pandas as pd
+
+# Columns the Analysis Dashboard / Supervisor views actually read from a plan record.
+# Per-member 'Score_<name>' columns are appended dynamically (see dashboard_columns).
+DASHBOARD_PLAN_COLUMNS = [
+    'Rank',
+    'Plan Name',
+    'Policy_Code',
+    'Category',
+    'AilmentScore',
+    'Score_MemberAware',
+    'Family_Fit',
+]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def dashboard_columns(df: pd.DataFrame, extra=None) -> list:
+    """Return the projected column list for df: the dashboard columns, any extras,
+    then every member score column, keeping only columns that exist."""
+    if df is None:
+        return []
+    wanted = list(DASHBOARD_PLAN_COLUMNS) + list(extra or [])
+    wanted += [c for c in df.columns if isinstance(c, str) and c.startswith('Score_') and c not in wanted]
+    seen = set()
+    cols = []
+    for c in wanted:
+        if c in df.columns and c not in seen:
+            seen.add(c)
+            cols.append(c)
+    return cols
+
+
+def plans_to_records(df: pd.DataFrame, columns=None) -> list:
+    """Convert df to a list of JSON-safe dicts in one pass.
+
+    Only `columns` are emitted (defaults to dashboard_columns(df)). NaN/NaT/None become None and
+    numpy scalars become native Python values, so the result needs no further cleaning.
+    """
+    if df is None or df.empty:
+        return []
+    cols = columns if columns is not None else dashboard_columns(df)
+    cols = [c for c in cols if c in df.columns]
+    if not cols:
+        return [{} for _ in range(len(df))]
+    projected = df[cols]
+    values = projected.astype(object).where(projected.notna(), None).values.tolist()
+    return [dict(zip(cols, row)) for row in values]
+
+
+def _to_int(val, default):
+    try:
+        if val is None or val == '':
+            return default
+        return int(val)
+    except Exception:
+        return default
+
+
+def paginate(records: list, page=None, page_size=None):
+    """Slice records for the requested page.
+
+    Returns (page_records, meta). When neither page nor page_size is given the full
+    list is returned unchanged so existing callers keep their behaviour.
+    """
+    total = len(records)
+    if page is None and page_size is None:
+        return records, {'page': 1, 'page_size': total, 'total': total, 'pages': 1 if total else 0}
+    page = max(1, _to_int(page, 1))
+    page_size = min(MAX_PAGE_SIZE, max(1, _to_int(page_size, DEFAULT_PAGE_SIZE)))
+    start = (page - 1) * page_size
+    pages = (total + page_size - 1) // page_size
+    return records[start:start + page_size], {'page': page, 'page_size': page_size, 'total': total, 'pages': pages}
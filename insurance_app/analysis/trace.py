@@ -0,0 +1,169 @@
+import os
+import re
+import gzip
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+from flask import current_app, g, request, has_request_context
+
+from .result_serializer import plans_to_records
+
+# Tracing is off by default; a request opts in with the header or query flag below.
+TRACE_HEADER = 'X-Analysis-Trace'
+TRACE_QUERY_ARG = 'trace'
+TRACE_FRAME_MAX_ROWS = 50
+TRACE_KEEP_LATEST = 200
+
+
+class AnalysisTrace:
+    """Collects stage timings, DataFrame snapshots and debug payloads for one request."""
+
+    def __init__(self, unique_id=None):
+        self.unique_id = unique_id
+        self.started_at = datetime.now().isoformat()
+        self.stages = []
+        self.frames = {}
+        self.data = {}
+
+    def add_stage(self, name, elapsed_ms):
+        self.stages.append({'stage': name, 'elapsed_ms': round(elapsed_ms, 2)})
+
+    def add_frame(self, name, df):
+        if df is None:
+            return
+        self.frames[name] = {
+            'shape': list(df.shape),
+            'columns': [str(c) for c in df.columns],
+            'rows': plans_to_records(df.head(TRACE_FRAME_MAX_ROWS), columns=list(df.columns)),
+        }
+
+    def add_data(self, name, value):
+        self.data[name] = value
+
+    def to_dict(self):
+        return {
+            'unique_id': self.unique_id,
+            'started_at': self.started_at,
+            'path': request.path if has_request_context() else None,
+            'stages': self.stages,
+            'frames': self.frames,
+            'data': self.data,
+        }
+
+
+def _trace_requested() -> bool:
+    if not has_request_context():
+        return False
+    flag = request.headers.get(TRACE_HEADER) or request.args.get(TRACE_QUERY_ARG) or ''
+    return str(flag).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def current_trace():
+    """Return the trace for the current request, or None when tracing is not enabled."""
+    if not has_request_context():
+        return None
+    trace = g.get('analysis_trace')
+    if trace is None and _trace_requested():
+        uid = (request.view_args or {}).get('unique_id')
+        trace = AnalysisTrace(unique_id=uid)
+        g.analysis_trace = trace
+    return trace
+
+
+@contextmanager
+def trace_stage(name):
+    """Time a block of the analysis pipeline; a no-op when tracing is off."""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, (time.perf_counter() - start) * 1000.0)
+
+
+def trace_frame(name, df: pd.DataFrame):
+    trace = current_trace()
+    if trace is not None:
+        trace.add_frame(name, df)
+
+
+def trace_data(name, value):
+    trace = current_trace()
+    if trace is not None:
+        trace.add_data(name, value)
+
+
+# ---------------- Storage ----------------
+
+_SAFE_ID = re.compile(r'[^A-Za-z0-9_\-.]')
+
+
+def _trace_dir() -> str:
+    path = current_app.config.get('ANALYSIS_TRACE_DIR') or os.path.join(current_app.instance_path, 'analysis_traces')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _trace_path(trace_id: str) -> str:
+    return os.path.join(_trace_dir(), f"{_SAFE_ID.sub('_', trace_id)}.json.gz")
+
+
+def persist_trace(response):
+    """after_request hook: store the current request's trace (if any) as a gzip JSON artifact."""
+    trace = g.pop('analysis_trace', None)
+    if trace is None:
+        return response
+    try:
+        trace_id = f"{trace.unique_id or 'anon'}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        payload = json.dumps(trace.to_dict(), separators=(',', ':'), default=str).encode('utf-8')
+        with gzip.open(_trace_path(trace_id), 'wb', compresslevel=6) as f:
+            f.write(payload)
+        response.headers[TRACE_HEADER + '-Id'] = trace_id
+        _prune_traces()
+    except Exception as e:
+        current_app.logger.error(f"Failed to persist analysis trace: {e}")
+    return response
+
+
+def _prune_traces():
+    base = _trace_dir()
+    files = sorted(
+        (os.path.join(base, f) for f in os.listdir(base) if f.endswith('.json.gz')),
+        key=os.path.getmtime,
+    )
+    for path in files[:-TRACE_KEEP_LATEST]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def list_traces(limit: int = 100) -> list:
+    base = _trace_dir()
+    entries = []
+    for f in os.listdir(base):
+        if not f.endswith('.json.gz'):
+            continue
+        path = os.path.join(base, f)
+        stat = os.stat(path)
+        entries.append({
+            'trace_id': f[:-len('.json.gz')],
+            'size_bytes': stat.st_size,
+            'modified_at': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+        })
+    entries.sort(key=lambda e: e['modified_at'], reverse=True)
+    return entries[:limit]
+
+
+def load_trace(trace_id: str):
+    path = _trace_path(trace_id)
+    if not os.path.isfile(path):
+        return None
+    with gzip.open(path, 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
@@ -0,0 +1,135 @@
+import os
+import re
+import gzip
+import hashlib
+
+from flask import Blueprint, current_app, request, redirect, send_file, send_from_directory, url_for, abort
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are written
+    brotli = None
+
+# Fingerprinted static assets. At startup every file under static/ is hashed and listed in a
+# manifest (logical name -> <stem>.<hash>.<ext>). The hashed bytes are copied to ASSET_CACHE_DIR,
+# along with .gz / .br variants of text assets (names are content addressed, so they survive
+# restarts); /assets/<fingerprinted name> serves only those copies, so a file edited after
+# startup can never be sent under the old, immutable fingerprint. Templates link through
+# asset_url(), so repeat page loads make no asset requests until a file's content changes.
+HASH_LENGTH = 12
+COMPRESSIBLE = {'.js', '.css', '.json', '.svg', '.txt', '.map'}
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE = 'public, max-age=31536000, immutable'
+_FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+assets_bp = Blueprint('assets_bp', __name__)
+
+
+def _fingerprinted_name(logical: str, digest: str) -> str:
+    stem, ext = os.path.splitext(logical)
+    return f'{stem}.{digest[:HASH_LENGTH]}{ext}'
+
+
+def _write_variant(path: str, data: bytes):
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_manifest(static_dir: str, cache_dir: str) -> dict:
+    """Hash every static file and write its precompressed variants.
+
+    Returns {logical_name: {'url_name', 'path', 'variants': {encoding: path}}}, logical names
+    being paths relative to static_dir with forward slashes (as used with url_for('static')).
+    variants always has 'identity', the snapshot of the bytes the fingerprint was taken from.
+    """
+    manifest = {}
+    for root, _dirs, files in os.walk(static_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            logical = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                data = f.read()
+            url_name = _fingerprinted_name(logical, hashlib.sha256(data).hexdigest())
+            identity_path = os.path.join(cache_dir, url_name)
+            _write_variant(identity_path, data)
+            variants = {'identity': identity_path}
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+                gz_path = os.path.join(cache_dir, url_name + '.gz')
+                _write_variant(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+                variants['gzip'] = gz_path
+                if brotli is not None:
+                    br_path = os.path.join(cache_dir, url_name + '.br')
+                    _write_variant(br_path, brotli.compress(data, quality=11))
+                    variants['br'] = br_path
+            manifest[logical] = {'url_name': url_name, 'path': path, 'variants': variants}
+    return manifest
+
+
+def asset_url(filename: str) -> str:
+    """Fingerprinted URL for a static file; plain /static URL for files not in the manifest."""
+    filename = filename.lstrip('/')
+    entry = current_app.extensions.get('asset_manifest', {}).get(filename)
+    if entry is None:
+        return url_for('static', filename=filename)
+    return url_for('assets_bp.serve_asset', filename=entry['url_name'])
+
+
+def _accepted_encodings() -> set:
+    header = (request.headers.get('Accept-Encoding') or '').lower()
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+@assets_bp.route('/assets/<path:filename>')
+def serve_asset(filename):
+    by_url = current_app.extensions.get('asset_urls', {})
+    logical = by_url.get(filename)
+    if logical is None:
+        # A fingerprint from before a deploy: point at the current one
+        match = _FINGERPRINT_RE.match(filename)
+        stale = match and f"{match.group('stem')}{match.group('ext')}"
+        if stale and stale in current_app.extensions.get('asset_manifest', {}):
+            return redirect(asset_url(stale), code=302)
+        # Plain names (e.g. relative url() references inside CSS) fall back to normal static caching
+        if os.path.isfile(os.path.join(current_app.static_folder, filename)):
+            return send_from_directory(current_app.static_folder, filename)
+        return abort(404)
+
+    entry = current_app.extensions['asset_manifest'][logical]
+    accepted = _accepted_encodings()
+    encoding = next((e for e in ('br', 'gzip') if e in entry['variants'] and e in accepted), None)
+    path = entry['variants'][encoding or 'identity']
+    response = send_file(path, download_name=os.path.basename(entry['path']), conditional=True, etag=entry['url_name'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if len(entry['variants']) > 1:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE
+    return response
+
+
+def init_app(app):
+    """Build the asset manifest and register the /assets route and asset_url() template helper."""
+    cache_dir = app.config.get('ASSET_CACHE_DIR') or os.path.join(app.instance_path, 'asset_cache')
+    try:
+        manifest = build_manifest(app.static_folder, cache_dir)
+    except Exception as e:
+        # Templates fall back to plain /static URLs
+        app.logger.error(f"Could not build static asset manifest: {e}")
+        manifest = {}
+    app.extensions['asset_manifest'] = manifest
+    app.extensions['asset_urls'] = {entry['url_name']: logical for logical, entry in manifest.items()}
+    app.register_blueprint(assets_bp)
+    app.jinja_env.globals['asset_url'] = asset_url
+    compressed = sum(1 for entry in manifest.values() if len(entry['variants']) > 1)
+    app.logger.info(f"Asset manifest: {len(manifest)} files, {compressed} precompressed{'' if brotli else ' (gzip only)'}")
@@ -0,0 +1,86 @@
+import io
+import os
+import hashlib
+import tempfile
+
+from flask import current_app
+
+# Content-addressed file store for uploaded documents. A blob lives at <root>/<h[:2]>/<h> where h
+# is the SHA-256 of its bytes, so identical uploads share one file and a stored blob never changes
+# (safe to cache forever and to serve with Range requests). The database keeps only metadata.
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobTooLarge(ValueError):
+    """Upload exceeded the configured size limit."""
+
+
+def blob_root() -> str:
+    root = current_app.config.get('POLICY_BLOB_DIR') or os.path.join(current_app.instance_path, 'policy_blobs')
+    return os.path.abspath(root)
+
+
+def blob_path(content_hash: str, root: str = None) -> str:
+    root = root or blob_root()
+    return os.path.join(root, content_hash[:2], content_hash)
+
+
+def _is_hash(value) -> bool:
+    return isinstance(value, str) and len(value) == 64 and all(c in '0123456789abcdef' for c in value)
+
+
+def store_stream(stream, max_bytes: int = None, root: str = None):
+    """Copy a file-like object into the store chunk by chunk. Returns (content_hash, size_bytes)."""
+    root = root or blob_root()
+    tmp_dir = os.path.join(root, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise BlobTooLarge(f'File exceeds {max_bytes} bytes.')
+                digest.update(chunk)
+                out.write(chunk)
+        content_hash = digest.hexdigest()
+        final_path = blob_path(content_hash, root)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)  # already stored: dedupe
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        return content_hash, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def store_bytes(data: bytes, root: str = None):
+    return store_stream(io.BytesIO(data), root=root)
+
+
+def open_blob_path(content_hash: str, root: str = None):
+    """Return the on-disk path of a stored blob, or None if it is missing."""
+    if not _is_hash(content_hash):
+        return None
+    path = blob_path(content_hash, root)
+    return path if os.path.isfile(path) else None
+
+
+def delete_blob(content_hash: str, root: str = None) -> bool:
+    """Remove a blob from disk. Callers must first check that no metadata row references it."""
+    path = open_blob_path(content_hash, root)
+    if not path:
+        return False
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
@@ -1,78 +1,61 @@
 import json
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
-from ..database import get_db_connection, get_derived_db_connection, insert_application_status_log_entry
+from ..database import get_db_connection, get_derived_db_connection, append_application_status_log
+from ..db_writer import run_write
+from .submission import _version_etag, _parse_if_match
+from ..conditional import conditional, plan_summary_etag, plans_catalog_etag
 # Temporarily commented out to avoid import issues
 # from ..utils.timestamp_utils import get_current_timestamp_iso
 
 actions_bp = Blueprint('actions_bp', __name__)
 
-# --- Helper: recompute and persist final_* rollup for a submission (same logic as approvals.py) ---
-def _recompute_final_for(conn, unique_id: str):
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT supervisor_approval_status, supervisor_comments, supervisor_modified_at, supervisor_modified_by,
-               underwriter_status, underwriter_comments, underwriter_modified_at, underwriter_modified_by,
-               policy_outcome, policy_outcome_comment, policy_outcome_modified_at, policy_outcome_modified_by,
-               close_status, close_status_modified_at, close_status_modified_by
-        FROM submissions WHERE unique_id = ?
-        """,
-        (unique_id,)
-    )
-    row = cur.fetchone()
-    if not row:
-        return
-    cols = [
-        "supervisor_approval_status","supervisor_comments","supervisor_modified_at","supervisor_modified_by",
-        "underwriter_status","underwriter_comments","underwriter_modified_at","underwriter_modified_by",
-        "policy_outcome","policy_outcome_comment","policy_outcome_modified_at","policy_outcome_modified_by",
-        "close_status","close_status_modified_at","close_status_modified_by"
+# Plan metadata is stored in submission_plan_meta, one row per (submission, role, plan), and read
+# back as form_summary.plan_meta (database.load_plan_meta). Writes upsert only the rows they touch
+# and bump row_version for the submission ETags; form_summary itself is left alone.
+def _plan_meta_upsert_sql(merge: bool) -> str:
+    data = 'json_patch(submission_plan_meta.data, excluded.data)' if merge else 'excluded.data'
+    columns = (('premium', 'premium'), ('sum_insured', 'sum_insured'), ('policy_term', 'policy_term'), ('member_name', 'memberName'))
+    return f'''
+        INSERT INTO submission_plan_meta (unique_id, plan_name, role, premium, sum_insured, policy_term, member_name, data)
+        SELECT ?, ?, ?, {', '.join(f"json_extract(d, '$.{key}')" for _, key in columns)}, d FROM (SELECT json(?) AS d) WHERE 1
+        ON CONFLICT (unique_id, role, plan_name) DO UPDATE SET
+            {', '.join(f"{column} = json_extract({data}, '$.{key}')" for column, key in columns)}, data = {data}
+        WHERE submission_plan_meta.data IS NOT {data}
+    '''
+
+_PLAN_META_MERGE = _plan_meta_upsert_sql(merge=True)
+_PLAN_META_REPLACE = _plan_meta_upsert_sql(merge=False)
+
+def _merge_plan_meta(conn, unique_id: str, role: str, role_meta: dict) -> int:
+    """Write job: merge per-plan values into plan_meta[plan][role]; returns 0 if the submission is missing."""
+    if conn.execute('UPDATE submissions SET row_version = row_version + 1 WHERE unique_id = ?', (unique_id,)).rowcount == 0:
+        return 0
+    conn.executemany(_PLAN_META_MERGE, [
+        (unique_id, plan_name, role, json.dumps({
+            'premium': meta_values.get('premium', ''),
+            'sum_insured': meta_values.get('sum_insured', ''),
+            'policy_term': meta_values.get('policy_term', ''),
+            'memberName': meta_values.get('memberName', '')
+        }))
+        for plan_name, meta_values in role_meta.items()
+    ])
+    return 1
+
+def _replace_plan_meta(conn, unique_id: str, plan_meta: dict):
+    """Write job step: make plan_meta the submission's plan metadata, writing only changed rows."""
+    rows = [
+        (unique_id, plan_name, role, json.dumps(values))
+        for plan_name, roles in plan_meta.items() if isinstance(roles, dict)
+        for role, values in roles.items() if isinstance(values, dict)
     ]
-    d = dict(zip(cols, row))
-    candidates = []
-    for src, ts_key in (
-        ("supervisor", "supervisor_modified_at"),
-        ("underwriter", "underwriter_modified_at"),
-        ("policy", "policy_outcome_modified_at"),
-        ("application", "close_status_modified_at"),
-    ):
-        ts = d.get(ts_key)
-        if ts and str(ts).strip():
-            candidates.append((str(ts), src))
-    if not candidates:
-        return
-    candidates.sort(key=lambda x: x[0])
-    latest_ts, latest_src = candidates[-1]
-    if latest_src == 'supervisor':
-        f_status = d.get('supervisor_approval_status')
-        f_comments = d.get('supervisor_comments')
-        f_by = d.get('supervisor_modified_by')
-    elif latest_src == 'underwriter':
-        f_status = d.get('underwriter_status')
-        f_comments = d.get('underwriter_comments')
-        f_by = d.get('underwriter_modified_by')
-    elif latest_src == 'policy':
-        f_status = d.get('policy_outcome')
-        f_comments = d.get('policy_outcome_comment')
-        f_by = d.get('policy_outcome_modified_by')
-    else:
-        f_status = d.get('close_status')
-        f_comments = None
-        f_by = d.get('close_status_modified_by')
-    cur.execute(
-        """
-        UPDATE submissions
-        SET application_status = ?, application_comments = ?, application_modified_at = ?, application_modified_by = ?
-        WHERE unique_id = ?
-        """,
-        (f_status, f_comments, latest_ts, f_by, unique_id)
+    keep = {(plan_name, role) for _, plan_name, role, _ in rows}
+    existing = conn.execute('SELECT plan_name, role FROM submission_plan_meta WHERE unique_id = ?', (unique_id,)).fetchall()
+    conn.executemany(
+        'DELETE FROM submission_plan_meta WHERE unique_id = ? AND plan_name = ? AND role = ?',
+        [(unique_id, plan_name, role) for plan_name, role in existing if (plan_name, role) not in keep]
     )
-    # Append audit log (no overwrite) to Final_Status.db
-    try:
-        insert_application_status_log_entry(unique_id, f_status, f_comments, latest_ts, f_by, source=latest_src)
-    except Exception:
-        pass
+    conn.executemany(_PLAN_META_REPLACE, rows)
 
 @actions_bp.route('/admin/update_plan_status', methods=['POST'])
 def update_plan_status():
@@ -126,57 +109,32 @@ def update_chosen_plans(unique_id):
     data = request.get_json()
     selected_plans = data.get('selected_plans')
     plan_meta = data.get('plan_meta', {})
-    conn = None
     if not selected_plans:
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('UPDATE submissions SET plans_chosen = NULL, supervisor_approval_status = ? WHERE unique_id = ?', ('OPEN', unique_id))
-            conn.commit()
+            run_write(lambda conn: conn.execute(
+                'UPDATE submissions SET plans_chosen = NULL, supervisor_approval_status = ? WHERE unique_id = ?', ('OPEN', unique_id)
+            ))
             return jsonify({'success': True, 'message': 'Cleared chosen plans; supervisor status set to OPEN.'}), 200
         except Exception as e:
-            if conn: conn.rollback()
             current_app.logger.error(f"Database error while clearing chosen plans for {unique_id}: {e}")
             return jsonify({'error': 'Database update failed.'}), 500
-        finally:
-            if conn: conn.close()
+
+    def _apply(conn):
+        # Update plans_chosen (the row_version trigger bumps the ETag) and replace the plan metadata rows
+        updated = conn.execute(
+            'UPDATE submissions SET plans_chosen = ? WHERE unique_id = ?', (json.dumps(selected_plans), unique_id)
+        ).rowcount
+        if updated:
+            _replace_plan_meta(conn, unique_id, plan_meta if isinstance(plan_meta, dict) else {})
+        return updated
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # First, fetch the current form_summary to preserve other data
-        cursor.execute('SELECT form_summary FROM submissions WHERE unique_id = ?', (unique_id,))
-        row = cursor.fetchone()
-        
-        form_summary = {}
-        if row and row[0]:
-            try:
-                form_summary = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-            except:
-                form_summary = {}
-        
-        # Update form_summary with plan_meta
-        if not isinstance(form_summary, dict):
-            form_summary = {}
-        
-        form_summary['plan_meta'] = plan_meta
-        
-        # Update both plans_chosen and form_summary
-        cursor.execute(
-            'UPDATE submissions SET plans_chosen = ?, form_summary = ? WHERE unique_id = ?',
-            (json.dumps(selected_plans), json.dumps(form_summary), unique_id)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
+        if run_write(_apply) == 0:
             current_app.logger.warning(f"No rows were updated for unique_id {unique_id}. It might not exist.")
         return jsonify({'success': True, 'message': 'Chosen plans and plan details updated successfully.'}), 200
     except Exception as e:
-        if conn: conn.rollback()
         current_app.logger.error(f"Database error while updating chosen plans for {unique_id}: {e}")
         return jsonify({'error': 'Database update failed.'}), 500
-    finally:
-        if conn: conn.close()
 
 @actions_bp.route('/update_approval_status/<unique_id>', methods=['POST'])
 def update_approval_status(unique_id):
@@ -196,33 +154,25 @@ def update_approval_status(unique_id):
     elif new_status and str(new_status).lower() == 'sup_review' and not comments:
         comments = 'Submitted by agent; awaiting supervisor review.'
 
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Also track modification metadata (IST time and actor id)
-        import pytz
-        ist = pytz.timezone('Asia/Kolkata')
-        supervisor_modified_at = datetime.now(ist).isoformat()
-        cursor.execute(
+    # Also track modification metadata (IST time and actor id)
+    import pytz
+    ist = pytz.timezone('Asia/Kolkata')
+    supervisor_modified_at = datetime.now(ist).isoformat()
+
+    def _apply(conn):
+        # application_* rollup and its audit row follow by trigger in the same transaction
+        return conn.execute(
             'UPDATE submissions SET supervisor_approval_status = ?, supervisor_comments = ?, supervisor_modified_at = ?, supervisor_modified_by = ? WHERE unique_id = ?',
             (new_status.upper() if new_status else None, comments, supervisor_modified_at, actor_id, unique_id)
-        )
-        # Recompute final_* rollup after supervisor decision
-        try:
-            _recompute_final_for(conn, unique_id)
-        except Exception:
-            pass
-        conn.commit()
-        if cursor.rowcount == 0:
+        ).rowcount
+
+    try:
+        if run_write(_apply) == 0:
             return jsonify({'error': 'Submission not found'}), 404
         return jsonify({'success': True, 'message': f'Status updated to {new_status}.', 'supervisor_comments': comments, 'supervisor_modified_at': supervisor_modified_at, 'supervisor_modified_by': actor_id}), 200
     except Exception as e:
-        if conn: conn.rollback()
         current_app.logger.error(f"Database error while updating approval status for {unique_id}: {e}")
         return jsonify({'error': 'Database update failed.'}), 500
-    finally:
-        if conn: conn.close()
 
 @actions_bp.route('/api/supervisor/reassign_agent', methods=['POST'])
 def reassign_agent():
@@ -252,31 +202,60 @@ def reassign_agent():
             'message': 'Both unique_id and new_agent are required.'
         }), 400
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        import pytz
+        ist = pytz.timezone('Asia/Kolkata')
+        timestamp_iso = datetime.now(ist).isoformat()
+    except Exception:
+        # Fallback if pytz is not available for some reason
+        timestamp_iso = datetime.utcnow().isoformat()
 
+    def _apply(conn):
         # Look up the current agent and application status
-        cursor.execute(
+        row = conn.execute(
             """
             SELECT agent, application_status
             FROM submissions
             WHERE unique_id = ?
             """,
             (unique_id,)
-        )
-        row = cursor.fetchone()
+        ).fetchone()
         if not row:
+            return None
+        # If nothing is changing, leave the row untouched
+        if (row['agent'] or '').strip() != new_agent:
+            conn.execute(
+                """
+                UPDATE submissions
+                SET agent = ?
+                WHERE unique_id = ?
+                """,
+                (new_agent, unique_id)
+            )
+            # Audit entry is committed together with the reassignment
+            comments = (
+                f'Agent reassigned from {row["agent"] or "None"} '
+                f'to {new_agent} by {reassigned_by}'
+            )
+            append_application_status_log(conn, [(
+                unique_id,
+                row['application_status'],
+                comments,
+                timestamp_iso,
+                reassigned_by,
+                'agent_reassignment'
+            )])
+        return row['agent'], row['application_status']
+
+    try:
+        result = run_write(_apply)
+        if result is None:
             return jsonify({
                 'success': False,
                 'message': f'Application {unique_id} was not found.'
             }), 404
 
-        current_agent = row['agent']
-        application_status = row['application_status']
-
-        # If nothing is changing, just return success with a no-op message
+        current_agent, application_status = result
         if (current_agent or '').strip() == new_agent:
             return jsonify({
                 'success': True,
@@ -285,43 +264,6 @@ def reassign_agent():
                 'new_agent': new_agent
             }), 200
 
-        # Perform the update
-        cursor.execute(
-            """
-            UPDATE submissions
-            SET agent = ?
-            WHERE unique_id = ?
-            """,
-            (new_agent, unique_id)
-        )
-        conn.commit()
-
-        # Best-effort audit log entry
-        try:
-            try:
-                import pytz
-                ist = pytz.timezone('Asia/Kolkata')
-                timestamp_iso = datetime.now(ist).isoformat()
-            except Exception:
-                # Fallback if pytz is not available for some reason
-                timestamp_iso = datetime.utcnow().isoformat()
-
-            comments = (
-                f'Agent reassigned from {current_agent or "None"} '
-                f'to {new_agent} by {reassigned_by}'
-            )
-            insert_application_status_log_entry(
-                unique_id,
-                application_status,
-                comments,
-                timestamp_iso,
-                reassigned_by,
-                source='agent_reassignment'
-            )
-        except Exception:
-            # Logging should never break the main operation
-            pass
-
         current_app.logger.info(
             f'Application {unique_id} reassigned from {current_agent} '
             f'to {new_agent} by {reassigned_by}'
@@ -336,15 +278,10 @@ def reassign_agent():
 
     except Exception as e:
         current_app.logger.error(f'Error reassigning agent for {unique_id}: {e}')
-        if conn:
-            conn.rollback()
         return jsonify({
             'success': False,
             'message': 'Error reassigning agent.'
         }), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @actions_bp.route('/supervisor_selected_plans/<unique_id>', methods=['POST'])
@@ -356,19 +293,13 @@ def update_supervisor_selected_plans(unique_id):
     if not selected_plans:
         return jsonify({'error': 'No selected plans provided'}), 400
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Save supervisor selected plans as JSON string
-        cursor.execute(
+        updated = run_write(lambda conn: conn.execute(
             'UPDATE submissions SET supervisor_selected_plans = ? WHERE unique_id = ?',
             (json.dumps(selected_plans), unique_id)
-        )
-        
-        conn.commit()
-        if cursor.rowcount == 0:
+        ).rowcount)
+        if updated == 0:
             current_app.logger.warning(f"No rows were updated for unique_id {unique_id}. It might not exist.")
             return jsonify({'error': 'Submission not found'}), 404
             
@@ -376,13 +307,8 @@ def update_supervisor_selected_plans(unique_id):
         return jsonify({'success': True, 'message': 'Supervisor selected plans saved successfully.'}), 200
         
     except Exception as e:
-        if conn: 
-            conn.rollback()
         current_app.logger.error(f"Database error while saving supervisor selected plans for {unique_id}: {e}")
         return jsonify({'error': 'Database update failed.'}), 500
-    finally:
-        if conn: 
-            conn.close()
 
 @actions_bp.route('/supervisor_plan_metadata/<unique_id>', methods=['GET'])
 def get_supervisor_plan_metadata(unique_id):
@@ -398,25 +324,11 @@ def get_supervisor_plan_metadata(unique_id):
     conn = None
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT form_summary FROM submissions WHERE unique_id = ?', (unique_id,))
-        row = cursor.fetchone()
-        
-        form_summary = {}
-        if row and row[0]:
-            try:
-                form_summary = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-            except:
-                form_summary = {}
-        
-        # Extract supervisor metadata from plan_meta
-        plan_meta = form_summary.get('plan_meta', {})
-        supervisor_meta = {}
-        
-        for plan_name, meta in plan_meta.items():
-            if isinstance(meta, dict) and 'supervisor' in meta:
-                supervisor_meta[plan_name] = meta['supervisor']
+        rows = conn.execute(
+            "SELECT plan_name, data FROM submission_plan_meta WHERE unique_id = ? AND role = 'supervisor'",
+            (unique_id,)
+        ).fetchall()
+        supervisor_meta = {r['plan_name']: json.loads(r['data']) for r in rows}
         
         return jsonify({'supervisor_meta': supervisor_meta}), 200
     
@@ -438,7 +350,7 @@ def save_supervisor_plan_metadata(unique_id):
         }
     }
     
-    Updates form_summary.plan_meta[planName]['supervisor'] for each plan.
+    Upserts the submission_plan_meta row of each plan for role 'supervisor'.
     """
     data = request.get_json()
     supervisor_meta = data.get('supervisor_meta', {})
@@ -446,54 +358,9 @@ def save_supervisor_plan_metadata(unique_id):
     if not supervisor_meta:
         return jsonify({'error': 'No supervisor metadata provided'}), 400
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Fetch current form_summary to preserve existing data
-        cursor.execute('SELECT form_summary FROM submissions WHERE unique_id = ?', (unique_id,))
-        row = cursor.fetchone()
-        
-        form_summary = {}
-        if row and row[0]:
-            try:
-                form_summary = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-            except:
-                form_summary = {}
-        
-        if not isinstance(form_summary, dict):
-            form_summary = {}
-        
-        # Ensure plan_meta exists
-        if 'plan_meta' not in form_summary:
-            form_summary['plan_meta'] = {}
-        
-        # Update plan_meta with supervisor values for each plan
-        for plan_name, meta_values in supervisor_meta.items():
-            if plan_name not in form_summary['plan_meta']:
-                form_summary['plan_meta'][plan_name] = {}
-            
-            # Initialize supervisor role if not exists
-            if 'supervisor' not in form_summary['plan_meta'][plan_name]:
-                form_summary['plan_meta'][plan_name]['supervisor'] = {}
-            
-            # Update supervisor values
-            form_summary['plan_meta'][plan_name]['supervisor'].update({
-                'premium': meta_values.get('premium', ''),
-                'sum_insured': meta_values.get('sum_insured', ''),
-                'policy_term': meta_values.get('policy_term', ''),
-                'memberName': meta_values.get('memberName', '')
-            })
-        
-        # Save updated form_summary
-        cursor.execute(
-            'UPDATE submissions SET form_summary = ? WHERE unique_id = ?',
-            (json.dumps(form_summary), unique_id)
-        )
-        
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = run_write(_merge_plan_meta, unique_id, 'supervisor', supervisor_meta)
+        if updated == 0:
             current_app.logger.warning(f"No rows were updated for unique_id {unique_id}. It might not exist.")
             return jsonify({'error': 'Submission not found'}), 404
         
@@ -501,13 +368,8 @@ def save_supervisor_plan_metadata(unique_id):
         return jsonify({'success': True, 'message': 'Supervisor plan metadata saved successfully.'}), 200
         
     except Exception as e:
-        if conn:
-            conn.rollback()
         current_app.logger.error(f"Database error while saving supervisor plan metadata for {unique_id}: {e}")
         return jsonify({'error': 'Database update failed.'}), 500
-    finally:
-        if conn:
-            conn.close()
 
 @actions_bp.route('/client_plan_metadata/<unique_id>', methods=['POST'])
 def save_client_plan_metadata(unique_id):
@@ -520,7 +382,7 @@ def save_client_plan_metadata(unique_id):
         }
     }
     
-    Updates form_summary.plan_meta[planName]['client'] for each plan.
+    Upserts the submission_plan_meta row of each plan for role 'client'.
     """
     data = request.get_json()
     client_meta = data.get('client_meta', {})
@@ -528,54 +390,9 @@ def save_client_plan_metadata(unique_id):
     if not client_meta:
         return jsonify({'error': 'No client metadata provided'}), 400
     
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Fetch current form_summary to preserve existing data
-        cursor.execute('SELECT form_summary FROM submissions WHERE unique_id = ?', (unique_id,))
-        row = cursor.fetchone()
-        
-        form_summary = {}
-        if row and row[0]:
-            try:
-                form_summary = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-            except:
-                form_summary = {}
-        
-        if not isinstance(form_summary, dict):
-            form_summary = {}
-        
-        # Ensure plan_meta exists
-        if 'plan_meta' not in form_summary:
-            form_summary['plan_meta'] = {}
-        
-        # Update plan_meta with client values for each plan
-        for plan_name, meta_values in client_meta.items():
-            if plan_name not in form_summary['plan_meta']:
-                form_summary['plan_meta'][plan_name] = {}
-            
-            # Initialize client role if not exists
-            if 'client' not in form_summary['plan_meta'][plan_name]:
-                form_summary['plan_meta'][plan_name]['client'] = {}
-            
-            # Update client values
-            form_summary['plan_meta'][plan_name]['client'].update({
-                'premium': meta_values.get('premium', ''),
-                'sum_insured': meta_values.get('sum_insured', ''),
-                'policy_term': meta_values.get('policy_term', ''),
-                'memberName': meta_values.get('memberName', '')
-            })
-        
-        # Save updated form_summary
-        cursor.execute(
-            'UPDATE submissions SET form_summary = ? WHERE unique_id = ?',
-            (json.dumps(form_summary), unique_id)
-        )
-        
-        conn.commit()
-        if cursor.rowcount == 0:
+        updated = run_write(_merge_plan_meta, unique_id, 'client', client_meta)
+        if updated == 0:
             current_app.logger.warning(f"No rows were updated for unique_id {unique_id}. It might not exist.")
             return jsonify({'error': 'Submission not found'}), 404
         
@@ -583,13 +400,8 @@ def save_client_plan_metadata(unique_id):
         return jsonify({'success': True, 'message': 'Client plan metadata saved successfully.'}), 200
         
     except Exception as e:
-        if conn:
-            conn.rollback()
         current_app.logger.error(f"Database error while saving client plan metadata for {unique_id}: {e}")
         return jsonify({'error': 'Database update failed.'}), 500
-    finally:
-        if conn: 
-            conn.close()
 
 # --- Utility endpoint: log plan selection summary to server terminal ---
 @actions_bp.route('/log_plan_summary/<unique_id>', methods=['POST'])
@@ -684,40 +496,162 @@ def log_plan_selection_summary(unique_id):
             pass
         return jsonify({'error': 'Failed to log plan summary.'}), 500
 
-# ---------------- Plan Summary JSON storage API ----------------
+# ---------------- Plan Summary storage API ----------------
 import os
 
-def _plan_summary_dir():
-    base = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'plan_summaries')
-    if not os.path.isdir(base):
-        try: os.makedirs(base, exist_ok=True)
-        except Exception: pass
-    return base
+# Stored in insurance_form.db (plan_summaries, migration 16). Each role's selection is its own
+# column, so PATCHes from different roles touch disjoint fields; row_version is exposed as the
+# ETag and checked against If-Match when the client sends one.
+PLAN_SUMMARY_FIELDS = {
+    'proposed': dict,
+    'agent_selected': list,
+    'supervisor_selected': list,
+    'client_agreed': list,
+}
+
+# Summaries used to be plan_summaries/<uid>.plans.json next to the package
+_LEGACY_PLAN_SUMMARY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'plan_summaries')
 
-def _plan_summary_path(uid: str) -> str:
+def _legacy_plan_summary_name(uid: str) -> str:
     safe = ''.join(c for c in str(uid) if c.isalnum() or c in ('-', '_'))
-    return os.path.join(_plan_summary_dir(), f"{safe}.plans.json")
+    return f"{safe}.plans.json"
 
-def _read_plan_summary(uid: str) -> dict:
-    path = _plan_summary_path(uid)
+def _legacy_plan_summary_path(uid: str) -> str:
+    return os.path.join(_LEGACY_PLAN_SUMMARY_DIR, _legacy_plan_summary_name(uid))
+
+def _legacy_plan_summary_names() -> set:
+    """File names still waiting in the legacy directory (one listing, empty once it is gone)."""
+    try:
+        return set(os.listdir(_LEGACY_PLAN_SUMMARY_DIR))
+    except OSError:
+        return set()
+
+def _empty_plan_summary(uid: str) -> dict:
+    return { 'unique_id': uid, 'proposed': {}, 'agent_selected': [], 'supervisor_selected': [], 'client_agreed': [], 'row_version': 0 }
+
+def _plan_summary_from_row(row) -> dict:
+    data = { 'unique_id': row['unique_id'], 'row_version': row['row_version'] }
+    for field, kind in PLAN_SUMMARY_FIELDS.items():
+        try:
+            value = json.loads(row[field])
+        except (TypeError, ValueError):
+            value = None
+        data[field] = value if isinstance(value, kind) else kind()
+    return data
+
+def _write_plan_summary(conn, uid: str, fields: dict, expected_version, updated_at: str):
+    """Write job: set the given plan summary columns. Returns ('ok', new_version) or
+    ('conflict', current_version) when expected_version no longer matches."""
+    row = conn.execute('SELECT row_version FROM plan_summaries WHERE unique_id = ?', (uid,)).fetchone()
+    current = row[0] if row else 0
+    if expected_version is not None and expected_version != current:
+        return 'conflict', current
+    if not fields and row:
+        return 'ok', current
+    values = [json.dumps(v, ensure_ascii=False, separators=(',', ':')) for v in fields.values()]
+    if row:
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        updated = conn.execute(
+            f'UPDATE plan_summaries SET {assignments}, row_version = row_version + 1, updated_at = ? '
+            'WHERE unique_id = ? AND row_version = ?',
+            (*values, updated_at, uid, current)
+        ).rowcount
+    else:
+        columns = ''.join(f'{field}, ' for field in fields)
+        updated = conn.execute(
+            f'INSERT OR IGNORE INTO plan_summaries ({columns}unique_id, row_version, updated_at) '
+            f'VALUES ({"?, " * len(fields)}?, 1, ?)',
+            (*values, uid, updated_at)
+        ).rowcount
+    if not updated:
+        return 'conflict', current
+    return 'ok', current + 1
+
+def _import_legacy_plan_summary(uid: str) -> bool:
+    """Move a pre-migration <uid>.plans.json into plan_summaries. Returns True if one was imported."""
+    path = _legacy_plan_summary_path(uid)
     if not os.path.isfile(path):
-        return { 'unique_id': uid, 'proposed': {}, 'agent_selected': [], 'supervisor_selected': [], 'client_agreed': [] }
+        return False
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return { 'unique_id': uid, 'proposed': {}, 'agent_selected': [], 'supervisor_selected': [], 'client_agreed': [] }
+            legacy = json.load(f)
+    except Exception as e:
+        current_app.logger.warning(f"Unreadable legacy plan summary {path}: {e}")
+        return False
+    fields = {f: legacy[f] for f, kind in PLAN_SUMMARY_FIELDS.items() if isinstance(legacy.get(f), kind)}
+    outcome, _ = run_write(_write_plan_summary, uid, fields, 0, datetime.now().isoformat())
+    if outcome == 'ok':
+        os.remove(path)
+        current_app.logger.info(f"Moved legacy plan summary for {uid} into plan_summaries")
+    return True
+
+def _read_plan_summaries(uids) -> dict:
+    """Plan summaries for many clients in one query (empty summaries for unknown ids)."""
+    uids = list(uids)
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            f"SELECT * FROM plan_summaries WHERE unique_id IN ({', '.join('?' for _ in uids)})", uids
+        ).fetchall() if uids else []
+    finally:
+        conn.close()
+    found = {row['unique_id']: _plan_summary_from_row(row) for row in rows}
+    missing = [uid for uid in uids if uid not in found]
+    legacy = _legacy_plan_summary_names() if missing else set()
+    if legacy and any(_import_legacy_plan_summary(uid) for uid in missing if _legacy_plan_summary_name(uid) in legacy):
+        return _read_plan_summaries(uids)
+    return {uid: found.get(uid) or _empty_plan_summary(uid) for uid in uids}
 
-def _atomic_write_json(path: str, data: dict):
-    tmp = path + '.tmp'
-    with open(tmp, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
+def _read_plan_summary(uid: str) -> dict:
+    return _read_plan_summaries([uid])[uid]
+
+def _plan_summary_response(data: dict, status: int = 200, row_version=None):
+    response = jsonify(data)
+    response.headers['ETag'] = _version_etag(data['row_version'] if row_version is None else row_version)
+    return response, status
 
 @actions_bp.route('/plan_summary/<unique_id>', methods=['GET'])
+@conditional(plan_summary_etag)
 def get_plan_summary(unique_id):
-    data = _read_plan_summary(unique_id)
-    return jsonify(data), 200
+    try:
+        data = _read_plan_summary(unique_id)
+    except Exception as e:
+        current_app.logger.error(f"Failed to read plan summary for {unique_id}: {e}")
+        return jsonify({ 'error': 'failed to read plan summary' }), 500
+    return _plan_summary_response(data)
+
+def _patch_plan_summary(unique_id: str, fields: dict, role: str, envelope: bool = False):
+    """Apply per-field updates honouring If-Match; responds with the updated summary and ETag
+    (wrapped as { success, data } when `envelope` is set)."""
+    if not fields:
+        return jsonify({ 'error': f"Nothing to update: expected one or more of {', '.join(PLAN_SUMMARY_FIELDS)}." }), 400
+    try:
+        expected_version = _parse_if_match(request.headers.get('If-Match'))
+    except ValueError:
+        return jsonify({ 'error': 'Invalid If-Match header.' }), 400
+    try:
+        outcome, row_version = run_write(_write_plan_summary, unique_id, fields, expected_version, datetime.now().isoformat())
+        data = _read_plan_summary(unique_id)
+    except Exception as e:
+        current_app.logger.error(f"Failed to patch {role} for {unique_id}: {e}")
+        return jsonify({ 'error': 'failed to write' }), 500
+    if outcome == 'conflict':
+        data['error'] = 'Plan summary was modified by someone else; reload and retry.'
+        return _plan_summary_response(data, 412)
+    if envelope:
+        return _plan_summary_response({ 'success': True, 'data': data }, row_version=data['row_version'])
+    data['success'] = True
+    return _plan_summary_response(data)
+
+@actions_bp.route('/plan_summary/<unique_id>', methods=['PATCH'])
+def patch_plan_summary(unique_id):
+    """Update any subset of proposed / agent_selected / supervisor_selected / client_agreed."""
+    payload = request.get_json(silent=True) or {}
+    fields = {f: payload[f] for f in PLAN_SUMMARY_FIELDS if f in payload}
+    invalid = [f for f, v in fields.items() if not isinstance(v, PLAN_SUMMARY_FIELDS[f])]
+    if not fields or invalid:
+        return jsonify({ 'error': f"Expected one or more of: {', '.join(PLAN_SUMMARY_FIELDS)} (proposed is an object, the rest are lists)." }), 400
+    return _patch_plan_summary(unique_id, fields, 'plan summary')
 
 @actions_bp.route('/plan_summary/<unique_id>/init_or_update', methods=['POST'])
 def init_or_update_plan_summary(unique_id):
@@ -727,58 +661,30 @@ def init_or_update_plan_summary(unique_id):
     payload = request.get_json(silent=True) or {}
     proposed = payload.get('proposed') or {}
     agent_selected = payload.get('agent_selected')
-    data = _read_plan_summary(unique_id)
+    fields = {}
     if isinstance(proposed, dict):
-        data['proposed'] = proposed
+        fields['proposed'] = proposed
     if isinstance(agent_selected, list):
-        data['agent_selected'] = agent_selected
-    try:
-        _atomic_write_json(_plan_summary_path(unique_id), data)
-        return jsonify({ 'success': True, 'data': data }), 200
-    except Exception as e:
-        current_app.logger.error(f"Failed to init/update plan summary for {unique_id}: {e}")
-        return jsonify({ 'error': 'failed to write plan summary' }), 500
+        fields['agent_selected'] = agent_selected
+    return _patch_plan_summary(unique_id, fields, 'init/update plan summary', envelope=True)
 
 @actions_bp.route('/plan_summary/<unique_id>/agent', methods=['PATCH'])
 def patch_plan_summary_agent(unique_id):
     payload = request.get_json(silent=True) or {}
-    selected = payload.get('agent_selected') or []
-    data = _read_plan_summary(unique_id)
-    data['agent_selected'] = list(selected)
-    try:
-        _atomic_write_json(_plan_summary_path(unique_id), data)
-        return jsonify({ 'success': True }), 200
-    except Exception as e:
-        current_app.logger.error(f"Failed to patch agent for {unique_id}: {e}")
-        return jsonify({ 'error': 'failed to write' }), 500
+    return _patch_plan_summary(unique_id, { 'agent_selected': list(payload.get('agent_selected') or []) }, 'agent')
 
 @actions_bp.route('/plan_summary/<unique_id>/supervisor', methods=['PATCH'])
 def patch_plan_summary_supervisor(unique_id):
     payload = request.get_json(silent=True) or {}
-    selected = payload.get('supervisor_selected') or []
-    data = _read_plan_summary(unique_id)
-    data['supervisor_selected'] = list(selected)
-    try:
-        _atomic_write_json(_plan_summary_path(unique_id), data)
-        return jsonify({ 'success': True }), 200
-    except Exception as e:
-        current_app.logger.error(f"Failed to patch supervisor for {unique_id}: {e}")
-        return jsonify({ 'error': 'failed to write' }), 500
+    return _patch_plan_summary(unique_id, { 'supervisor_selected': list(payload.get('supervisor_selected') or []) }, 'supervisor')
 
 @actions_bp.route('/plan_summary/<unique_id>/client', methods=['PATCH'])
 def patch_plan_summary_client(unique_id):
     payload = request.get_json(silent=True) or {}
-    selected = payload.get('client_agreed') or []
-    data = _read_plan_summary(unique_id)
-    data['client_agreed'] = list(selected)
-    try:
-        _atomic_write_json(_plan_summary_path(unique_id), data)
-        return jsonify({ 'success': True }), 200
-    except Exception as e:
-        current_app.logger.error(f"Failed to patch client for {unique_id}: {e}")
-        return jsonify({ 'error': 'failed to write' }), 500
+    return _patch_plan_summary(unique_id, { 'client_agreed': list(payload.get('client_agreed') or []) }, 'client')
 
 @actions_bp.route('/api/agent/active_plans', methods=['GET'])
+@conditional(plans_catalog_etag)
 def get_active_plans():
     """
     Get all active plans from the features table.
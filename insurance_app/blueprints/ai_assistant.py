@@ -2,12 +2,30 @@ from flask import Blueprint, request, jsonify, current_app
 import os
 import json
 import csv
-import google.generativeai as genai
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
+from ..llm_limiter import LLMOverloaded, llm_slot, overloaded_response
 
 ai_assistant_bp = Blueprint('ai_assistant', __name__)
 
+# One model per process and API key, shared by all request threads (SDK imported on first use)
+_MODEL = None
+_MODEL_KEY = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _justification_model(api_key):
+    global _MODEL, _MODEL_KEY
+    with _MODEL_LOCK:
+        if _MODEL is None or _MODEL_KEY != api_key:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            # Using the model ID specified by the user
+            _MODEL = genai.GenerativeModel("gemini-2.5-flash-lite")
+            _MODEL_KEY = api_key
+        return _MODEL
+
 @ai_assistant_bp.route('/ai/get-justification', methods=['POST'])
 def get_ai_justification():
     try:
@@ -31,10 +49,7 @@ def get_ai_justification():
         if not api_key:
             return jsonify({"error": f"API Key not found in {env_path}"}), 500
 
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        # Using the model ID specified by the user
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
+        model = _justification_model(api_key)
 
         # Define assets path relative to app root
         assets_dir = Path(current_app.root_path) / "ai_assets"
@@ -105,10 +120,13 @@ User Request: Please generate a detailed comparison highlight and justification
 """
         
         # 5. Get Response
-        response = model.generate_content(full_ai_prompt)
+        with llm_slot():
+            response = model.generate_content(full_ai_prompt)
         text_response = response.text.strip()
         
         return jsonify({"justification": text_response})
 
+    except LLMOverloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
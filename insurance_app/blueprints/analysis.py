@@ -1,18 +1,26 @@
 import os
 import json
+import numpy as np
 import pandas as pd
+from collections import defaultdict
 from itertools import chain
-from flask import Blueprint, jsonify, render_template, current_app
+from flask import Blueprint, jsonify, render_template, current_app, request
 from ..database import get_db_connection, get_derived_db_connection
 from ..analysis.get_plans import fetch_plans
+from ..conditional import conditional, plans_catalog_etag
+from ..resources import app_json, features_frame, cpu_slot
 from ..analysis.plan_analyzer import bundle_plans_by_score, analyze_plan_intersections
 from ..analysis.ailment_score import compute_member_aware_scores
 from ..analysis.plan_utils import is_plan_valid_for_family, get_plan_capacity
 from ..analysis.query_fetcher import generate, clean_and_parse
+from ..analysis.result_serializer import plans_to_records, paginate
+from ..analysis.trace import trace_stage, trace_frame, trace_data
+from ..analysis.justification_store import save_report_async
 
 analysis_bp = Blueprint('analysis_bp', __name__)
 
 @analysis_bp.route('/api/plans/all', methods=['GET'])
+@conditional(plans_catalog_etag)
 def get_all_plans():
     """Fetch all unique active plan names from the database."""
     try:
@@ -35,22 +43,6 @@ def get_all_plans():
         current_app.logger.error(f"Error fetching all plans: {e}")
         return jsonify({'error': 'Failed to fetch plans'}), 500
 
-def _clean_nan(data):
-    """Recursively converts NaN values in a nested data structure to None.
-    Retained for backward compatibility with modules that import this helper.
-    """
-    if isinstance(data, dict):
-        return {k: _clean_nan(v) for k, v in data.items()}
-    if isinstance(data, list):
-        return [_clean_nan(i) for i in data]
-    try:
-        # Use pandas to detect NaN/NaT safely where available
-        if isinstance(data, float) and pd.isna(data):
-            return None
-    except Exception:
-        pass
-    return data
-
 def _safe_int(val, default=0):
     try:
         if val is None or val == '':
@@ -161,15 +153,17 @@ def get_analyzed_plans(summary):
     analyzed_data = analyze_plan_intersections(initial_plans)
     return jsonify(analyzed_data), 200
 
-def _run_full_analysis(client_data, derived_features, current_app):
-    """Runs the entire plan analysis pipeline for a given client and returns the results."""
-    config_path = os.path.join(current_app.root_path, 'select_plans_config.json')
-    with open(config_path, 'r') as f:
-        select_config = json.load(f)
+def _run_full_analysis(client_data, derived_features, current_app, page=None, page_size=None):
+    """Runs the entire plan analysis pipeline for a given client and returns the results.
+    `page`/`page_size` paginate all_ranked_plans/browse_all; by default every plan is returned.
+    """
+    select_config = app_json('select_plans_config.json')
     adult_age_threshold = select_config.get('family_composition', {}).get('adult_age_threshold', 25)
 
-    initial_plans = fetch_plans(derived_features, client_data)
+    with trace_stage('fetch_plans'):
+        initial_plans = fetch_plans(derived_features, client_data)
     current_app.logger.info(f"Step 3: Fetched initial plan recommendations.")
+    trace_data('initial_plans', initial_plans)
 
     disease_specific_plans = set()
     general_plans_to_filter = set()
@@ -183,9 +177,8 @@ def _run_full_analysis(client_data, derived_features, current_app):
             disease_specific_plans.update(member_data['plans'])
 
     try:
-        derived_conn = get_derived_db_connection()
-        all_plans_df = pd.read_sql_query("SELECT * FROM features", derived_conn)
-        derived_conn.close()
+        with trace_stage('load_features'):
+            all_plans_df = features_frame()
         if 'Plan_Name' in all_plans_df.columns:
             all_plans_df.rename(columns={'Plan_Name': 'Plan Name'}, inplace=True)
     except Exception as e:
@@ -208,10 +201,12 @@ def _run_full_analysis(client_data, derived_features, current_app):
     plans_to_score_df = pd.concat([disease_specific_plans_df, valid_general_plans_df]).drop_duplicates(subset=['Plan Name']).reset_index(drop=True)
 
     if plans_to_score_df.empty:
-        return {'option_1_full_family_plans': {}, 'option_2_combination_plans': {}, 'all_ranked_plans': [], 'member_score_columns': []}
+        return {'option_1_full_family_plans': {}, 'option_2_combination_plans': {}, 'all_ranked_plans': [], 'member_score_columns': [],
+                'pagination': paginate([], page, page_size)[1]}
 
     # Continue with the rest of the analysis logic...
-    scored_plans_df = compute_member_aware_scores(plans_to_score_df, derived_features, current_app)
+    with trace_stage('score_plans'):
+        scored_plans_df = compute_member_aware_scores(plans_to_score_df, derived_features, current_app)
     ranked_plans_df = scored_plans_df.sort_values(by='AilmentScore', ascending=False)
 
     num_adults = _safe_int(derived_features.get('num_adults', 0), 0)
@@ -250,16 +245,20 @@ def _run_full_analysis(client_data, derived_features, current_app):
         'member_ages': member_ages
     }
     
-    analysis_results = bundle_plans_by_score(initial_plans, ranked_plans_df, family_structure)
+    with trace_stage('bundle_plans'):
+        analysis_results = bundle_plans_by_score(initial_plans, ranked_plans_df, family_structure)
     
     ranked_plans_df['Rank'] = range(1, len(ranked_plans_df) + 1)
     member_score_cols = [col for col in ranked_plans_df.columns if col.startswith('Score_') and col not in ['AilmentScore', 'Score_MemberAware']]
     
-    # CRITICAL FIX: Clean the final DataFrame for safe JSON serialization
-    # This is the true source of the NaN error.
-    ranked_plans_df = ranked_plans_df.where(pd.notnull(ranked_plans_df), None)
-    analysis_results['all_ranked_plans'] = ranked_plans_df.to_dict(orient='records')
+    trace_frame('ranked_plans', ranked_plans_df)
+
+    # Emit only the dashboard columns; NaN/NaT become None in the same pass
+    with trace_stage('serialize_results'):
+        ranked_records, pagination = paginate(plans_to_records(ranked_plans_df), page, page_size)
+    analysis_results['all_ranked_plans'] = ranked_records
     analysis_results['member_score_columns'] = member_score_cols
+    analysis_results['pagination'] = pagination
 
     # Backward compatibility for template keys
     # Analysis_Dashboard.html expects: browse_all, best_floater, combination_packages
@@ -270,14 +269,12 @@ def _run_full_analysis(client_data, derived_features, current_app):
     if 'combination_packages' not in analysis_results:
         analysis_results['combination_packages'] = analysis_results.get('option_2_combination_plans', {})
 
-    # Ensure the entire payload is JSON-safe (convert any remaining NaN/NaT to None)
-    analysis_results = _clean_nan(analysis_results)
-
-    # --- Generate and Print Justification Report ---
+    # --- Generate Justification Report ---
     # This now happens AFTER scoring to include score details.
-    justification_report = _generate_justification_report(
-        initial_plans, derived_features, ranked_plans_df, current_app
-    )
+    with trace_stage('justification_report'):
+        justification_report = _generate_justification_report(
+            initial_plans, derived_features, ranked_plans_df, current_app
+        )
 
     # --- Enhance the report with AI-generated narrative and reasoning ---
     # The AI is now responsible for creating the final JSON structure.
@@ -289,17 +286,11 @@ def _run_full_analysis(client_data, derived_features, current_app):
         'num_children': num_children
     }
 
-    # --- Save and Print Justification Report ---
-    reports_dir = os.path.join(current_app.root_path, '..', 'justification_reports')
-    os.makedirs(reports_dir, exist_ok=True)
-    report_path = os.path.join(reports_dir, f"{client_data.get('unique_id', 'report')}.json")
-    with open(report_path, 'w') as f:
-        json.dump(final_report, f, indent=4)
-
-    print("\n--- Plan Selection Justification Report ---")
-    print(f"(Report also saved to {report_path})")
-    print(json.dumps(final_report, indent=4))
-    print("--- End of Report ---\n")
+    # --- Save Justification Report (written by a background worker, off the request thread) ---
+    with trace_stage('queue_report'):
+        report_id = save_report_async(current_app, client_data.get('unique_id', 'report'), final_report)
+    current_app.logger.info(f"Justification report queued for {report_id}")
+    trace_data('justification_report', final_report)
 
     return analysis_results
 
@@ -317,50 +308,55 @@ def _get_ai_enhanced_report(justification_report, current_app):
         current_app.logger.error(f"Failed to generate narrative summary: {e}")
         return "Narrative summary could not be generated due to an error."
 
+def _build_plan_proposers_index(initial_plans, derived_features):
+    """Invert initial_plans into {plan_name: [{'name', 'disease_code'}, ...]} in one pass."""
+    index = defaultdict(list)
+    for member_key, member_data in initial_plans.items():
+        member_features = derived_features.get(member_key, {})
+        proposer = {
+            'name': member_features.get('name', member_key),
+            'disease_code': member_features.get('disease_code', 'GENERAL').upper(),
+        }
+        for plan_name in dict.fromkeys(member_data.get('plans', [])):
+            index[plan_name].append(proposer)
+    return index
+
 def _generate_justification_report(initial_plans, derived_features, scored_plans_df, current_app):
     """Generates a detailed report on why each plan was selected, including scores."""
-    justification_data = []
+    if scored_plans_df is None or scored_plans_df.empty:
+        return []
     member_score_cols = [col for col in scored_plans_df.columns if col.startswith('Score_') and col not in ['AilmentScore', 'Score_MemberAware']]
+    proposers_by_plan = _build_plan_proposers_index(initial_plans, derived_features)
+
+    # Column-wise preparation instead of per-row iterrows()
+    plan_names = scored_plans_df['Plan Name'].tolist()
+    policy_codes = scored_plans_df['Policy_Code'].astype(object).where(scored_plans_df['Policy_Code'].notna(), None).tolist()
+    is_floater = scored_plans_df['Policy_Code'].map(categorize_plan).eq('Family Floater')
+    family_fit = scored_plans_df['Family_Fit'].fillna(False).astype(bool) if 'Family_Fit' in scored_plans_df.columns else pd.Series(False, index=scored_plans_df.index)
+    family_fit_results = np.where(
+        is_floater, np.where(family_fit, "Passed", "Failed"), "Not Applicable (Individual Plan)"
+    ).tolist()
+    ailment_scores = (scored_plans_df['AilmentScore'] if 'AilmentScore' in scored_plans_df.columns else pd.Series(0.0, index=scored_plans_df.index)).round(2).tolist()
+    member_names = [col.replace('Score_', '') for col in member_score_cols]
+    member_score_rows = scored_plans_df[member_score_cols].round(2).values.tolist() if member_score_cols else [[] for _ in plan_names]
 
-    for _, plan_row in scored_plans_df.iterrows():
-        plan_name = plan_row['Plan Name']
-        
-        # Aggregate all proposers for the plan
-        proposers = []
-        for member_key, member_data in initial_plans.items():
-            if plan_name in member_data.get('plans', []):
-                disease_code = derived_features.get(member_key, {}).get('disease_code', 'GENERAL').upper()
-                proposer_name = derived_features.get(member_key, {}).get('name', member_key)
-                proposers.append({'name': proposer_name, 'disease_code': disease_code})
-
-        # Consolidate family fit check
-        plan_category = categorize_plan(plan_row['Policy_Code'])
-        if plan_category == 'Family Floater':
-            family_fit_result = "Passed" if plan_row.get('Family_Fit') else "Failed"
-        else:
-            family_fit_result = "Not Applicable (Individual Plan)"
-
-        # Get member specific scores
-        member_scores = {}
-        for col in member_score_cols:
-            member_name = col.replace('Score_', '')
-            member_scores[member_name] = round(plan_row.get(col, 0.0), 2)
-
+    justification_data = []
+    for plan_name, policy_code, fit_result, ailment_score, scores in zip(plan_names, policy_codes, family_fit_results, ailment_scores, member_score_rows):
+        proposers = proposers_by_plan.get(plan_name, [])
         # Format the proposer information for the report, excluding generic categories
         proposer_names = [p['name'] for p in proposers if p.get('name') and p['name'] != 'comprehensive_cover']
-        proposer_reasons = list(set([p['disease_code'] for p in proposers]))
+        proposer_reasons = list(dict.fromkeys(p['disease_code'] for p in proposers))
 
-        justification = {
+        justification_data.append({
             'plan_name': plan_name,
-            'policy_code': plan_row['Policy_Code'],
+            'policy_code': policy_code,
             'proposed_for': proposer_names,
             'reason_for_proposal': f"Proposed for members with needs: {', '.join(proposer_reasons)}",
-            'family_fit_check_result': family_fit_result,
-            'ailment_score': round(plan_row.get('AilmentScore', 0.0), 2),
-            'member_specific_scores': member_scores,
+            'family_fit_check_result': fit_result,
+            'ailment_score': ailment_score,
+            'member_specific_scores': dict(zip(member_names, scores)),
             'final_status': 'SCORED_AND_CONSIDERED_FOR_BUNDLING'
-        }
-        justification_data.append(justification)
+        })
 
     return justification_data
 
@@ -378,12 +374,18 @@ def get_proposed_plans(unique_id):
     current_app.logger.info(f"Step 1: Fetched client data for {unique_id}")
 
     # Generate derived features from the form summary
-    derived_text = generate(json.dumps(client_data))
-    derived_features = clean_and_parse(derived_text)
+    with trace_stage('generate_derived_features'):
+        derived_text = generate(json.dumps(client_data))
+        derived_features = clean_and_parse(derived_text)
     current_app.logger.info(f"Step 2: Generated derived features.")
+    trace_data('derived_features', derived_features)
 
     # Run the full analysis pipeline
-    analysis_results = _run_full_analysis(client_data, derived_features, current_app)
+    with cpu_slot():
+        analysis_results = _run_full_analysis(
+            client_data, derived_features, current_app,
+            page=request.args.get('page'), page_size=request.args.get('page_size')
+        )
 
     if analysis_results is None:
         return jsonify({'error': 'An error occurred during plan analysis.'}), 500
@@ -4,96 +4,55 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 import pytz
 import json
-from ..database import get_db_connection, get_application_status_db_connection, insert_application_status_log_entry
+from ..database import get_db_connection, get_application_status_db_connection, overlay_plan_meta, load_plan_meta
+from ..db_writer import run_write
+from ..conditional import conditional, submission_etag
 # Temporarily commented out to avoid import issues
 # from ..utils.timestamp_utils import get_current_timestamp_iso
 
 approvals_bp = Blueprint("approvals", __name__, url_prefix="/api/agent")
 
-# --- Helper: recompute and persist final_* rollup for a submission ---
-def _recompute_final_for(conn, unique_id: str):
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT supervisor_approval_status, supervisor_comments, supervisor_modified_at, supervisor_modified_by,
-               underwriter_status, underwriter_comments, underwriter_modified_at, underwriter_modified_by,
-               policy_outcome, policy_outcome_comment, policy_outcome_modified_at, policy_outcome_modified_by,
-               close_status, close_status_modified_at, close_status_modified_by, close_comments,
-               application_status, application_comments, application_modified_at, application_modified_by
-        FROM submissions WHERE unique_id = ?
-        """,
-        (unique_id,)
-    )
-    row = cur.fetchone()
-    if not row:
-        return
-    cols = [
-        "supervisor_approval_status","supervisor_comments","supervisor_modified_at","supervisor_modified_by",
-        "underwriter_status","underwriter_comments","underwriter_modified_at","underwriter_modified_by",
-        "policy_outcome","policy_outcome_comment","policy_outcome_modified_at","policy_outcome_modified_by",
-        "close_status","close_status_modified_at","close_status_modified_by","close_comments",
-        "application_status", "application_comments", "application_modified_at", "application_modified_by"
-    ]
-    d = dict(zip(cols, row))
-    candidates = []
-    for src, ts_key in (
-        ("supervisor", "supervisor_modified_at"),
-        ("underwriter", "underwriter_modified_at"),
-        ("policy", "policy_outcome_modified_at"),
-        ("application", "close_status_modified_at"),
-        ("application", "application_modified_at"), # Also consider its own last state
-    ):
-        ts = d.get(ts_key)
-        if ts and str(ts).strip():
-            candidates.append((str(ts), src))
-    if not candidates:
-        return
-    candidates.sort(key=lambda x: x[0])
-    latest_ts, latest_src = candidates[-1]
-    if latest_src == 'supervisor':
-        f_status = d.get('supervisor_approval_status')
-        f_comments = d.get('supervisor_comments')
-        f_by = d.get('supervisor_modified_by')
-    elif latest_src == 'underwriter':
-        f_status = d.get('underwriter_status')
-        f_comments = d.get('underwriter_comments')
-        f_by = d.get('underwriter_modified_by')
-    elif latest_src == 'policy':
-        f_status = d.get('policy_outcome')
-        f_comments = d.get('policy_outcome_comment')
-        f_by = d.get('policy_outcome_modified_by')
+# --- Fetch submission by unique_id ---
+def _submission_record(row, plan_meta=None) -> dict:
+    """Submission row with form_summary merged in, as returned by GET /submission/<id>.
+    plan_meta (see database.load_plan_meta) replaces form_summary.plan_meta."""
+    data = dict(row)
+    unique_id = data.get("unique_id")
+
+    # Parse and merge form_summary data
+    if data.get("form_summary"):
+        try:
+            form_data = json.loads(data["form_summary"])
+            if isinstance(form_data, dict):
+                if plan_meta is not None:
+                    overlay_plan_meta(form_data, plan_meta)
+                    data["form_summary"] = json.dumps(form_data)
+                # Merge form_summary data into the main data object
+                for key, value in form_data.items():
+                    if key not in data or data[key] is None:
+                        data[key] = value
+                current_app.logger.info(f"Successfully parsed form_summary for {unique_id}")
+            else:
+                current_app.logger.warning(f"form_summary is not a dict for {unique_id}")
+        except json.JSONDecodeError as e:
+            current_app.logger.error(f"Invalid JSON in form_summary for {unique_id}: {e}")
+            # Don't fail the request, just log the error
+            pass
     else:
-        f_status = d.get('close_status')
-        # Use close_comments for application_comments when application is latest
-        f_comments = d.get('close_comments')
-        f_by = d.get('close_status_modified_by')
-    # Debugger statement to log the change
-    current_app.logger.info(f"""\n
-    ================== STATUS CHANGE (id: {unique_id}) ==================
-    Source of Change: '{latest_src}'
-    Timestamp: {latest_ts}
-    ----------------------------------------------------------
-    New Application Status: '{f_status}'
-    New Application Comments: '{f_comments}'
-    New Application Modified By: '{f_by}'
-    ===============================================================\n    """)
-
-    cur.execute(
-        """
-        UPDATE submissions
-        SET application_status = ?, application_comments = ?, application_modified_at = ?, application_modified_by = ?
-        WHERE unique_id = ?
-        """,
-        (f_status, f_comments, latest_ts, f_by, unique_id)
-    )
-    # Append audit log (no overwrite) to Final_Status.db
-    try:
-        insert_application_status_log_entry(unique_id, f_status, f_comments, latest_ts, f_by, source=latest_src)
-    except Exception:
-        pass
+        current_app.logger.warning(f"Empty or null form_summary for {unique_id}")
+
+    # Ensure defaults exist
+    if data.get("underwriter_status") in (None, ""):
+        data["underwriter_status"] = ""
+
+    # Ensure client_review (checkbox state) default to 0 (unchecked)
+    if data.get("client_review") is None:
+        data["client_review"] = 0
+
+    return data
 
-# --- Fetch submission by unique_id ---
 @approvals_bp.route("/submission/<unique_id>", methods=["GET"])
+@conditional(submission_etag)
 def get_submission(unique_id):
     if not unique_id or not unique_id.strip():
         return jsonify({"error": "Invalid unique_id"}), 400
@@ -108,34 +67,7 @@ def get_submission(unique_id):
         if not row:
             return jsonify({"error": "Not found"}), 404
 
-        data = dict(row)
-
-        # Parse and merge form_summary data
-        if data.get("form_summary"):
-            try:
-                form_data = json.loads(data["form_summary"])
-                if isinstance(form_data, dict):
-                    # Merge form_summary data into the main data object
-                    for key, value in form_data.items():
-                        if key not in data or data[key] is None:
-                            data[key] = value
-                    current_app.logger.info(f"Successfully parsed form_summary for {unique_id}")
-                else:
-                    current_app.logger.warning(f"form_summary is not a dict for {unique_id}")
-            except json.JSONDecodeError as e:
-                current_app.logger.error(f"Invalid JSON in form_summary for {unique_id}: {e}")
-                # Don't fail the request, just log the error
-                pass
-        else:
-            current_app.logger.warning(f"Empty or null form_summary for {unique_id}")
-
-        # Ensure defaults exist
-        if data.get("underwriter_status") in (None, ""):
-            data["underwriter_status"] = ""
-
-        # Ensure client_review (checkbox state) default to 0 (unchecked)
-        if data.get("client_review") is None:
-            data["client_review"] = 0
+        data = _submission_record(row, load_plan_meta(conn, [unique_id]).get(unique_id, {}))
 
         # Ensure basic fields exist
         if not data.get("unique_id"):
@@ -166,17 +98,17 @@ def update_status():
     if actor != "client" and not status:
         return jsonify({"error": "Missing status for non-client actor"}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if actor not in ("client", "underwriter"):
+        return jsonify({"error": "Invalid actor"}), 400
 
-    try:
-        if actor == "client":
-            # Determine if this is a review-only update or a status change to Client_reviewed/Client_closed
-            incoming_status = (status or '').strip().lower() if status else ''
-            ist = pytz.timezone('Asia/Kolkata')
-            modified_at = datetime.now(ist).isoformat()
-            modified_by = request.headers.get('X-User-Id') or 'Unknown'
+    # Audit columns
+    ist = pytz.timezone('Asia/Kolkata')
+    modified_at = datetime.now(ist).isoformat()
+    modified_by = request.headers.get('X-User-Id') or 'Unknown'
 
+    def _apply(conn):
+        cursor = conn.cursor()
+        if actor == "client":
             # If client_review flag provided, persist it (independent of status)
             client_review = payload.get("client_review")
             client_agreed_plans = payload.get("client_agreed_plans")  # New field for selected plans
@@ -222,8 +154,7 @@ def update_status():
                          client_status, modified_at, modified_by, unique_id),
                     )
 
-           
-        elif actor == "underwriter":
+        else:
             # Allow underwriter only if client has reviewed (client_review = 1)
             cursor.execute("SELECT client_review FROM submissions WHERE unique_id = ?", (unique_id,))
             row = cursor.fetchone()
@@ -233,8 +164,7 @@ def update_status():
             except Exception:
                 client_review_flag = 0
             if client_review_flag != 1:
-                conn.close()
-                return jsonify({"error": "Underwriter cannot act before Client review"}), 400
+                return "Underwriter cannot act before Client review"
 
             # Map requested status to strict values as per requirement
             incoming = (status or '').strip().lower()
@@ -249,11 +179,6 @@ def update_status():
                 # fallback to raw status if another value is posted (e.g., changes_requested)
                 db_status = status
 
-            # Audit columns
-            ist = pytz.timezone('Asia/Kolkata')
-            modified_at = datetime.now(ist).isoformat()
-            modified_by = request.headers.get('X-User-Id') or 'Unknown'
-
             cursor.execute(
                 """
                 UPDATE submissions
@@ -266,137 +191,30 @@ def update_status():
                 (db_status, comment, modified_at, modified_by, unique_id),
             )
 
-        else:
-            conn.close()
-            return jsonify({"error": "Invalid actor"}), 400
+        return None
 
-        # Recompute final_* rollup if a status-changing actor updated
-        if actor in ('underwriter', 'client'):
-            try:
-                conn.commit() # Commit the first update
-                _recompute_final_for(conn, unique_id)
-                conn.commit() # Commit the second update
-            except Exception as e:
-                current_app.logger.error(f"Error during recompute for {unique_id}: {e}")
-                pass
+    try:
+        error = run_write(_apply)
     except Exception as e:
-        conn.rollback()
-        conn.close()
         return jsonify({"error": "Database error", "details": str(e)}), 500
+    if error:
+        return jsonify({"error": error}), 400
 
-    conn.close()
     return jsonify({"message": f"{actor.capitalize()} status updated successfully"})
 
 
 # --- Get member names for a submission ---
 @approvals_bp.route("/member_names/<unique_id>", methods=["GET"])
 def get_member_names(unique_id):
+    # submission_member_names is rebuilt by trigger on every write to member_name, policy_details,
+    # full_name or form_summary, already ordered and de-duplicated (see migrations._member_names)
     try:
         conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT form_summary, policy_details, member_name FROM submissions WHERE unique_id = ?", (unique_id,))
-        row = cur.fetchone()
+        rows = conn.execute(
+            "SELECT name FROM submission_member_names WHERE unique_id = ? ORDER BY position", (unique_id,)
+        ).fetchall()
         conn.close()
-        if not row:
-            return jsonify([])
-
-        names = []
-
-        def push(val):
-            if val is None:
-                return
-            s = str(val).strip()
-            if not s:
-                return
-            # allow comma-separated
-            parts = [p.strip() for p in s.split(',') if p and p.strip()]
-            if not parts:
-                return
-            names.extend(parts)
-
-        # include saved single member_name field if present
-        try:
-            push(row[2])
-        except Exception:
-            pass
-
-        # parse policy_details rows if present
-        try:
-            pd = row[1]
-            if isinstance(pd, (bytes, bytearray)):
-                pd = pd.decode('utf-8', errors='ignore')
-            if isinstance(pd, str) and pd.strip():
-                import json
-                try:
-                    pd = json.loads(pd)
-                except Exception:
-                    pd = None
-            if isinstance(pd, dict):
-                rows = pd.get('rows')
-                if isinstance(rows, list):
-                    for r in rows:
-                        try:
-                            push(r.get('member_name'))
-                        except Exception:
-                            pass
-        except Exception:
-            pass
-
-        # parse form_summary looking for any name-like fields
-        try:
-            fs = row[0]
-            if isinstance(fs, (bytes, bytearray)):
-                fs = fs.decode('utf-8', errors='ignore')
-            obj = None
-            if isinstance(fs, str) and fs.strip():
-                import json
-                try:
-                    obj = json.loads(fs)
-                except Exception:
-                    obj = None
-            elif isinstance(fs, dict):
-                obj = fs
-            if isinstance(obj, dict):
-                seen = set()
-                def collect(o):
-                    if id(o) in seen:
-                        return
-                    seen.add(id(o))
-                    if isinstance(o, dict):
-                        for k, v in o.items():
-                            lk = str(k).lower()
-                            # direct string under any key containing 'name' or 'member'
-                            if isinstance(v, str) and v.strip() and ('name' in lk or 'member' in lk):
-                                push(v)
-                            # arrays possibly containing strings or objects
-                            if isinstance(v, list):
-                                for it in v:
-                                    if isinstance(it, str) and it.strip():
-                                        push(it)
-                                    else:
-                                        collect(it)
-                            # nested objects
-                            if isinstance(v, dict):
-                                # common fields
-                                maybe = v.get('name') or v.get('member_name') or v.get('full_name') or v.get('applicant_name') or v.get('proposer_name') or v.get('primary_contact_name')
-                                if maybe:
-                                    push(maybe)
-                                collect(v)
-                    elif isinstance(o, list):
-                        for it in o:
-                            collect(it)
-                collect(obj)
-        except Exception:
-            pass
-
-        # de-duplicate preserving order
-        out = []
-        seen = set()
-        for n in names:
-            if n and n not in seen:
-                seen.add(n)
-                out.append(n)
-        return jsonify(out)
+        return jsonify([r[0] for r in rows])
     except Exception as e:
         try:
             conn.close()
@@ -425,16 +243,14 @@ def set_policy_outcome():
     if norm == "policy denied" and not (comment and str(comment).strip()):
         return jsonify({"error": "Comment required when Policy Denied"}), 400
 
-    conn = get_db_connection()
-    cur = conn.cursor()
     ist = pytz.timezone('Asia/Kolkata')
     modified_at = datetime.now(ist).isoformat()
     modified_by = request.headers.get('X-User-Id') or 'Unknown'
-    try:
-        # Map to canonical underscore values for storage
-        stored_outcome = 'Policy_Created' if norm == 'policy created' else 'Policy_Denied'
+    # Map to canonical underscore values for storage
+    stored_outcome = 'Policy_Created' if norm == 'policy created' else 'Policy_Denied'
 
-        cur.execute(
+    def _apply(conn):
+        conn.execute(
             """
             UPDATE submissions
             SET policy_outcome = ?,
@@ -445,19 +261,11 @@ def set_policy_outcome():
             """,
             (stored_outcome, comment, modified_at, modified_by, unique_id)
         )
-        # Recompute final_* after policy outcome change
-        try:
-            conn.commit() # Commit the first update
-            _recompute_final_for(conn, unique_id)
-            conn.commit() # Commit the second update
-        except Exception as e:
-            current_app.logger.error(f"Error during recompute for {unique_id}: {e}")
-            pass
+
+    try:
+        run_write(_apply)
     except Exception as e:
-        conn.rollback()
-        conn.close()
         return jsonify({"error": "Database error", "details": str(e)}), 500
-    conn.close()
     return jsonify({"message": "Policy outcome saved"})
 
 
@@ -496,13 +304,12 @@ def set_policy_details():
     except Exception:
         end_date = None
 
-    conn = get_db_connection()
-    cur = conn.cursor()
     ist = pytz.timezone('Asia/Kolkata')
     modified_at = datetime.now(ist).isoformat()
     modified_by = request.headers.get('X-User-Id') or 'Unknown'
-    try:
-        cur.execute(
+
+    def _apply(conn):
+        conn.execute(
             """
             UPDATE submissions
             SET policy_number = ?,
@@ -535,30 +342,24 @@ def set_policy_details():
                 unique_id,
             )
         )
-        # Recompute final_* after application status change
-        try:
-            conn.commit() # Commit the first update
-            _recompute_final_for(conn, unique_id)
-            conn.commit() # Commit the second update
-        except Exception as e:
-            current_app.logger.error(f"Error during recompute for {unique_id}: {e}")
-            pass
+
+    try:
+        run_write(_apply)
     except Exception as e:
-        conn.rollback()
-        conn.close()
         return jsonify({"error": "Database error", "details": str(e)}), 500
-    conn.close()
     return jsonify({"message": "Policy details saved", "policy_end_date": end_date})
 
 # --- Read Final Status change history ---
+HISTORY_COLUMNS = 'id, unique_id, application_status, application_comments, application_modified_at, application_modified_by, source, created_at'
+
 @approvals_bp.route("/application_status_history/<unique_id>", methods=["GET"])
 def get_application_status_history(unique_id):
     try:
         conn = get_application_status_db_connection()
         cur = conn.cursor()
         cur.execute(
-            """
-            SELECT id, unique_id, application_status, application_comments, application_modified_at, application_modified_by, source, created_at
+            f"""
+            SELECT {HISTORY_COLUMNS}
             FROM application_status_log
             WHERE unique_id = ?
             ORDER BY id ASC
@@ -0,0 +1,122 @@
+from flask import Blueprint, request, jsonify, current_app
+from ..database import get_db_connection, get_application_status_db_connection, load_plan_meta
+from .approvals import _submission_record, HISTORY_COLUMNS
+from .submission import _submission_meta
+from .actions import _read_plan_summaries
+
+batch_bp = Blueprint('batch_bp', __name__)
+
+# One request for what the dashboards otherwise fetch per application:
+#   submission   -> GET /api/agent/submission/<id>
+#   meta         -> GET /submission/<id>/meta
+#   comments     -> GET /submission/<id>/comments
+#   history      -> GET /api/agent/application_status_history/<id>
+#   plan_summary -> GET /plan_summary/<id>
+# Each facet is a single IN-list query over all requested ids.
+FACETS = ('submission', 'meta', 'comments', 'history', 'plan_summary')
+MAX_BATCH_IDS = 200
+
+
+def _placeholders(ids) -> str:
+    return ', '.join('?' for _ in ids)
+
+
+def _load_submissions(ids, facets, results):
+    conn = get_db_connection()
+    try:
+        # Without the submission/meta facets the rows only establish which ids exist
+        columns = '*' if facets & {'submission', 'meta'} else 'unique_id'
+        rows = conn.execute(f'SELECT {columns} FROM submissions WHERE unique_id IN ({_placeholders(ids)})', ids).fetchall()
+        plan_meta = load_plan_meta(conn, ids) if 'submission' in facets else {}
+    finally:
+        conn.close()
+    found = set()
+    for row in rows:
+        uid = row['unique_id']
+        found.add(uid)
+        if 'submission' in facets:
+            results[uid]['submission'] = _submission_record(row, plan_meta.get(uid, {}))
+        if 'meta' in facets:
+            results[uid]['meta'] = _submission_meta(row)
+    return found
+
+
+def _load_comments(ids, results):
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            f'SELECT unique_id, modifier, comment, timestamp FROM comments_noted '
+            f'WHERE unique_id IN ({_placeholders(ids)}) ORDER BY unique_id, timestamp DESC',
+            ids
+        ).fetchall()
+    finally:
+        conn.close()
+    for row in rows:
+        results[row['unique_id']]['comments'].append(
+            {'modifier': row['modifier'], 'comment': row['comment'], 'timestamp': row['timestamp']}
+        )
+
+
+def _load_history(ids, results):
+    conn = get_application_status_db_connection()
+    try:
+        rows = conn.execute(
+            f'SELECT {HISTORY_COLUMNS} FROM application_status_log '
+            f'WHERE unique_id IN ({_placeholders(ids)}) ORDER BY id ASC',
+            ids
+        ).fetchall()
+    finally:
+        conn.close()
+    for row in rows:
+        results[row['unique_id']]['history'].append(dict(row))
+
+
+@batch_bp.route('/api/submissions/batch', methods=['POST'])
+def get_submissions_batch():
+    """Return several facets for many submissions in one response.
+
+    Body: { "unique_ids": [...], "facets": ["submission", "meta", "comments", "history", "plan_summary"] }
+    (facets defaults to all). Response: { "results": { <id>: { <facet>: ... } }, "missing": [...] };
+    each facet has the same shape as its single-item endpoint, submission/meta are null for
+    missing ids.
+    """
+    payload = request.get_json(silent=True) or {}
+    raw_ids = payload.get('unique_ids')
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({'error': 'unique_ids must be a non-empty list.'}), 400
+    ids = list(dict.fromkeys(str(uid).strip() for uid in raw_ids if str(uid).strip()))
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'error': f'At most {MAX_BATCH_IDS} unique_ids per request.'}), 400
+    facets = payload.get('facets') or list(FACETS)
+    if not isinstance(facets, list) or not all(isinstance(f, str) for f in facets):
+        return jsonify({'error': 'facets must be a list of strings.'}), 400
+    unknown = [f for f in facets if f not in FACETS]
+    if unknown:
+        return jsonify({'error': f"Unknown facet(s): {', '.join(map(str, unknown))}"}), 400
+    facets = set(facets)
+
+    results = {uid: {} for uid in ids}
+    for uid in ids:
+        if 'submission' in facets:
+            results[uid]['submission'] = None
+        if 'meta' in facets:
+            results[uid]['meta'] = None
+        if 'comments' in facets:
+            results[uid]['comments'] = []
+        if 'history' in facets:
+            results[uid]['history'] = []
+
+    try:
+        found = _load_submissions(ids, facets, results)
+        if 'comments' in facets:
+            _load_comments(ids, results)
+        if 'history' in facets:
+            _load_history(ids, results)
+        if 'plan_summary' in facets:
+            for uid, summary in _read_plan_summaries(ids).items():
+                results[uid]['plan_summary'] = summary
+    except Exception as e:
+        current_app.logger.error(f"Batch read failed for {len(ids)} submissions: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+    return jsonify({'results': results, 'missing': [uid for uid in ids if uid not in found]}), 200
@@ -1,28 +1,74 @@
+import os
 import json
 import pandas as pd
-from flask import Blueprint, jsonify, render_template, current_app
+from flask import Blueprint, jsonify, render_template, current_app, request
 from collections import Counter
-from ..database import get_db_connection, get_user_db_connection, get_derived_db_connection
+from ..database import get_db_connection, get_user_db_connection, get_derived_db_connection, get_connection_stats
+from ..db_writer import get_writer_stats
+from ..llm_limiter import get_limiter_stats
+from ..listing import query_submissions, parse_fields, ListingError, NEXT_CURSOR_HEADER
+from ..conditional import conditional, clients_etag, users_etag
+from ..resources import features_frame, cpu_slot
 from itertools import chain
 from ..analysis.get_plans import fetch_plans
 from ..analysis.ailment_score import compute_member_aware_scores
 from ..analysis.plan_analyzer import bundle_plans_by_score
 from ..analysis.query_fetcher import generate, clean_and_parse
-from .analysis import _clean_nan
+from ..analysis.result_serializer import plans_to_records, paginate
+from ..analysis.trace import trace_stage, trace_data
 
 dashboard_bp = Blueprint('dashboard_bp', __name__)
 
+def _user_counts(conn) -> dict:
+    """Agent / Supervisor counts from users.db's trigger-maintained counters (see init_user_db)."""
+    try:
+        counts = dict(conn.execute('SELECT name, count FROM dashboard_counters').fetchall())
+    except Exception:
+        counts = {}
+    for table in ('Agent', 'Supervisor'):
+        if table not in counts:
+            counts[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    return counts
+
+def _submission_counts(conn, agent=None) -> dict:
+    """Per-status / per-agent submission tallies summed from dashboard_counters (a few rows)."""
+    sql = 'SELECT agent, application_status, supervisor_approval_status, count FROM dashboard_counters'
+    rows = conn.execute(sql + ' WHERE agent = ?', (agent,)).fetchall() if agent else conn.execute(sql).fetchall()
+    by_status, by_application, by_supervisor, by_agent = Counter(), Counter(), Counter(), Counter()
+    for r in rows:
+        # Effective status as the dashboards show it: application_status, else the supervisor status
+        by_status[r['application_status'] or r['supervisor_approval_status'] or 'OPEN'] += r['count']
+        by_application[r['application_status']] += r['count']
+        by_supervisor[r['supervisor_approval_status']] += r['count']
+        by_agent[r['agent']] += r['count']
+    return {
+        'total': sum(by_agent.values()),
+        'by_status': dict(by_status),
+        'by_application_status': dict(by_application),
+        'by_supervisor_status': dict(by_supervisor),
+        'by_agent': dict(by_agent),
+    }
+
 @dashboard_bp.route('/stats', methods=['GET'])
 def get_stats():
+    """Dashboard tiles. `?agent=<id>` limits the `submissions` breakdown to one agent."""
     user_conn = get_user_db_connection()
-    cursor = user_conn.cursor()
-    agent_count = cursor.execute('SELECT COUNT(*) FROM Agent').fetchone()[0]
-    supervisor_count = cursor.execute('SELECT COUNT(*) FROM Supervisor').fetchone()[0]
+    user_counts = _user_counts(user_conn)
     user_conn.close()
+    agent = (request.args.get('agent') or '').strip()
     conn = get_db_connection()
-    client_count = conn.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+    submissions = _submission_counts(conn, agent or None)
+    if agent:
+        client_count = conn.execute('SELECT COALESCE(SUM(count), 0) FROM dashboard_counters').fetchone()[0]
+    else:
+        client_count = submissions['total']
     conn.close()
-    return jsonify({'agents': agent_count, 'supervisors': supervisor_count, 'clients': client_count}), 200
+    return jsonify({
+        'agents': user_counts['Agent'],
+        'supervisors': user_counts['Supervisor'],
+        'clients': client_count,
+        'submissions': submissions
+    }), 200
 
 @dashboard_bp.route('/agents', methods=['GET'])
 def list_agents():
@@ -39,6 +85,7 @@ def list_agents():
             conn.close()
 
 @dashboard_bp.route('/supervisors', methods=['GET'])
+@conditional(users_etag)
 def list_supervisors():
     try:
         conn = get_user_db_connection()
@@ -58,38 +105,48 @@ def list_supervisors():
         if conn:
             conn.close()
 
+# Projection for /clients: response field -> SQL expression
+CLIENT_FIELDS = {
+    'name': 'c.name',
+    'unique_id': 's.unique_id',
+    'agent': 's.agent',
+    'supervisor_status': 's.supervisor_approval_status',
+    'supervisor_modified_by': 's.supervisor_modified_by',
+    'application_status': 's.application_status',
+    'phone': 'c.phone',
+    'timestamp': 's.timestamp',
+}
+DEFAULT_CLIENT_FIELDS = ['name', 'unique_id', 'agent', 'supervisor_status', 'supervisor_modified_by', 'application_status', 'phone']
+
+def _client_record(row, fields):
+    record = {}
+    for f in fields:
+        val = row[f]
+        if f == 'supervisor_status':
+            # Keep supervisor_status lowercased for backward compatibility
+            val = (val or '').lower()
+        elif f == 'phone':
+            val = val or ''
+        record[f] = val
+    return record
+
 @dashboard_bp.route('/clients', methods=['GET'])
+@conditional(clients_etag)
 def list_clients():
+    """Client directory. Accepts agent, status, from, to, q, sort, order, fields, limit and cursor;
+    with limit set the next page's cursor is returned in the X-Next-Cursor header."""
+    conn = None
     try:
+        fields = parse_fields(request.args.get('fields'), CLIENT_FIELDS, DEFAULT_CLIENT_FIELDS)
         conn = get_db_connection()
-        rows = conn.execute('''
-            SELECT 
-                COALESCE(full_name, json_extract(form_summary, '$.primaryContact.applicant_name')) AS name,
-                unique_id,
-                agent,
-                supervisor_approval_status,
-                supervisor_modified_by,
-                application_status,
-                COALESCE(
-                    json_extract(form_summary, '$.primaryContact.phone'),
-                    json_extract(form_summary, '$.phone'),
-                    json_extract(form_summary, '$.primaryContact.mobile'),
-                    json_extract(form_summary, '$.mobile')
-                ) AS phone
-            FROM submissions
-            ORDER BY timestamp DESC
-        ''').fetchall()
-        # Expose application_status directly; keep supervisor_status (lowercased) for backward compatibility
-        result = [{
-            'name': r['name'],
-            'unique_id': r['unique_id'],
-            'agent': r['agent'],
-            'supervisor_status': (r['supervisor_approval_status'] or '').lower(),
-            'supervisor_modified_by': r['supervisor_modified_by'],
-            'application_status': r['application_status'],
-            'phone': r['phone'] or ''
-        } for r in rows]
-        return jsonify(result), 200
+        select_sql = ', '.join(f'{CLIENT_FIELDS[f]} AS {f}' for f in fields)
+        rows, next_cursor = query_submissions(conn, request.args, select_sql)
+        response = jsonify([_client_record(r, fields) for r in rows])
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response, 200
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error listing clients: {e}")
         return jsonify({'error': 'Failed to fetch clients'}), 500
@@ -131,10 +188,13 @@ def get_client_details(unique_id):
     client_data = json.loads(row['form_summary'])
     chosen_plans = json.loads(row['plans_chosen']) if row['plans_chosen'] else []
     supervisor_status = (row['supervisor_approval_status'] or '').upper() if 'supervisor_approval_status' in row.keys() else ''
-    derived_text = generate(json.dumps(client_data))
-    derived_features = clean_and_parse(derived_text)
+    with trace_stage('generate_derived_features'):
+        derived_text = generate(json.dumps(client_data))
+        derived_features = clean_and_parse(derived_text)
+    trace_data('derived_features', derived_features)
     # fetch_plans expects (summary, client_data)
-    initial_plans = fetch_plans(derived_features, client_data)
+    with trace_stage('fetch_plans'):
+        initial_plans = fetch_plans(derived_features, client_data)
 
     # Build family structure from derived features
     def _is_member(k, v):
@@ -167,12 +227,9 @@ def get_client_details(unique_id):
     }
     union_of_plans = set(chain.from_iterable(p['plans'] for p in initial_plans.values() if p.get('plans')))
     if not union_of_plans:
-        safe_payload = _clean_nan({'summary': client_data, 'analysis': {'option_1_full_family_plans': {}, 'option_2_combination_plans': {'individual_plans': {}, 'combo_plans': {}}}, 'ranked_plans': [], 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': {}})
-        return jsonify(safe_payload)
+        return jsonify({'summary': client_data, 'analysis': {'option_1_full_family_plans': {}, 'option_2_combination_plans': {'individual_plans': {}, 'combo_plans': {}}}, 'ranked_plans': [], 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': {}})
     try:
-        derived_conn = get_derived_db_connection()
-        all_plans_df = pd.read_sql_query("SELECT * FROM features", derived_conn)
-        derived_conn.close()
+        all_plans_df = features_frame()
         plans_to_score_df = all_plans_df[all_plans_df['Plan_Name'].isin(union_of_plans)].copy()
         if 'Plan_Name' in plans_to_score_df.columns:
             plans_to_score_df.rename(columns={'Plan_Name': 'Plan Name'}, inplace=True)
@@ -196,28 +253,49 @@ def get_client_details(unique_id):
     except Exception as e:
         return jsonify({'error': 'Could not load plan features from the database.'}), 500
     if plans_to_score_df.empty:
-        safe_payload = _clean_nan({'summary': client_data, 'analysis': {'option_1_full_family_plans': {}, 'option_2_combination_plans': {'individual_plans': {}, 'combo_plans': {}}}, 'ranked_plans': [], 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': initial_plans})
-        return jsonify(safe_payload)
+        return jsonify({'summary': client_data, 'analysis': {'option_1_full_family_plans': {}, 'option_2_combination_plans': {'individual_plans': {}, 'combo_plans': {}}}, 'ranked_plans': [], 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': initial_plans})
     # compute_member_aware_scores expects (plans_df, derived_features, app)
-    scored_plans_df = compute_member_aware_scores(plans_to_score_df, derived_features, current_app)
-    # bundle_plans_by_score expects a family_structure dict
-    analysis_results = bundle_plans_by_score(initial_plans, scored_plans_df, family_structure)
+    with cpu_slot():
+        with trace_stage('score_plans'):
+            scored_plans_df = compute_member_aware_scores(plans_to_score_df, derived_features, current_app)
+        # bundle_plans_by_score expects a family_structure dict
+        with trace_stage('bundle_plans'):
+            analysis_results = bundle_plans_by_score(initial_plans, scored_plans_df, family_structure)
     ranked_plans_df = scored_plans_df.sort_values(by=['Score_MemberAware'], ascending=False)
     ranked_plans_df['Rank'] = range(1, len(ranked_plans_df) + 1)
-    # Replace NaN with None to produce valid JSON
-    safe_ranked = ranked_plans_df.where(pd.notnull(ranked_plans_df), None)
-    ranked_plans_json = safe_ranked.to_dict(orient='records')
-    safe_payload = _clean_nan({'summary': client_data, 'analysis': analysis_results, 'ranked_plans': ranked_plans_json, 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': initial_plans})
-    return jsonify(safe_payload)
+    # Project to the dashboard columns (NaN -> None in the same pass) and paginate on request
+    ranked_plans_json, pagination = paginate(
+        plans_to_records(ranked_plans_df), request.args.get('page'), request.args.get('page_size')
+    )
+    return jsonify({'summary': client_data, 'analysis': analysis_results, 'ranked_plans': ranked_plans_json, 'pagination': pagination, 'chosen_plans': chosen_plans, 'supervisor_status': supervisor_status, 'proposed_plans': initial_plans})
+
+# Heavy columns are only returned when asked for explicitly via ?fields=
+SUBMISSION_HEAVY_FIELDS = {'form_summary', 'policy_details', 'plans_chosen', 'supervisor_selected_plans', 'Client_Agreed_Plans'}
+SUBMISSIONS_DEFAULT_LIMIT = 100
 
 @dashboard_bp.route('/submissions', methods=['GET'])
 def list_submissions():
-    conn = get_db_connection()
-    rows = conn.execute('SELECT * FROM submissions').fetchall()
-    conn.close()
-    submissions = [dict(row) for row in rows]
-    current_app.logger.info("Listing %d submissions", len(submissions))
-    return jsonify(submissions), 200
+    """Submission rows, paginated (default 100 per page, next cursor in X-Next-Cursor). Same filters
+    as /clients; fields= selects any submissions column, including the JSON blobs."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        columns = [r[1] for r in conn.execute('PRAGMA table_info(submissions)').fetchall()]
+        default_fields = [c for c in columns if c not in SUBMISSION_HEAVY_FIELDS]
+        fields = parse_fields(request.args.get('fields'), set(columns), default_fields)
+        select_sql = ', '.join(f's."{f}"' for f in fields)
+        rows, next_cursor = query_submissions(conn, request.args, select_sql, default_limit=SUBMISSIONS_DEFAULT_LIMIT)
+        submissions = [{f: row[f] for f in fields} for row in rows]
+        current_app.logger.info("Listing %d submissions", len(submissions))
+        response = jsonify(submissions)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response, 200
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        if conn:
+            conn.close()
 
 from .analysis import _run_full_analysis
 
@@ -239,7 +317,8 @@ def plan_analysis_dashboard():
         derived_features = clean_and_parse(derived_text)
         
         # Run the full analysis
-        analysis_result = _run_full_analysis(client_data, derived_features, current_app)
+        with cpu_slot():
+            analysis_result = _run_full_analysis(client_data, derived_features, current_app)
         if analysis_result:
             all_clients_analysis.append({
                 'client_name': client_name,
@@ -257,51 +336,22 @@ def plan_analysis_dashboard():
 
 @dashboard_bp.route('/api/admin/plans_in_use', methods=['GET'])
 def get_plans_in_use():
-    """Get count of unique plans that have been used in created policies."""
+    """Get count of unique plans that have been used in created policies.
+
+    Reads policy_plan_usage, which triggers keep current from policy_details / policy_name /
+    close_status; `usage` carries the per-plan policy count and last use.
+    """
     try:
         conn = get_db_connection()
-        
-        # Query to find all unique plan names from policy_details (created policies only)
-        query = """
-        SELECT DISTINCT plan_name FROM (
-            -- From policy_details JSON (actual created policies)
-            SELECT json_extract(json_each.value, '$.plan') as plan_name
-            FROM submissions, json_each(json_extract(policy_details, '$.rows'))
-            WHERE policy_details IS NOT NULL 
-            AND policy_details != ''
-            AND close_status = 'Policy_Created'
-            
-            UNION
-            
-            -- From policy_name column (legacy/simple policies)
-            SELECT policy_name as plan_name
-            FROM submissions
-            WHERE policy_name IS NOT NULL 
-            AND policy_name != ''
-            AND close_status = 'Policy_Created'
-        ) WHERE plan_name IS NOT NULL AND plan_name != ''
-        """
-        
-        cursor = conn.cursor()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Count unique plans
-        unique_plans = set()
-        for row in results:
-            plan_name = row[0]
-            if plan_name:
-                # Handle cases where plan names might include member prefixes like "John - Plan Name"
-                # Extract just the plan name part
-                if ' - ' in plan_name:
-                    plan_name = plan_name.split(' - ', 1)[1]
-                unique_plans.add(plan_name.strip())
-        
+        rows = conn.execute(
+            'SELECT plan_name, policies, last_used_at FROM policy_plan_usage ORDER BY plan_name'
+        ).fetchall()
         conn.close()
-        
+
         return jsonify({
-            'count': len(unique_plans),
-            'plans': sorted(list(unique_plans))
+            'count': len(rows),
+            'plans': [r['plan_name'] for r in rows],
+            'usage': [dict(r) for r in rows]
         }), 200
         
     except Exception as e:
@@ -309,4 +359,17 @@ def get_plans_in_use():
         return jsonify({
             'count': 0,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@dashboard_bp.route('/api/admin/db_stats', methods=['GET'])
+def get_db_stats():
+    """Per-database counters of SQLite connections opened, reused and closed by this worker,
+    plus group-commit counters from the write queue, model call admission counters and the
+    app's startup timings."""
+    return jsonify({
+        'pid': os.getpid(),
+        'connections': get_connection_stats(),
+        'writer': get_writer_stats(),
+        'llm': get_limiter_stats(),
+        'startup': current_app.extensions.get('startup_timings'),
+    }), 200
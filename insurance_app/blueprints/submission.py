@@ -1,24 +1,115 @@
+import io
 import json
+import base64
+import binascii
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app
-from ..database import get_db_connection
+from flask import Blueprint, request, jsonify, current_app, send_file, url_for
+from .. import blob_store
+from ..database import get_db_connection, normalize_email, normalize_phone, load_plan_meta, overlay_plan_meta
+from ..db_writer import run_write
+from ..conditional import conditional, submission_etag
 from ..analysis.query_fetcher import generate, clean_and_parse
+from ..llm_limiter import LLMOverloaded, overloaded_response
 from ..analysis.get_plans import fetch_plans
 # Temporarily commented out to avoid import issues
 # from ..utils.timestamp_utils import get_current_timestamp_iso, get_current_timestamp_formatted
 
 submission_bp = Blueprint('submission_bp', __name__)
 
+def _version_etag(row_version) -> str:
+    return f'"v{row_version}"'
+
+def _parse_if_match(header):
+    """Return the row_version named by an If-Match header, None when absent or '*'."""
+    if not header or header.strip() == '*':
+        return None
+    tag = header.split(',')[0].strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if tag.startswith('v'):
+        tag = tag[1:]
+    return int(tag)
+
 @submission_bp.route('/submission/<unique_id>', methods=['GET'])
+@conditional(submission_etag)
 def get_submission(unique_id):
     conn = get_db_connection()
-    row = conn.execute('SELECT form_summary FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
+    row = conn.execute('SELECT form_summary, row_version FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
+    plan_meta = load_plan_meta(conn, [unique_id]).get(unique_id, {}) if row else {}
     conn.close()
     if row:
         data = json.loads(row['form_summary'])
-        return jsonify(data), 200
+        if isinstance(data, dict):
+            overlay_plan_meta(data, plan_meta)
+        response = jsonify(data)
+        response.headers['ETag'] = _version_etag(row['row_version'])
+        return response, 200
     return jsonify({'error': 'Submission not found.'}), 404
 
+def _apply_merge_patch(conn, unique_id, patch_json, expected_version, timestamp):
+    """Write job: merge-patch form_summary in one statement. Returns the new row_version, or
+    ('missing', None) / ('conflict', current_version) when nothing was updated."""
+    cur = conn.execute(
+        '''
+        UPDATE submissions
+        SET form_summary = patched.fs,
+            full_name = COALESCE(json_extract(patched.fs, '$.applicant_name'), submissions.full_name),
+            timestamp = ?,
+            row_version = submissions.row_version + 1
+        FROM (
+            SELECT json_patch(
+                CASE WHEN json_valid(form_summary) THEN form_summary ELSE '{}' END, ?
+            ) AS fs
+            FROM submissions WHERE unique_id = ?
+        ) AS patched
+        WHERE submissions.unique_id = ? AND (? IS NULL OR submissions.row_version = ?)
+        ''',
+        (timestamp, patch_json, unique_id, unique_id, expected_version, expected_version)
+    )
+    row = conn.execute('SELECT row_version FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
+    if cur.rowcount:
+        return 'ok', row['row_version']
+    if not row:
+        return 'missing', None
+    return 'conflict', row['row_version']
+
+@submission_bp.route('/submission/<unique_id>', methods=['PATCH'])
+def patch_submission(unique_id):
+    """Apply an RFC 7396 merge patch to form_summary without re-running analysis.
+
+    Send If-Match with the ETag from GET /submission/<id> to reject the write (412) when the
+    submission changed in between.
+    """
+    patch = request.get_json(force=True, silent=True)
+    if not isinstance(patch, dict) or not patch:
+        return jsonify({'error': 'Body must be a non-empty JSON merge patch object.'}), 400
+    if 'unique_id' in patch and patch['unique_id'] != unique_id:
+        return jsonify({'error': 'unique_id cannot be changed.'}), 400
+    try:
+        expected_version = _parse_if_match(request.headers.get('If-Match'))
+    except ValueError:
+        return jsonify({'error': 'Invalid If-Match header.'}), 400
+
+    import pytz
+    timestamp = datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()
+    try:
+        outcome, row_version = run_write(_apply_merge_patch, unique_id, json.dumps(patch), expected_version, timestamp)
+    except Exception as e:
+        current_app.logger.error(f"Database error patching submission {unique_id}: {e}")
+        return jsonify({'error': 'Database error occurred. Please try again.'}), 500
+
+    if outcome == 'missing':
+        return jsonify({'error': 'Submission not found.'}), 404
+    if outcome == 'conflict':
+        response = jsonify({'error': 'Submission was modified by someone else.', 'row_version': row_version})
+        response.headers['ETag'] = _version_etag(row_version)
+        return response, 412
+    current_app.logger.info(f"Patched submission {unique_id} -> row_version {row_version}")
+    response = jsonify({'unique_id': unique_id, 'row_version': row_version})
+    response.headers['ETag'] = _version_etag(row_version)
+    return response, 200
+
 @submission_bp.route('/submission/<unique_id>/meta', methods=['GET'])
 def get_submission_meta(unique_id):
     """Return supervisor status and comments for a submission.
@@ -39,6 +130,10 @@ def get_submission_meta(unique_id):
     if not row:
         return jsonify({'error': 'Submission not found.'}), 404
 
+    return jsonify(_submission_meta(row)), 200
+
+def _submission_meta(row) -> dict:
+    """Supervisor status fields of a submission row (the /submission/<id>/meta payload)."""
     # Safely resolve supervisor status/comments (support schemas where columns may be absent)
     status = (
         row['supervisor_approval_status']
@@ -58,14 +153,35 @@ def get_submission_meta(unique_id):
     created_at = row['created_at'] if 'created_at' in row.keys() else None
     created_by = row['created_by'] if 'created_by' in row.keys() else None
 
-    return jsonify({
+    return {
         'supervisor_status': status,
         'supervisor_comments': comments,
         'supervisor_modified_at': modified_at,
         'supervisor_modified_by': modified_by,
         'created_at': created_at,
         'created_by': created_by
-    }), 200
+    }
+
+def _upsert_submission(conn, unique_id, applicant_name, timestamp, created_at_str, agent, form_summary):
+    """Write job: create or update the submission row. Returns True when it already existed."""
+    exists = conn.execute('SELECT unique_id FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
+    if exists:
+        current_app.logger.info("Updating submission: %s", unique_id)
+        # Update mutable fields and set modification timestamps
+        conn.execute(
+            '''UPDATE submissions SET full_name = ?, timestamp = ?, agent = ?, form_summary = ?, 
+               application_modified_at = ?, application_modified_by = ? WHERE unique_id = ?''',
+            (applicant_name, timestamp, agent, form_summary, timestamp, agent, unique_id)
+        )
+    else:
+        current_app.logger.info("Creating new submission: %s", unique_id)
+        # For new submissions, set created_at to requested string format and created_by to the user id
+        conn.execute(
+            '''INSERT INTO submissions (unique_id, full_name, timestamp, agent, form_summary, supervisor_approval_status, first_created_at, first_created_by, application_modified_at, application_modified_by)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (unique_id, applicant_name, timestamp, agent, form_summary, 'OPEN', created_at_str, agent, timestamp, agent)
+        )
+    return bool(exists)
 
 @submission_bp.route('/submit', methods=['POST'])
 def submit_form():
@@ -114,61 +230,25 @@ def submit_form():
     agent = user_id or 'Unknown'
     form_summary = json.dumps(form_data)
 
-    conn = None
+    # Validate form_summary JSON before saving
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Start transaction
-        conn.execute('BEGIN IMMEDIATE')
-        
-        # Check if submission exists
-        exists = cursor.execute('SELECT unique_id, form_summary FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
-        
-        # Validate form_summary JSON before saving
-        try:
-            json.loads(form_summary)
-        except json.JSONDecodeError as e:
-            current_app.logger.error(f"Invalid JSON in form_summary for {unique_id}: {e}")
-            conn.rollback()
-            return jsonify({'error': 'Invalid form data format.'}), 400
-        
+        json.loads(form_summary)
+    except json.JSONDecodeError as e:
+        current_app.logger.error(f"Invalid JSON in form_summary for {unique_id}: {e}")
+        return jsonify({'error': 'Invalid form data format.'}), 400
+
+    try:
+        exists = run_write(_upsert_submission, unique_id, applicant_name, timestamp, created_at_str, agent, form_summary)
         if exists:
-            current_app.logger.info("Updating submission: %s", unique_id)
-            # Update mutable fields and set modification timestamps
-            cursor.execute(
-                '''UPDATE submissions SET full_name = ?, timestamp = ?, agent = ?, form_summary = ?, 
-                   application_modified_at = ?, application_modified_by = ? WHERE unique_id = ?''',
-                (applicant_name, timestamp, agent, form_summary, timestamp, agent, unique_id)
-            )
             message = 'Submission updated successfully.'
             status_code = 200
         else:
-            current_app.logger.info("Creating new submission: %s", unique_id)
-            # For new submissions, set created_at to requested string format and created_by to the user id
-            cursor.execute(
-                '''INSERT INTO submissions (unique_id, full_name, timestamp, agent, form_summary, supervisor_approval_status, first_created_at, first_created_by, application_modified_at, application_modified_by)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                (unique_id, applicant_name, timestamp, agent, form_summary, 'OPEN', created_at_str, agent, timestamp, agent)
-            )
             message = 'Submission created successfully.'
             status_code = 201
-        
-        # Commit transaction
-        conn.commit()
         current_app.logger.info("Successfully %s submission: %s", "updated" if exists else "created", unique_id)
-            
     except Exception as db_error:
         current_app.logger.error(f"Database error for submission {unique_id}: {db_error}")
-        if conn:
-            try:
-                conn.rollback()
-            except:
-                pass
         return jsonify({'error': 'Database error occurred. Please try again.'}), 500
-    finally:
-        if conn:
-            conn.close()
 
     # Run analysis pipeline
     try:
@@ -178,6 +258,10 @@ def submit_form():
         plans = fetch_plans(derived, form_data)
         current_app.logger.info("Computed plans: %s", plans)
         return jsonify({'submissionId': unique_id, 'message': message, 'plans': plans}), status_code
+    except LLMOverloaded as e:
+        # The submission is saved; resubmitting updates it and retries the analysis
+        current_app.logger.warning(f"Analysis deferred for {unique_id}: {e}")
+        return overloaded_response(e, submissionId=unique_id, message=message + ' Plan analysis is busy.', plans=[])
     except Exception as e:
         current_app.logger.error(f"Analysis pipeline failed for {unique_id}: {e}")
         return jsonify({'submissionId': unique_id, 'message': message + ' Plan analysis failed.', 'plans': []}), status_code
@@ -196,6 +280,24 @@ def get_comments(unique_id):
     finally:
         conn.close()
 
+def _insert_comment(conn, unique_id, modifier, comment, timestamp, created_at_str):
+    """Write job: add a comment, creating a minimal submission row first if needed."""
+    submission = conn.execute('SELECT unique_id FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
+    if not submission:
+        # Extract name from unique_id (format: Name_PhoneNumber)
+        name_part = unique_id.split('_')[0] if '_' in unique_id else unique_id
+        current_app.logger.info(f"Creating basic submission entry for {unique_id}")
+        # Create minimal submission entry to allow comments
+        conn.execute(
+            '''INSERT INTO submissions (unique_id, full_name, timestamp, agent, form_summary, supervisor_approval_status, first_created_at, first_created_by, application_modified_at, application_modified_by)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (unique_id, name_part, timestamp, modifier, '{}', 'OPEN', created_at_str, modifier, timestamp, modifier)
+        )
+    conn.execute(
+        'INSERT INTO comments_noted (unique_id, modifier, comment, timestamp) VALUES (?, ?, ?, ?)',
+        (unique_id, modifier, comment, timestamp)
+    )
+
 @submission_bp.route('/submission/<unique_id>/comments', methods=['POST'])
 def add_comment(unique_id):
     """Add a new comment to a submission."""
@@ -215,45 +317,21 @@ def add_comment(unique_id):
     now_ist = datetime.now(ist)
     timestamp = now_ist.isoformat()
     
-    conn = get_db_connection()
     try:
-        # Check if submission exists
-        submission = conn.execute('SELECT unique_id FROM submissions WHERE unique_id = ?', (unique_id,)).fetchone()
-        if not submission:
-            # Create a basic submission entry if it doesn't exist
-            # Extract name from unique_id (format: Name_PhoneNumber)
-            try:
-                name_part = unique_id.split('_')[0] if '_' in unique_id else unique_id
-                current_app.logger.info(f"Creating basic submission entry for {unique_id}")
-                
-                # Create minimal submission entry to allow comments
-                conn.execute(
-                    '''INSERT INTO submissions (unique_id, full_name, timestamp, agent, form_summary, supervisor_approval_status, first_created_at, first_created_by, application_modified_at, application_modified_by)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                    (unique_id, name_part, timestamp, modifier, '{}', 'OPEN', now_ist.strftime('%Y-%m-%d_%H-%M-%S'), modifier, timestamp, modifier)
-                )
-                current_app.logger.info(f"Created basic submission entry for {unique_id}")
-            except Exception as e:
-                current_app.logger.error(f"Failed to create basic submission for {unique_id}: {e}")
-                return jsonify({'error': 'Failed to create submission entry for comments'}), 500
-        
-        # Insert comment
-        conn.execute(
-            'INSERT INTO comments_noted (unique_id, modifier, comment, timestamp) VALUES (?, ?, ?, ?)',
-            (unique_id, modifier, comment, timestamp)
-        )
-        conn.commit()
-        
-        return jsonify({
-            'message': 'Comment added successfully',
-            'comment': {
-                'modifier': modifier,
-                'comment': comment,
-                'timestamp': timestamp
-            }
-        }), 201
-    finally:
-        conn.close()
+        run_write(_insert_comment, unique_id, modifier, comment, timestamp, now_ist.strftime('%Y-%m-%d_%H-%M-%S'))
+    except Exception as e:
+        current_app.logger.error(f"Failed to add comment for {unique_id}: {e}")
+        return jsonify({'error': 'Failed to create submission entry for comments'}), 500
+
+    return jsonify({
+        'message': 'Comment added successfully',
+        'comment': {
+            'modifier': modifier,
+            'comment': comment,
+            'timestamp': timestamp
+        }
+    }), 201
+
 @submission_bp.route('/check_duplicates', methods=['POST'])
 def check_duplicates():
     """Check if email or phone has been used 5 or more times across all submissions."""
@@ -271,31 +349,24 @@ def check_duplicates():
         email_count = 0
         phone_count = 0
         
-        # Count submissions with this email using JSON extraction
+        # Count submissions whose primary or top-level email matches (two index lookups on the
+        # trigger-maintained contacts table)
         if email:
             try:
                 email_count = cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM submissions 
-                    WHERE json_extract(form_summary, '$.primaryContact.email') = ?
-                       OR json_extract(form_summary, '$.email') = ?
-                    """,
-                    (email, email)
+                    'SELECT COUNT(*) FROM submission_contacts WHERE email_norm = ? OR email_alt_norm = ?',
+                    (normalize_email(email),) * 2
                 ).fetchone()[0]
             except Exception as e:
                 current_app.logger.error(f"Error counting email duplicates: {e}")
                 email_count = 0
         
-        # Count submissions with this phone using JSON extraction
+        # Count submissions whose primary or top-level phone matches (compared without formatting characters)
         if phone:
             try:
                 phone_count = cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM submissions 
-                    WHERE json_extract(form_summary, '$.primaryContact.phone') = ?
-                       OR json_extract(form_summary, '$.phone') = ?
-                    """,
-                    (phone, phone)
+                    'SELECT COUNT(*) FROM submission_contacts WHERE phone_norm = ? OR phone_alt_norm = ?',
+                    (normalize_phone(phone),) * 2
                 ).fetchone()[0]
             except Exception as e:
                 current_app.logger.error(f"Error counting phone duplicates: {e}")
@@ -315,51 +386,158 @@ def check_duplicates():
         return jsonify({'error': 'Server error occurred'}), 500
 
 
+def _decode_data_url(data_url: str):
+    """Split a 'data:<type>;base64,<payload>' string from the legacy JSON upload into (bytes, type)."""
+    header, _, payload = str(data_url).partition(',')
+    if not payload:
+        header, payload = '', header
+    content_type = header[5:].split(';')[0] if header.startswith('data:') else None
+    return base64.b64decode(payload), content_type or 'application/pdf'
+
+def _upsert_policy_document(conn, unique_id, file_name, content_hash, size_bytes, content_type, uploaded_at):
+    """Write job: point unique_id at a stored blob. Returns the hash it replaced, if any (see _release_blobs)."""
+    if not blob_store.open_blob_path(content_hash):
+        # Lost a race with _purge_blobs for the same content; the caller stores it again
+        raise FileNotFoundError(content_hash)
+    previous = conn.execute('SELECT content_hash FROM policy_document_files WHERE unique_id = ?', (unique_id,)).fetchone()
+    conn.execute(
+        '''
+        INSERT INTO policy_document_files (unique_id, file_name, content_hash, size_bytes, content_type, uploaded_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(unique_id) DO UPDATE SET
+            file_name = excluded.file_name,
+            content_hash = excluded.content_hash,
+            size_bytes = excluded.size_bytes,
+            content_type = excluded.content_type,
+            uploaded_at = excluded.uploaded_at
+        ''',
+        (unique_id, file_name, content_hash, size_bytes, content_type, uploaded_at)
+    )
+    conn.execute('DELETE FROM policy_documents WHERE unique_id = ?', (unique_id,))
+    if previous and previous['content_hash'] != content_hash:
+        return previous['content_hash']
+    return None
+
+def _purge_blobs(conn, content_hashes):
+    # Write job that changes no rows, so it has nothing to lose to a rollback. On the writer thread
+    # no upsert can reference a blob between the check and the unlink; one that runs later in the
+    # same batch finds the file gone and stores it again.
+    for content_hash in content_hashes:
+        still_used = conn.execute('SELECT 1 FROM policy_document_files WHERE content_hash = ? LIMIT 1', (content_hash,)).fetchone()
+        if not still_used:
+            blob_store.delete_blob(content_hash)
+
+def _release_blobs(content_hashes):
+    """Delete blobs a committed write stopped referencing (never before that write has committed)."""
+    content_hashes = [h for h in content_hashes if h]
+    if not content_hashes:
+        return
+    try:
+        run_write(_purge_blobs, content_hashes)
+    except Exception as e:
+        # Only leaves an unreferenced file on disk
+        current_app.logger.warning(f"Could not release policy blobs {content_hashes}: {e}")
+
+def _delete_policy_document(conn, unique_id):
+    """Write job: returns (found, content hash the deleted row referenced)."""
+    row = conn.execute('SELECT content_hash FROM policy_document_files WHERE unique_id = ?', (unique_id,)).fetchone()
+    conn.execute('DELETE FROM policy_document_files WHERE unique_id = ?', (unique_id,))
+    legacy = conn.execute('DELETE FROM policy_documents WHERE unique_id = ?', (unique_id,)).rowcount
+    return bool(row) or bool(legacy), row['content_hash'] if row else None
+
+def _store_policy_document(unique_id, file_name, stream, content_type, uploaded_at, max_bytes=None):
+    """Stream the file into the blob store and record its metadata. Returns (content_hash, size)."""
+    for attempt in range(2):
+        content_hash, size_bytes = blob_store.store_stream(stream, max_bytes=max_bytes)
+        try:
+            replaced = run_write(_upsert_policy_document, unique_id, file_name, content_hash, size_bytes, content_type, uploaded_at)
+            _release_blobs([replaced])
+            return content_hash, size_bytes
+        except FileNotFoundError:
+            if attempt:
+                raise
+            stream.seek(0)
+
+def _policy_document_meta(unique_id):
+    """Metadata row for unique_id, moving a legacy base64 row into the blob store on first read."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            'SELECT file_name, content_hash, size_bytes, content_type, uploaded_at FROM policy_document_files WHERE unique_id = ?',
+            (unique_id,)
+        ).fetchone()
+        legacy = None if row else conn.execute(
+            'SELECT file_name, file_data, uploaded_at FROM policy_documents WHERE unique_id = ?', (unique_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row or not legacy:
+        return row
+    data, content_type = _decode_data_url(legacy['file_data'])
+    _store_policy_document(unique_id, legacy['file_name'], io.BytesIO(data), content_type, legacy['uploaded_at'])
+    current_app.logger.info(f"Moved legacy policy document for {unique_id} into the blob store")
+    return _policy_document_meta(unique_id)
+
+def _policy_document_url(unique_id, content_hash):
+    # Versioned by content, so the URL changes whenever the document does (cached as immutable)
+    return url_for('submission_bp.download_policy_document', unique_id=unique_id, v=content_hash)
+
+def _policy_document_json(unique_id, row):
+    return {
+        'success': True,
+        'fileName': row['file_name'],
+        'fileUrl': _policy_document_url(unique_id, row['content_hash']),
+        'contentHash': row['content_hash'],
+        'size': row['size_bytes'],
+        'contentType': row['content_type'],
+        'uploadedAt': row['uploaded_at']
+    }
+
 @submission_bp.route('/api/save-policy-document', methods=['POST'])
 def save_policy_document():
-    """Save existing policy document to the database."""
+    """Save an existing policy document.
+
+    Preferred: multipart/form-data with `file`, `unique_id` and optional `uploadedAt`; the file is
+    streamed to disk. The older JSON body with a base64 data URL in `fileData` is still accepted.
+    """
+    max_bytes = current_app.config.get('POLICY_DOC_MAX_BYTES')
+    # Reject oversized bodies before parsing (base64 adds a third, multipart a little framing)
+    if max_bytes and request.content_length and request.content_length > max_bytes * 4 // 3 + 64 * 1024:
+        return jsonify({'error': f'File exceeds {max_bytes} bytes.'}), 413
     try:
-        data = request.get_json()
-        unique_id = data.get('unique_id')
-        file_name = data.get('fileName')
-        file_data = data.get('fileData')
-        uploaded_at = data.get('uploadedAt')
-        
-        if not unique_id or not file_name or not file_data:
-            return jsonify({'error': 'Missing required fields'}), 400
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Create table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS policy_documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                unique_id TEXT NOT NULL,
-                file_name TEXT NOT NULL,
-                file_data LONGBLOB NOT NULL,
-                uploaded_at TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(unique_id)
-            )
-        ''')
-        
-        # Insert or update the document
-        cursor.execute('''
-            INSERT INTO policy_documents (unique_id, file_name, file_data, uploaded_at)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(unique_id) DO UPDATE SET
-                file_name = excluded.file_name,
-                file_data = excluded.file_data,
-                uploaded_at = excluded.uploaded_at
-        ''', (unique_id, file_name, file_data, uploaded_at))
-        
-        conn.commit()
-        conn.close()
-        
-        current_app.logger.info(f"Policy document saved for {unique_id}: {file_name}")
-        return jsonify({'success': True, 'message': 'Document saved successfully'}), 200
-        
+        if request.files:
+            upload = request.files.get('file')
+            unique_id = request.form.get('unique_id')
+            uploaded_at = request.form.get('uploadedAt')
+            if not unique_id or not upload or not upload.filename:
+                return jsonify({'error': 'Missing required fields'}), 400
+            file_name = upload.filename
+            content_type = upload.mimetype or 'application/pdf'
+            stream = upload.stream
+        else:
+            data = request.get_json(silent=True) or {}
+            unique_id = data.get('unique_id')
+            file_name = data.get('fileName')
+            uploaded_at = data.get('uploadedAt')
+            if not unique_id or not file_name or not data.get('fileData'):
+                return jsonify({'error': 'Missing required fields'}), 400
+            raw, content_type = _decode_data_url(data.get('fileData'))
+            stream = io.BytesIO(raw)
+
+        content_hash, size_bytes = _store_policy_document(unique_id, file_name, stream, content_type, uploaded_at, max_bytes=max_bytes)
+        current_app.logger.info(f"Policy document saved for {unique_id}: {file_name} ({size_bytes} bytes, {content_hash[:12]})")
+        return jsonify({
+            'success': True,
+            'message': 'Document saved successfully',
+            'fileUrl': _policy_document_url(unique_id, content_hash),
+            'contentHash': content_hash,
+            'size': size_bytes
+        }), 200
+
+    except blob_store.BlobTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except (ValueError, binascii.Error) as e:
+        return jsonify({'error': f'Invalid file data: {e}'}), 400
     except Exception as e:
         current_app.logger.error(f"Error saving policy document: {e}")
         return jsonify({'error': 'Server error occurred'}), 500
@@ -367,25 +545,60 @@ def save_policy_document():
 
 @submission_bp.route('/api/get-policy-document/<unique_id>', methods=['GET'])
 def get_policy_document(unique_id):
-    """Retrieve existing policy document from the database."""
+    """Return policy document metadata; the bytes are served by fileUrl."""
     try:
-        conn = get_db_connection()
-        row = conn.execute(
-            'SELECT file_name, file_data, uploaded_at FROM policy_documents WHERE unique_id = ?',
-            (unique_id,)
-        ).fetchone()
-        conn.close()
-        
+        row = _policy_document_meta(unique_id)
         if row:
-            return jsonify({
-                'success': True,
-                'fileName': row['file_name'],
-                'fileData': row['file_data'],
-                'uploadedAt': row['uploaded_at']
-            }), 200
-        else:
-            return jsonify({'success': False, 'message': 'No document found'}), 404
-        
+            return jsonify(_policy_document_json(unique_id, row)), 200
+        return jsonify({'success': False, 'message': 'No document found'}), 404
+
     except Exception as e:
         current_app.logger.error(f"Error retrieving policy document: {e}")
+        return jsonify({'error': 'Server error occurred'}), 500
+
+
+@submission_bp.route('/api/policy-document/<unique_id>/file', methods=['GET'])
+def download_policy_document(unique_id):
+    """Stream the stored file (Range, If-None-Match and If-Range supported). ?download=1 forces a save dialog.
+
+    With ?v=<content hash> of the current document (the fileUrl handed out) the response is
+    immutable; the bare URL always revalidates, since a re-upload or delete changes what it serves.
+    """
+    try:
+        row = _policy_document_meta(unique_id)
+        path = blob_store.open_blob_path(row['content_hash']) if row else None
+        if not path:
+            return jsonify({'success': False, 'message': 'No document found'}), 404
+        response = send_file(
+            path,
+            mimetype=row['content_type'] or 'application/pdf',
+            as_attachment=request.args.get('download') in ('1', 'true'),
+            download_name=row['file_name'],
+            conditional=True,
+            etag=row['content_hash']
+        )
+        # Client documents: browser cache only, never shared caches
+        if request.args.get('v') == row['content_hash']:
+            response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except Exception as e:
+        current_app.logger.error(f"Error serving policy document for {unique_id}: {e}")
+        return jsonify({'error': 'Server error occurred'}), 500
+
+
+@submission_bp.route('/api/delete-policy-document/<unique_id>', methods=['DELETE'])
+def delete_policy_document(unique_id):
+    try:
+        found, released = run_write(_delete_policy_document, unique_id)
+        _release_blobs([released])
+        if found:
+            current_app.logger.info(f"Policy document deleted for {unique_id}")
+            return jsonify({'success': True}), 200
+        return jsonify({'success': False, 'message': 'No document found'}), 404
+
+    except Exception as e:
+        current_app.logger.error(f"Error deleting policy document: {e}")
         return jsonify({'error': 'Server error occurred'}), 500
\ No newline at end of file
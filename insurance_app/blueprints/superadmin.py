@@ -1,4 +1,5 @@
 import os
+import shutil
 from flask import Blueprint, render_template, jsonify, request, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from ..database import (
@@ -6,6 +7,8 @@ from ..database import (
     get_db_connection,
     get_application_status_db_connection,
 )
+from ..analysis.trace import list_traces, load_trace
+from ..analysis.justification_store import purge_reports, legacy_reports_dir
 
 superadmin_bp = Blueprint('superadmin_bp', __name__)
 
@@ -52,17 +55,15 @@ def cleanup_databases_action():
             conn.commit()
             messages.append('Cleared all data from insurance_form.db.')
 
-            # Also clear the justification_reports directory
+            # Also clear the stored justification reports (single DELETE) and any legacy report files
             try:
-                base_dir = os.path.abspath(os.path.join(current_app.root_path, '..', 'justification_reports'))
-                if os.path.exists(base_dir):
-                    for filename in os.listdir(base_dir):
-                        file_path = os.path.join(base_dir, filename)
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-                    messages.append('Emptied justification_reports folder.')
+                removed = purge_reports()
+                messages.append(f'Removed {removed} justification reports.')
+                base_dir = legacy_reports_dir(current_app)
+                if os.path.isdir(base_dir):
+                    shutil.rmtree(base_dir, ignore_errors=True)
             except Exception as e:
-                messages.append(f'Error clearing reports folder: {e}')
+                messages.append(f'Error clearing justification reports: {e}')
 
         except Exception as e:
             return render_template(
@@ -122,6 +123,23 @@ def cleanup_databases_action():
     success_message = ' '.join(messages) if messages else 'No databases were cleaned.'
     return render_template('Clean_Databases.html', success_message=success_message)
 
+@superadmin_bp.route('/superadmin/analysis_traces', methods=['GET'])
+def analysis_traces_page():
+    """List stored analysis traces (requests made with X-Analysis-Trace: 1 or ?trace=1)."""
+    try:
+        traces = list_traces()
+    except Exception as e:
+        current_app.logger.error(f"Error listing analysis traces: {e}")
+        return render_template('Analysis_Traces.html', traces=[], error_message=f'Could not list traces: {e}')
+    return render_template('Analysis_Traces.html', traces=traces)
+
+@superadmin_bp.route('/superadmin/analysis_traces/<trace_id>', methods=['GET'])
+def get_analysis_trace(trace_id):
+    trace = load_trace(trace_id)
+    if trace is None:
+        return jsonify({'error': 'Trace not found'}), 404
+    return jsonify(trace), 200
+
 @superadmin_bp.route('/api/get_user/<user_id>', methods=['GET'])
 def get_user(user_id):
     conn = None
@@ -0,0 +1,95 @@
+from functools import wraps
+
+from flask import request, current_app
+
+from .database import get_db_connection, get_derived_db_connection, get_user_db_connection
+
+# Conditional GET for read-heavy JSON endpoints. Each endpoint names a validator that derives its
+# ETag from a version the database already maintains (a row's row_version, or a catalog_versions
+# counter bumped by triggers). The validator runs before the view, so a matching If-None-Match is
+# answered with 304 without running the view's query or serializing the body. A write landing
+# between the validator and the view only makes the sent ETag older than the body, which costs the
+# client one extra full response, never a stale one.
+CACHE_CONTROL = 'no-cache'
+
+
+def row_version_etag(conn, table: str, unique_id: str):
+    """'v<row_version>' of one row (the same tag PATCH endpoints accept in If-Match), None if absent."""
+    row = conn.execute(f'SELECT row_version FROM {table} WHERE unique_id = ?', (unique_id,)).fetchone()
+    return f'v{row[0]}' if row else None
+
+
+def catalog_etag(conn, name: str):
+    """Tag for a whole-table catalog, None when the database has no catalog_versions for it.
+
+    The schema cookie is included so a table dropped and rebuilt outside the app (taking its
+    triggers with it) still changes the tag.
+    """
+    try:
+        row = conn.execute('SELECT version FROM catalog_versions WHERE name = ?', (name,)).fetchone()
+    except Exception:
+        return None
+    if not row:
+        return None
+    schema = conn.execute('PRAGMA schema_version').fetchone()[0]
+    return f'{name}-{row[0]}-{schema}'
+
+
+def _with_connection(connect, fn):
+    conn = connect()
+    try:
+        return fn(conn)
+    finally:
+        conn.close()
+
+
+def submission_etag(unique_id: str):
+    return _with_connection(get_db_connection, lambda conn: row_version_etag(conn, 'submissions', unique_id))
+
+
+def plan_summary_etag(unique_id: str):
+    return _with_connection(get_db_connection, lambda conn: row_version_etag(conn, 'plan_summaries', unique_id))
+
+
+def clients_etag():
+    return _with_connection(get_db_connection, lambda conn: catalog_etag(conn, 'submissions'))
+
+
+def plans_catalog_etag():
+    return _with_connection(get_derived_db_connection, lambda conn: catalog_etag(conn, 'features'))
+
+
+def users_etag():
+    return _with_connection(get_user_db_connection, lambda conn: catalog_etag(conn, 'users'))
+
+
+def conditional(validator):
+    """Decorate a GET view with ETag / If-None-Match handling.
+
+    `validator(**view_args)` returns the current ETag (unquoted) or None to serve the view
+    unconditionally. Successful responses get the ETag (unless the view set its own) and
+    `Cache-Control: no-cache`, so browsers revalidate instead of reusing a stale body.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = validator(**kwargs)
+            except Exception as e:
+                current_app.logger.warning(f"ETag validator for {request.path} failed: {e}")
+                etag = None
+            if etag is None:
+                return view(*args, **kwargs)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = CACHE_CONTROL
+                return response
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                if 'ETag' not in response.headers:
+                    response.set_etag(etag)
+                response.headers.setdefault('Cache-Control', CACHE_CONTROL)
+            return response
+        return wrapper
+    return decorator
@@ -7,3 +7,34 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Static and template folder paths
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
 STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# SQLite storage tuning (applied to every connection; journal mode is set once at startup)
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(64 * 1024 * 1024)))
+SQLITE_WAL_AUTOCHECKPOINT = int(os.environ.get('SQLITE_WAL_AUTOCHECKPOINT', '1000'))
+
+# Funnel insurance_form.db writes through one writer thread per process (group commit)
+SQLITE_WRITE_QUEUE = os.environ.get('SQLITE_WRITE_QUEUE', '1').lower() in ('1', 'true', 'yes', 'on')
+SQLITE_WRITE_BATCH_MAX = int(os.environ.get('SQLITE_WRITE_BATCH_MAX', '64'))
+SQLITE_WRITE_RETRIES = int(os.environ.get('SQLITE_WRITE_RETRIES', '5'))
+SQLITE_WRITE_QUEUE_MAX = int(os.environ.get('SQLITE_WRITE_QUEUE_MAX', '1024'))
+
+# Policy document uploads (content-addressed files under the instance folder, see blob_store.py)
+POLICY_DOC_MAX_BYTES = int(os.environ.get('POLICY_DOC_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Concurrent CPU-bound plan scoring runs per process (resources.cpu_slot); 0 means one per CPU
+ANALYSIS_CPU_SLOTS = int(os.environ.get('ANALYSIS_CPU_SLOTS', '0'))
+
+# Admission control for upstream model calls (see llm_limiter.py). LLM_MAX_CONCURRENCY calls run
+# at once across all workers on the host; each worker queues at most LLM_QUEUE_MAX more (at most
+# LLM_QUEUE_PER_USER per user) for up to LLM_QUEUE_TIMEOUT seconds before answering 503 / 429.
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+LLM_QUEUE_MAX = int(os.environ.get('LLM_QUEUE_MAX', '32'))
+LLM_QUEUE_PER_USER = int(os.environ.get('LLM_QUEUE_PER_USER', '4'))
+LLM_QUEUE_TIMEOUT = float(os.environ.get('LLM_QUEUE_TIMEOUT', '30'))
+
+# Load configs, prompts and the plan catalog at startup (see resources.warm); with gunicorn's
+# preload_app this happens once in the master and workers share it
+PRELOAD_RESOURCES = os.environ.get('PRELOAD_RESOURCES', '1').lower() in ('1', 'true', 'yes', 'on')
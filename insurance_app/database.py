@@ -1,7 +1,31 @@
 import os
+import json
 import sqlite3
-from flask import current_app
+import threading
+from flask import current_app, g, has_app_context
+from .migrations import (
+    apply_migrations, SUBMISSIONS_MIGRATIONS, APPLICATION_STATUS_MIGRATIONS, JUSTIFICATION_MIGRATIONS, USER_MIGRATIONS,
+    DERIVED_MIGRATIONS,
+)
 
+# Size of sqlite3's per-connection prepared statement cache. Connections are kept for the whole
+# request (see _pooled_connect), so repeated queries within a request reuse compiled statements.
+STATEMENT_CACHE_SIZE = 256
+
+_STATS_LOCK = threading.Lock()
+_CONNECTION_STATS = {}
+
+
+def _bump_stat(config_key: str, field: str):
+    with _STATS_LOCK:
+        stats = _CONNECTION_STATS.setdefault(config_key, {'opened': 0, 'reused': 0, 'closed': 0})
+        stats[field] += 1
+
+
+def get_connection_stats() -> dict:
+    """Return per-database counters of connections opened, reused and closed by this process."""
+    with _STATS_LOCK:
+        return {k: dict(v) for k, v in _CONNECTION_STATS.items()}
 
 
 def _resolve_db_path(config_key: str, default_filename: str) -> str:
@@ -16,415 +40,321 @@ def _resolve_db_path(config_key: str, default_filename: str) -> str:
         # Fallback to instance folder
         instance_dir = getattr(current_app, 'instance_path', None) or os.path.join(os.path.dirname(__file__), '..', 'instance')
         path = os.path.abspath(os.path.join(instance_dir, default_filename))
-    try:
-        current_app.logger.info("DB connect -> %s=%s", config_key, path)
-    except Exception:
-        pass
     return path
 
 
-def _connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection shared by every caller within one app/request context.
+
+    Callers keep the usual get_*_connection() / conn.close() pattern: close() only releases the
+    caller's checkout. When the last checkout is released any uncommitted transaction is rolled
+    back (matching what a real close would do); the connection itself is closed on teardown.
+
+    A checkout taken while an earlier one has a transaction open is scoped by a SAVEPOINT: its
+    commit() keeps its work inside the outer transaction and its rollback() undoes only its own
+    work, so a nested helper cannot commit or discard its caller's unfinished writes. Its work is
+    folded into the outer transaction when it is released.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._savepoints = []  # (checkout depth, savepoint name) of nested checkouts
+
+    def _checkout(self):
+        self._checkouts += 1
+        if self._checkouts > 1 and self.in_transaction:
+            name = f'pooled_checkout_{self._checkouts}'
+            self.execute(f'SAVEPOINT {name}')
+            self._savepoints.append((self._checkouts, name))
+
+    def _savepoint(self):
+        """Savepoint scoping the innermost checkout, or None when it owns the transaction."""
+        if self._savepoints and self._savepoints[-1][0] == self._checkouts:
+            return self._savepoints[-1][1]
+        return None
+
+    def commit(self):
+        name = self._savepoint()
+        if name is None:
+            return super().commit()
+        self.execute(f'RELEASE {name}')
+        self.execute(f'SAVEPOINT {name}')
+
+    def rollback(self):
+        name = self._savepoint()
+        if name is None:
+            return super().rollback()
+        self.execute(f'ROLLBACK TO {name}')
+
+    def close(self):
+        name = self._savepoint()
+        if name is not None:
+            self._savepoints.pop()
+            try:
+                self.execute(f'RELEASE {name}')
+            except sqlite3.Error:
+                pass  # the outer transaction already ended
+        if self._checkouts > 0:
+            self._checkouts -= 1
+        if self._checkouts == 0 and self.in_transaction:
+            self.rollback()
+
+    def _close_for_teardown(self):
+        self._savepoints.clear()
+        if self.in_transaction:
+            super().rollback()
+        super().close()
+
+
+def connection_pragmas(config) -> list:
+    """Per-connection PRAGMAs derived from the app config (busy timeout, sync level, mmap, checkpointing)."""
+    pragmas = [('foreign_keys', 'ON')]
+    pragmas.append(('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))))
+    if str(config.get('SQLITE_JOURNAL_MODE', '')).upper() == 'WAL':
+        # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+        pragmas.append(('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')))
+        pragmas.append(('wal_autocheckpoint', int(config.get('SQLITE_WAL_AUTOCHECKPOINT', 1000))))
+    mmap_size = int(config.get('SQLITE_MMAP_SIZE', 0) or 0)
+    if mmap_size > 0:
+        pragmas.append(('mmap_size', mmap_size))
+    return pragmas
+
+
+def _connect(db_path: str, factory=sqlite3.Connection, pragmas=None) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, factory=factory, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     # Enable foreign keys pragma for SQLite if you use FKs elsewhere
-    try:
-        conn.execute('PRAGMA foreign_keys = ON')
-    except Exception:
-        pass
+    for name, value in (pragmas or [('foreign_keys', 'ON')]):
+        try:
+            conn.execute(f'PRAGMA {name} = {value}')
+        except Exception:
+            pass
+    return conn
+
+
+def set_journal_mode(app):
+    """Switch every configured database to SQLITE_JOURNAL_MODE (persistent, so done once at startup)."""
+    mode = str(app.config.get('SQLITE_JOURNAL_MODE') or '').upper()
+    if mode not in ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST'):
+        return
+    for config_key in ('DATABASE_PATH', 'DERIVED_DB_PATH', 'USER_DB_PATH', 'APPLICATION_STATUS_DB_PATH', 'JUSTIFICATION_DB_PATH'):
+        path = app.config.get(config_key)
+        if not path or not os.path.exists(path):
+            continue
+        conn = None
+        try:
+            conn = sqlite3.connect(path)
+            conn.execute(f'PRAGMA journal_mode = {mode}')
+        except Exception as e:
+            app.logger.warning(f"Could not set journal_mode={mode} on {path}: {e}")
+        finally:
+            if conn:
+                conn.close()
+
+
+def _pooled_connect(config_key: str, default_filename: str, on_open=None) -> sqlite3.Connection:
+    """Return the context's connection for `config_key`, opening it on first use.
+
+    on_open(conn, pragmas) runs once on each new connection, before any transaction.
+    """
+    if not has_app_context():
+        conn = _connect(_resolve_db_path(config_key, default_filename))
+        if on_open:
+            on_open(conn, None)
+        return conn
+    pool = g.setdefault('_db_connections', {})
+    conn = pool.get(config_key)
+    if conn is None:
+        path = _resolve_db_path(config_key, default_filename)
+        current_app.logger.debug("DB connect -> %s=%s", config_key, path)
+        pragmas = connection_pragmas(current_app.config)
+        conn = _connect(path, factory=PooledConnection, pragmas=pragmas)
+        if on_open:
+            try:
+                on_open(conn, pragmas)
+            except Exception:
+                conn.close()
+                raise
+        pool[config_key] = conn
+        _bump_stat(config_key, 'opened')
+    else:
+        _bump_stat(config_key, 'reused')
+    conn._checkout()
     return conn
 
 
+def close_db_connections(exc=None):
+    """Teardown hook: really close every connection opened during this app context."""
+    pool = g.pop('_db_connections', None)
+    if not pool:
+        return
+    for config_key, conn in pool.items():
+        try:
+            conn._close_for_teardown()
+            _bump_stat(config_key, 'closed')
+        except Exception:
+            pass
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db_connections)
+
+
 def get_db_connection():
-    path = _resolve_db_path('DATABASE_PATH', 'insurance_form.db')
-    return _connect(path)
+    # Every insurance_form.db connection carries the audit ATTACH and trigger (see attach_audit_db)
+    return _pooled_connect('DATABASE_PATH', 'insurance_form.db', on_open=attach_audit_db)
 
 def get_derived_db_connection():
-    path = _resolve_db_path('DERIVED_DB_PATH', 'derived.db')
-    return _connect(path)
+    return _pooled_connect('DERIVED_DB_PATH', 'derived.db')
 
 def get_user_db_connection():
-    path = _resolve_db_path('USER_DB_PATH', 'users.db')
-    return _connect(path)
+    return _pooled_connect('USER_DB_PATH', 'users.db')
 
 def get_application_status_db_connection():
-    path = _resolve_db_path('APPLICATION_STATUS_DB_PATH', 'Application_Status.db')
-    return _connect(path)
+    return _pooled_connect('APPLICATION_STATUS_DB_PATH', 'Application_Status.db')
 
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS submissions (
-            unique_id TEXT PRIMARY KEY,
-            full_name TEXT,
-            timestamp TEXT NOT NULL,
-            agent TEXT,
-            form_summary TEXT NOT NULL
-        )
-    ''')
+def get_justification_db_path():
+    return _resolve_db_path('JUSTIFICATION_DB_PATH', 'justification_reports.db')
 
-    # Get existing columns
-    cursor.execute("PRAGMA table_info(submissions)")
-    columns = [info[1] for info in cursor.fetchall()]
-
-    # Check and add 'plans_chosen' column
-    if 'plans_chosen' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN plans_chosen TEXT")
-
-    # Check and add 'supervisor_approval_status' column
-    if 'supervisor_approval_status' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN supervisor_approval_status TEXT DEFAULT 'SUP_REVIEW'")
-
-    # Check and add 'supervisor_comments' column (additive only; no table rewrite)
-    if 'supervisor_comments' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN supervisor_comments TEXT")
-        # Refresh columns list
-        cursor.execute("PRAGMA table_info(submissions)")
-        columns = [info[1] for info in cursor.fetchall()]
-
-    # Persist supervisor selections explicitly
-    if 'supervisor_selected_plans' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN supervisor_selected_plans TEXT")
-        cursor.execute("PRAGMA table_info(submissions)")
-        columns = [info[1] for info in cursor.fetchall()]
-
-    #  Check and add 'client_comments' column
-    if 'client_comments' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN client_comments TEXT")
-
-        # Check and add 'underwriter_status' column
-    if 'underwriter_status' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN underwriter_status TEXT")
-
-    # Check and add 'underwriter_comments' column
-    if 'underwriter_comments' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN underwriter_comments TEXT")      #Until here
-
-    # Migration: rename created_at -> first_created_at, created_by -> first_created_by
-    # Prefer RENAME COLUMN when supported; otherwise ensure new columns exist and backfill
-    cursor.execute("PRAGMA table_info(submissions)")
-    columns = [info[1] for info in cursor.fetchall()]
-    if 'first_created_at' not in columns and 'created_at' in columns:
-        try:
-            cursor.execute("ALTER TABLE submissions RENAME COLUMN created_at TO first_created_at")
-        except Exception:
-            # Fallback: add new column if missing; backfill from old; leave old in place
-            cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_at TEXT")
-            cursor.execute("UPDATE submissions SET first_created_at = created_at WHERE first_created_at IS NULL OR TRIM(COALESCE(first_created_at,'')) = ''")
-    if 'first_created_by' not in columns and 'created_by' in columns:
-        try:
-            cursor.execute("ALTER TABLE submissions RENAME COLUMN created_by TO first_created_by")
-        except Exception:
-            cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_by TEXT")
-            cursor.execute("UPDATE submissions SET first_created_by = COALESCE(first_created_by, created_by)")
-
-    # Ensure new columns exist if neither old nor new existed
-    cursor.execute("PRAGMA table_info(submissions)")
-    columns = [info[1] for info in cursor.fetchall()]
-    if 'first_created_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_at TEXT")
-    if 'first_created_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_by TEXT")
-
-    # Track supervisor modification meta
-    if 'supervisor_modified_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN supervisor_modified_at TEXT")
-    if 'supervisor_modified_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN supervisor_modified_by TEXT")
-
-    # Track underwriter modification meta
-    if 'underwriter_modified_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN underwriter_modified_at TEXT")
-    if 'underwriter_modified_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN underwriter_modified_by TEXT")
-
-    # Backfill first_created_at for existing rows where it's NULL/empty with a fixed historical date (requested format)
-    cursor.execute("""
-        UPDATE submissions
-        SET first_created_at = '2025-08-21_00-00-00'
-        WHERE first_created_at IS NULL OR TRIM(COALESCE(first_created_at, '')) = ''
-    """)
-
-    # Backfill first_created_by from agent where missing
-    cursor.execute("""
-        UPDATE submissions
-        SET first_created_by = COALESCE(first_created_by, agent)
-        WHERE first_created_by IS NULL OR TRIM(COALESCE(first_created_by, '')) = ''
-    """)
-
-    # Ensure JSON paths under $.primaryContact exist in form_summary before any row updates
-    # 1) If form_summary is NULL/blank, create a minimal JSON with unique_id and applicant_name
-    cursor.execute("""
-        UPDATE submissions
-        SET form_summary = json_object(
-            'primaryContact', json_object(
-                'unique_id', unique_id,
-                'applicant_name', COALESCE(NULLIF(full_name, ''), unique_id)
-            )
-        )
-        WHERE form_summary IS NULL OR TRIM(COALESCE(form_summary, '')) = ''
-    """)
-    # 2) If JSON exists but either unique_id or applicant_name is missing/blank, set both in one pass
-    cursor.execute("""
-        UPDATE submissions
-        SET form_summary = json_set(
-            form_summary,
-            '$.primaryContact.unique_id',
-            COALESCE(NULLIF(json_extract(form_summary, '$.primaryContact.unique_id'), ''), unique_id),
-            '$.primaryContact.applicant_name',
-            COALESCE(NULLIF(json_extract(form_summary, '$.primaryContact.applicant_name'), ''), COALESCE(NULLIF(full_name, ''), unique_id))
-        )
-        WHERE json_extract(form_summary, '$.primaryContact') IS NOT NULL
-          AND (
-                json_extract(form_summary, '$.primaryContact.unique_id') IS NULL
-             OR TRIM(COALESCE(json_extract(form_summary, '$.primaryContact.unique_id'), '')) = ''
-             OR json_extract(form_summary, '$.primaryContact.applicant_name') IS NULL
-             OR TRIM(COALESCE(json_extract(form_summary, '$.primaryContact.applicant_name'), '')) = ''
-          )
-    """)
-
-
-    # Backfill: when plans_chosen is NULL/empty set supervisor_approval_status to 'OPEN'
-    cursor.execute("""
-        UPDATE submissions
-        SET supervisor_approval_status = 'OPEN'
-        WHERE (plans_chosen IS NULL OR TRIM(COALESCE(plans_chosen, '')) = '')
-          AND (supervisor_approval_status IS NULL OR TRIM(COALESCE(supervisor_approval_status, '')) = '' OR LOWER(supervisor_approval_status) IN ('pending','sup_review'))
-    """)
-
-    # Migrate existing 'pending' values to 'SUP_REVIEW' to align with new terminology
-    cursor.execute("""
-        UPDATE submissions
-        SET supervisor_approval_status = 'SUP_REVIEW'
-        WHERE LOWER(COALESCE(supervisor_approval_status, '')) = 'pending'
-    """)
-    cursor.execute("""
-        UPDATE submissions
-        SET underwriter_status = 'SUP_REVIEW'
-        WHERE LOWER(COALESCE(underwriter_status, '')) = 'pending'
-    """)
-
-    # Migrate existing 'NA' values to 'OPEN' to align with new terminology
-    cursor.execute("""
-        UPDATE submissions
-        SET supervisor_approval_status = 'OPEN'
-        WHERE UPPER(COALESCE(supervisor_approval_status, '')) = 'NA'
-    """)
-
-    # Rename supervisor decisions: 'approved' -> 'SUP_APPROVED', 'rejected' -> 'SUP_REJECTED'
-    cursor.execute("""
-        UPDATE submissions
-        SET supervisor_approval_status = 'SUP_APPROVED'
-        WHERE LOWER(COALESCE(supervisor_approval_status, '')) = 'approved'
-    """)
-    cursor.execute("""
-        UPDATE submissions
-        SET supervisor_approval_status = 'SUP_REJECTED'
-        WHERE LOWER(COALESCE(supervisor_approval_status, '')) = 'rejected'
-    """)
-    cursor.execute("""
-        UPDATE submissions
-        SET underwriter_status = NULL
-        WHERE UPPER(COALESCE(underwriter_status, '')) IN ('NA','OPEN') OR TRIM(COALESCE(underwriter_status,'')) = ''
-    """)
-
-    # Normalize existing underwriter rejections to new key
-    cursor.execute("""
-        UPDATE submissions
-        SET underwriter_status = 'UW_Rejected'
-        WHERE UPPER(COALESCE(underwriter_status, '')) = 'REJECTED'
-    """)
-    # Normalize existing underwriter approvals to new key
-    cursor.execute("""
-        UPDATE submissions
-        SET underwriter_status = 'With_UW'
-        WHERE UPPER(COALESCE(underwriter_status, '')) = 'APPROVED'
-    """)
-
-    # Migrate legacy UW_approved to With_UW
-    cursor.execute("""
-        UPDATE submissions
-        SET underwriter_status = 'With_UW'
-        WHERE underwriter_status = 'UW_approved'
-    """)
-
-    # --- Ensure client_review (boolean-like INTEGER 0/1) exists and default unchecked (0) ---
-    if 'client_review' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN client_review INTEGER DEFAULT 0")
-    cursor.execute("""
-        UPDATE submissions
-        SET client_review = 0
-        WHERE client_review IS NULL
-    """)
-
-    # --- Policy outcome fields (Agent action after With_UW) ---
-    if 'policy_outcome' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_outcome TEXT")
-    if 'policy_outcome_comment' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_outcome_comment TEXT")
-    if 'policy_outcome_modified_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_outcome_modified_at TEXT")
-    if 'policy_outcome_modified_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_outcome_modified_by TEXT")
-
-    # --- Policy details fields (captured when Policy Created) ---
-    if 'policy_number' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_number TEXT")
-    if 'member_number' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN member_number TEXT")
-    if 'member_name' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN member_name TEXT")
-    if 'policy_start_date' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_start_date TEXT")
-    if 'policy_period_months' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_period_months INTEGER")
-    if 'policy_end_date' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_end_date TEXT")
-
-    # Optional: Policy name and free-text policy details captured during creation
-    if 'policy_name' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_name TEXT")
-    if 'policy_details' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN policy_details TEXT")
-
-    # Final application status and audit
-    if 'close_status' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN close_status TEXT")
-    if 'close_status_modified_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN close_status_modified_at TEXT")
-    if 'close_status_modified_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN close_status_modified_by TEXT")
-    # Store comments associated with close_status transitions
-    cursor.execute("PRAGMA table_info(submissions)")
-    columns = [info[1] for info in cursor.fetchall()]
-    if 'close_comments' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN close_comments TEXT")
-    
-    # Add Client_Agreed_Plans column to store client's selected plans
-    if 'Client_Agreed_Plans' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN Client_Agreed_Plans TEXT")
-
-    # --- Final rolled-up status fields ---
-    cursor.execute("PRAGMA table_info(submissions)")
-    columns = [info[1] for info in cursor.fetchall()]
-    if 'application_status' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN application_status TEXT")
-    if 'application_comments' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN application_comments TEXT")
-    if 'application_modified_at' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN application_modified_at TEXT")
-    if 'application_modified_by' not in columns:
-        cursor.execute("ALTER TABLE submissions ADD COLUMN application_modified_by TEXT")
-
-    # Align any application_status carrying legacy value
-    cursor.execute("""
-        UPDATE submissions
-        SET application_status = 'With_UW'
-        WHERE application_status = 'UW_approved'
-    """)
-
-    # Backfill final_* for existing rows by picking the most recent of the four subsystems
-    try:
-        cursor.execute("SELECT unique_id, supervisor_approval_status, supervisor_comments, supervisor_modified_at, supervisor_modified_by, underwriter_status, underwriter_comments, underwriter_modified_at, underwriter_modified_by, policy_outcome, policy_outcome_comment, policy_outcome_modified_at, policy_outcome_modified_by, close_status, close_status_modified_at, close_status_modified_by FROM submissions")
-        rows = cursor.fetchall()
-        for r in rows:
-            row = dict(zip([d[0] for d in cursor.description], r))
-            # Collect candidates (ts, source)
-            candidates = []
-            for src, ts in (
-                ('supervisor', row['supervisor_modified_at'] if 'supervisor_modified_at' in row.keys() and row['supervisor_modified_at'] else None),
-                ('underwriter', row['underwriter_modified_at'] if 'underwriter_modified_at' in row.keys() and row['underwriter_modified_at'] else None),
-                ('policy', row['policy_outcome_modified_at'] if 'policy_outcome_modified_at' in row.keys() and row['policy_outcome_modified_at'] else None),
-                ('application', row['close_status_modified_at'] if 'close_status_modified_at' in row.keys() and row['close_status_modified_at'] else None),
-            ):
-                if ts and str(ts).strip():
-                    candidates.append((str(ts), src))
-            if not candidates:
-                continue
-            candidates.sort(key=lambda x: x[0])
-            latest_ts, latest_src = candidates[-1]
-            if latest_src == 'supervisor':
-                f_status = row['supervisor_approval_status'] if 'supervisor_approval_status' in row.keys() and row['supervisor_approval_status'] else None
-                f_comments = row['supervisor_comments'] if 'supervisor_comments' in row.keys() and row['supervisor_comments'] else None
-                f_by = row['supervisor_modified_by'] if 'supervisor_modified_by' in row.keys() and row['supervisor_modified_by'] else None
-            elif latest_src == 'underwriter':
-                f_status = row['underwriter_status'] if 'underwriter_status' in row.keys() and row['underwriter_status'] else None
-                f_comments = row['underwriter_comments'] if 'underwriter_comments' in row.keys() and row['underwriter_comments'] else None
-                f_by = row['underwriter_modified_by'] if 'underwriter_modified_by' in row.keys() and row['underwriter_modified_by'] else None
-            elif latest_src == 'policy':
-                f_status = row['policy_outcome'] if 'policy_outcome' in row.keys() and row['policy_outcome'] else None
-                f_comments = row['policy_outcome_comment'] if 'policy_outcome_comment' in row.keys() and row['policy_outcome_comment'] else None
-                f_by = row['policy_outcome_modified_by'] if 'policy_outcome_modified_by' in row.keys() and row['policy_outcome_modified_by'] else None
-            else:  # application
-                f_status = row['close_status'] if 'close_status' in row.keys() and row['close_status'] else None
-                f_comments = None
-                f_by = row['close_status_modified_by'] if 'close_status_modified_by' in row.keys() and row['close_status_modified_by'] else None
-            cursor.execute(
-                """
-                UPDATE submissions
-                SET application_status = ?, application_comments = ?, application_modified_at = ?, application_modified_by = ?
-                WHERE unique_id = ?
-                """,
-                (f_status, f_comments, latest_ts, f_by, row['unique_id'])
-            )
-    except Exception:
-        # Non-fatal; continue initialization even if backfill fails
-        pass
-
-    # Create comments_noted table for storing individual comments
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS comments_noted (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            unique_id TEXT NOT NULL,
-            modifier TEXT NOT NULL,
-            comment TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            created_at TEXT DEFAULT (datetime('now')),
-            FOREIGN KEY (unique_id) REFERENCES submissions (unique_id)
-        )
-    ''')
-    
-    # Create index for faster lookups
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_noted_uid ON comments_noted(unique_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_noted_timestamp ON comments_noted(timestamp DESC)')
+def get_justification_db_connection():
+    return _pooled_connect('JUSTIFICATION_DB_PATH', 'justification_reports.db')
 
-    conn.commit()
-    conn.close()
+_PHONE_SEPARATORS = str.maketrans('', '', ' -().+')
 
-def init_application_status_db():
-    """Initialize append-only audit database for Application_* changes."""
-    conn = get_application_status_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        '''
-        CREATE TABLE IF NOT EXISTS application_status_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            unique_id TEXT NOT NULL,
-            application_status TEXT,
-            application_comments TEXT,
-            application_modified_at TEXT,
-            application_modified_by TEXT,
-            source TEXT,
-            created_at TEXT DEFAULT (datetime('now'))
-        )
-        '''
+
+def normalize_email(email) -> str:
+    """Match submission_contacts.email_norm / email_alt_norm (see migrations._contact_exprs)."""
+    return str(email or '').strip().lower()
+
+def normalize_phone(phone) -> str:
+    """Match submission_contacts.phone_norm / phone_alt_norm: the raw value with formatting characters removed."""
+    return str(phone or '').translate(_PHONE_SEPARATORS)
+
+def load_plan_meta(conn, unique_ids) -> dict:
+    """{unique_id: {plan_name: {role: values}}} from submission_plan_meta, the record of plan
+    metadata (form_summary.plan_meta only holds what the client last submitted)."""
+    ids = list(unique_ids)
+    plan_meta = {}
+    if not ids:
+        return plan_meta
+    rows = conn.execute(
+        f"SELECT unique_id, plan_name, role, data FROM submission_plan_meta "
+        f"WHERE unique_id IN ({', '.join('?' for _ in ids)}) ORDER BY rowid",
+        ids
     )
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_application_status_log_uid ON application_status_log(unique_id)')
-    conn.commit()
-    conn.close()
+    for row in rows:
+        plan_meta.setdefault(row['unique_id'], {}).setdefault(row['plan_name'], {})[row['role']] = json.loads(row['data'])
+    return plan_meta
 
-def insert_application_status_log_entry(unique_id: str, application_status: str, application_comments: str, application_modified_at: str, application_modified_by: str, source: str = None):
-    """Insert a new log entry into Application_Status.db. Always appends; never overwrites."""
-    conn = get_application_status_db_connection()
+def overlay_plan_meta(form_summary: dict, plan_meta: dict) -> dict:
+    """Replace form_summary['plan_meta'] with the stored rows (see load_plan_meta)."""
+    if plan_meta or 'plan_meta' in form_summary:
+        form_summary['plan_meta'] = plan_meta
+    return form_summary
+
+def _migrate(conn, steps):
     try:
-        cur = conn.cursor()
-        cur.execute(
-            '''
-            INSERT INTO application_status_log (unique_id, application_status, application_comments, application_modified_at, application_modified_by, source)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''',
-            (unique_id, application_status, application_comments, application_modified_at, application_modified_by, source)
-        )
-        conn.commit()
+        applied = apply_migrations(conn, steps, logger=current_app.logger if has_app_context() else None)
     finally:
         conn.close()
+    return applied
+
+def init_db():
+    """Bring insurance_form.db up to the latest schema_version (a no-op once current)."""
+    return _migrate(get_db_connection(), SUBMISSIONS_MIGRATIONS)
+
+def init_application_status_db():
+    """Initialize append-only audit database for Application_* changes."""
+    return _migrate(get_application_status_db_connection(), APPLICATION_STATUS_MIGRATIONS)
+
+def init_user_db():
+    """Add trigger-maintained counters to users.db once its Agent / Supervisor tables exist.
+
+    users.db is provisioned outside this app, so on a fresh instance this is retried at each boot.
+    """
+    conn = get_user_db_connection()
+    tables = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('Agent', 'Supervisor')"
+    )}
+    if len(tables) < 2:
+        conn.close()
+        return 0
+    return _migrate(conn, USER_MIGRATIONS)
+
+def init_derived_db():
+    """Add the catalog version triggers to derived.db once its features table exists (derived.db is
+    built outside this app, like users.db)."""
+    conn = get_derived_db_connection()
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'features'").fetchone():
+        conn.close()
+        return 0
+    return _migrate(conn, DERIVED_MIGRATIONS)
+
+def init_justification_db():
+    """Initialize the justification report store (zlib-compressed JSON keyed by client id)."""
+    return _migrate(get_justification_db_connection(), JUSTIFICATION_MIGRATIONS)
+
+# Application_Status.db is ATTACHed to insurance_form.db write connections under this schema name,
+# so a status change and its audit rows are written in the same transaction and COMMIT. (With both
+# files in WAL mode SQLite commits each file atomically, not the pair as a unit across power loss.)
+AUDIT_SCHEMA = 'audit'
+
+_AUDIT_INSERT = f'''
+    INSERT INTO {AUDIT_SCHEMA}.application_status_log
+        (unique_id, application_status, application_comments, application_modified_at, application_modified_by, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def attach_audit_db(conn, pragmas=None):
+    """ATTACH Application_Status.db to a insurance_form.db connection and install the audit trigger.
+
+    Idempotent. Connections are set up when opened; called again inside a transaction on a
+    connection that was never attached, the ATTACH raises rather than writing without the audit.
+    """
+    if not any(row[1] == AUDIT_SCHEMA for row in conn.execute('PRAGMA database_list')):
+        conn.execute(f'ATTACH DATABASE ? AS {AUDIT_SCHEMA}', (_resolve_db_path('APPLICATION_STATUS_DB_PATH', 'Application_Status.db'),))
+        for name, value in (pragmas or []):
+            if name == 'synchronous':  # per-schema; connection-wide pragmas already apply
+                conn.execute(f'PRAGMA {AUDIT_SCHEMA}.synchronous = {value}')
+    if conn.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'submissions'").fetchone() is None:
+        return  # fresh database before its first migration: nothing to audit yet
+    # Log every change the rollup trigger (migrations._application_rollup_trigger) makes. Only a
+    # TEMP trigger may write across databases, so it lives on the connection rather than the schema;
+    # trigger bodies cannot qualify table names, so application_status_log resolves to the audit DB.
+    conn.execute('''
+        CREATE TEMP TRIGGER IF NOT EXISTS audit_application_rollup
+        AFTER UPDATE OF application_status, application_comments, application_modified_at, application_modified_by, application_source
+        ON main.submissions WHEN NEW.application_source IS NOT NULL
+        BEGIN
+            INSERT INTO application_status_log
+                (unique_id, application_status, application_comments, application_modified_at, application_modified_by, source)
+            VALUES (NEW.unique_id, NEW.application_status, NEW.application_comments, NEW.application_modified_at,
+                    NEW.application_modified_by, NEW.application_source);
+        END
+    ''')
+
+
+def append_application_status_log(conn, entries):
+    """Append audit rows (unique_id, status, comments, modified_at, modified_by, source) inside the
+    caller's write transaction. Always appends; never overwrites.
+
+    On the writer connection rows are buffered and flushed with one executemany just before the
+    batch commits; otherwise they are inserted immediately.
+    """
+    entries = [tuple(e) for e in entries]
+    if not entries:
+        return
+    buffer = getattr(conn, 'audit_buffer', None)
+    if buffer is not None:
+        buffer.extend(entries)
+    else:
+        conn.executemany(_AUDIT_INSERT, entries)
+
+
+def flush_application_status_log(conn):
+    buffer = getattr(conn, 'audit_buffer', None)
+    if buffer:
+        conn.executemany(_AUDIT_INSERT, buffer)
+        buffer.clear()
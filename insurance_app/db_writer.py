@@ -0,0 +1,263 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+
+from .database import (
+    _connect, _resolve_db_path, connection_pragmas, get_db_connection,
+    attach_audit_db, flush_application_status_log,
+)
+
+# Writes to insurance_form.db are funneled through one writer thread per process. The writer takes
+# the write lock once (BEGIN IMMEDIATE), runs every queued job inside its own SAVEPOINT and commits
+# the whole batch with a single COMMIT (group commit). A job that raises only rolls back its own
+# savepoint. Lock contention with other processes surfaces at BEGIN IMMEDIATE and is retried with
+# bounded backoff. Application_Status.db is attached to the writer connection and audit rows queued
+# by the batch's jobs are appended with one executemany right before that COMMIT.
+WRITE_RESULT_TIMEOUT_S = 60
+IDLE_CHECKPOINT_S = 5.0
+
+_WRITERS = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+class WriterConnection(sqlite3.Connection):
+    """Connection handed to write jobs. commit/rollback/close are owned by the writer, so the
+    usual conn.commit() / conn.close() calls inside shared helpers are harmless no-ops."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.audit_buffer = []  # see database.append_application_status_log
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'kwargs', 'future')
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+def _is_busy(exc) -> bool:
+    msg = str(exc).lower()
+    return 'locked' in msg or 'busy' in msg
+
+
+class SQLiteWriter:
+    def __init__(self, app, db_path):
+        self.app = app
+        self.db_path = db_path
+        self.batch_max = max(1, int(app.config.get('SQLITE_WRITE_BATCH_MAX', 64)))
+        self.retries = max(0, int(app.config.get('SQLITE_WRITE_RETRIES', 5)))
+        self.pragmas = connection_pragmas(app.config)
+        self.stats = {'jobs': 0, 'batches': 0, 'failed_jobs': 0, 'lock_retries': 0, 'timed_out_jobs': 0}
+        # Bounded, so a stalled writer pushes back on request threads instead of piling up jobs
+        self._queue = queue.Queue(maxsize=max(1, int(app.config.get('SQLITE_WRITE_QUEUE_MAX', 1024))))
+        self._conn = None
+        self._startup_error = None
+        self.thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        if self._startup_error is not None:
+            raise self._startup_error
+        job = _Job(fn, args, kwargs)
+        try:
+            self._queue.put(job, timeout=WRITE_RESULT_TIMEOUT_S)
+        except queue.Full:
+            raise TimeoutError('SQLite write queue is full') from None
+        try:
+            return job.future.result(timeout=WRITE_RESULT_TIMEOUT_S)
+        except FutureTimeoutError:
+            # Withdraw the job so a write reported as failed cannot commit later. A job the writer
+            # has already started is part of an open batch: wait for its real outcome instead.
+            if job.future.cancel():
+                self.stats['timed_out_jobs'] += 1
+                raise TimeoutError('SQLite write timed out in the write queue') from None
+            return job.future.result()
+
+    def run_nested(self, fn, *args, **kwargs):
+        """A job that itself calls run_write: run it inside the current batch transaction."""
+        return fn(self._conn, *args, **kwargs)
+
+    # ---- writer thread ----
+    def _run(self):
+        # Long-lived app context so jobs can use current_app (logging, other DB helpers)
+        with self.app.app_context():
+            try:
+                self._conn = _connect(self.db_path, factory=WriterConnection, pragmas=self.pragmas)
+                self._conn.isolation_level = None  # transactions are managed explicitly below
+                attach_audit_db(self._conn, self.pragmas)
+            except Exception as e:
+                current_app.logger.error(f"SQLite writer for {self.db_path} failed to start: {e}")
+                self._abandon(e)
+                return
+            dirty = False
+            while True:
+                try:
+                    job = self._queue.get(timeout=IDLE_CHECKPOINT_S)
+                except queue.Empty:
+                    if dirty:
+                        self._checkpoint()
+                        dirty = False
+                    continue
+                batch = [job]
+                while len(batch) < self.batch_max:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                # Jobs whose caller gave up (future cancelled on timeout) are dropped unrun
+                batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+                if batch:
+                    self._run_batch(batch)
+                    dirty = True
+
+    def _begin(self):
+        for attempt in range(self.retries + 1):
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == self.retries:
+                    raise
+                self.stats['lock_retries'] += 1
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+
+    def _run_batch(self, batch):
+        conn = self._conn
+        try:
+            self._begin()
+        except Exception as e:
+            current_app.logger.error(f"SQLite writer could not acquire write lock: {e}")
+            self._fail(batch, e)
+            return
+
+        outcomes = []
+        for job in batch:
+            audit_mark = len(conn.audit_buffer)
+            try:
+                conn.execute('SAVEPOINT write_job')
+                result = job.fn(conn, *job.args, **job.kwargs)
+                conn.execute('RELEASE write_job')
+                outcomes.append((job, result, None))
+            except Exception as e:
+                del conn.audit_buffer[audit_mark:]  # audit rows go with the job's savepoint
+                try:
+                    conn.execute('ROLLBACK TO write_job')
+                    conn.execute('RELEASE write_job')
+                except Exception:
+                    pass
+                outcomes.append((job, None, e))
+
+        try:
+            flush_application_status_log(conn)
+            conn.execute('COMMIT')
+        except Exception as e:
+            current_app.logger.error(f"SQLite writer batch commit failed: {e}")
+            conn.audit_buffer.clear()
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            self._fail(batch, e)
+            return
+
+        self.stats['batches'] += 1
+        for job, result, error in outcomes:
+            self.stats['jobs'] += 1
+            if error is not None:
+                self.stats['failed_jobs'] += 1
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def _fail(self, batch, error):
+        for job in batch:
+            self.stats['failed_jobs'] += 1
+            job.future.set_exception(error)
+
+    def _abandon(self, error):
+        """Startup failed: unregister so the next run_write starts a fresh writer, fail queued jobs."""
+        self._startup_error = error
+        with _WRITERS_LOCK:
+            key = (os.getpid(), self.db_path)
+            if _WRITERS.get(key) is self:
+                del _WRITERS[key]
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job.future.set_running_or_notify_cancel():
+                self.stats['failed_jobs'] += 1
+                job.future.set_exception(error)
+
+    def _checkpoint(self):
+        try:
+            self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+        except Exception:
+            pass
+
+
+def _get_writer(app) -> SQLiteWriter:
+    db_path = _resolve_db_path('DATABASE_PATH', 'insurance_form.db')
+    # Keyed by pid: a writer thread started before a fork does not exist in the child
+    key = (os.getpid(), db_path)
+    writer = _WRITERS.get(key)
+    if writer is None or not writer.thread.is_alive():
+        with _WRITERS_LOCK:
+            writer = _WRITERS.get(key)
+            if writer is None or not writer.thread.is_alive():
+                writer = SQLiteWriter(app, db_path)
+                _WRITERS[key] = writer
+    return writer
+
+
+def _run_inline(fn, args, kwargs):
+    conn = get_db_connection()
+    try:
+        attach_audit_db(conn)
+        result = fn(conn, *args, **kwargs)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def run_write(fn, *args, **kwargs):
+    """Run fn(conn, *args, **kwargs) as one atomic write against insurance_form.db and return its result.
+
+    fn must not depend on the request context and must not manage the transaction itself; with
+    SQLITE_WRITE_QUEUE enabled it runs on the per-process writer thread and is group-committed.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get('SQLITE_WRITE_QUEUE'):
+        return _run_inline(fn, args, kwargs)
+    writer = _get_writer(app)
+    if threading.current_thread() is writer.thread:
+        return writer.run_nested(fn, *args, **kwargs)
+    return writer.submit(fn, *args, **kwargs)
+
+
+def get_writer_stats() -> dict:
+    pid = os.getpid()
+    return {path: dict(w.stats) for (wpid, path), w in _WRITERS.items() if wpid == pid}
@@ -0,0 +1,143 @@
+import re
+import json
+import base64
+
+# Shared filtering / sorting / keyset pagination for submission listings (/clients, /submissions).
+# Results are ordered by (sort key, unique_id) and the cursor carries the last row's pair, so each
+# page is an index range scan regardless of how deep the client has paged.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+MAX_LIMIT = 500
+
+# Must stay identical to the expression indexed by migration 8 for the index to be used
+STATUS_EXPR = "LOWER(COALESCE(NULLIF(s.application_status, ''), s.supervisor_approval_status))"
+NAME_EXPR = "COALESCE(c.name, '')"
+
+_DATE_ONLY_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# sort -> (sort expression, tiebreak id column); the pair matches an index so no sort step is needed
+SORT_KEYS = {
+    'timestamp': ('s.timestamp', 's.unique_id'),
+    'unique_id': ('s.unique_id', 's.unique_id'),
+    'name': (NAME_EXPR, 'c.unique_id'),
+}
+
+
+class ListingError(ValueError):
+    """Invalid listing parameter; the message is safe to return to the client."""
+
+
+def encode_cursor(sort: str, value, unique_id: str) -> str:
+    raw = json.dumps([sort, value, unique_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, sort: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor_sort, value, unique_id = json.loads(raw)
+    except Exception:
+        raise ListingError('Invalid cursor.')
+    if cursor_sort != sort:
+        raise ListingError('Cursor does not match the requested sort.')
+    return value, unique_id
+
+
+def parse_limit(raw, default=None):
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ListingError('limit must be an integer.')
+    return max(1, min(MAX_LIMIT, limit))
+
+
+def parse_fields(raw, allowed, default) -> list:
+    """Return the requested projection (comma separated), validated against `allowed`."""
+    if not raw:
+        return list(default)
+    fields = [f.strip() for f in str(raw).split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ListingError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def query_submissions(conn, args, select_sql: str, default_limit=None):
+    """Run a filtered, sorted, keyset-paginated listing over submissions.
+
+    `select_sql` is the projection (may reference `s.` submissions and `c.` submission_contacts).
+    Supported args: agent (exact, repeatable to match any of several), status, from, to (timestamp
+    range, ISO strings; a date-only `to` includes that whole day), q (name / unique id search),
+    sort (timestamp|unique_id|name), order (asc|desc), limit, cursor.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    sort = (args.get('sort') or 'timestamp').strip()
+    if sort not in SORT_KEYS:
+        raise ListingError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    order = (args.get('order') or ('desc' if sort == 'timestamp' else 'asc')).strip().lower()
+    if order not in ('asc', 'desc'):
+        raise ListingError('order must be asc or desc.')
+    limit = parse_limit(args.get('limit'), default_limit)
+    sort_expr, id_expr = SORT_KEYS[sort]
+
+    where, params = [], []
+    agents = [a.strip() for a in (args.getlist('agent') if hasattr(args, 'getlist') else [args.get('agent')]) if a and a.strip()]
+    if agents:
+        where.append(f"s.agent IN ({', '.join('?' * len(agents))})")
+        params.extend(agents)
+    if args.get('status'):
+        where.append(f'{STATUS_EXPR} = ?')
+        params.append(args.get('status').strip().lower())
+    if args.get('from'):
+        where.append('s.timestamp >= ?')
+        params.append(args.get('from').strip())
+    if args.get('to'):
+        to = args.get('to').strip()
+        if _DATE_ONLY_RE.match(to):
+            # Timestamps carry a time part, so compare against the start of the next day
+            where.append("s.timestamp < date(?, '+1 day')")
+        else:
+            where.append('s.timestamp <= ?')
+        params.append(to)
+    if args.get('q'):
+        pattern = _like_pattern(args.get('q').strip())
+        where.append("(c.name LIKE ? ESCAPE '\\' OR s.unique_id LIKE ? ESCAPE '\\')")
+        params.extend([pattern, pattern])
+    if args.get('cursor'):
+        value, unique_id = decode_cursor(args.get('cursor'), sort)
+        op = '<' if order == 'desc' else '>'
+        if sort == 'unique_id':
+            where.append(f's.unique_id {op} ?')
+            params.append(unique_id)
+        else:
+            where.append(f'({sort_expr}, {id_expr}) {op} (?, ?)')
+            params.extend([value, unique_id])
+
+    sql = (
+        f'SELECT {select_sql}, {sort_expr} AS _sort_value, {id_expr} AS _cursor_id '
+        'FROM submissions s JOIN submission_contacts c ON c.unique_id = s.unique_id'
+    )
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    direction = order.upper()
+    if sort == 'unique_id':
+        sql += f' ORDER BY s.unique_id {direction}'
+    else:
+        sql += f' ORDER BY {sort_expr} {direction}, {id_expr} {direction}'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, last['_sort_value'], last['_cursor_id'])
+    return rows, next_cursor
@@ -0,0 +1,205 @@
+import os
+import math
+import time
+import threading
+import collections
+from contextlib import contextmanager
+
+from flask import current_app, jsonify, request, has_request_context
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: slots are only enforced within the process
+    fcntl = None
+
+# Admission control for upstream model calls. LLM_MAX_CONCURRENCY slots are shared by every worker
+# on the host: a slot is an flock on one of the files in LLM_SLOT_DIR, so it is released by the
+# kernel even if the holding process dies. Callers that find no free slot wait in a bounded
+# per-process queue that grants slots round-robin across users (X-User-Id header, ?user= or the
+# JSON userId), so one agent bulk-saving cannot hold everyone else back. Callers that name no user
+# share one bucket that takes its turn like a user but is not held to the per-user share; client
+# addresses are not used, since behind a proxy every agent would look alike. A full queue, a user
+# over their share of it, or a wait past LLM_QUEUE_TIMEOUT fails fast with 503 / 429 and a
+# Retry-After estimate.
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+_UNIDENTIFIED = None  # queue key of callers that name no user
+
+
+class LLMOverloaded(Exception):
+    """No model capacity for this call; maps to an HTTP 429 or 503 with Retry-After."""
+
+    def __init__(self, message, status=503, retry_after=5):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Limiter:
+    def __init__(self, slot_dir, slots, queue_max, per_user, wait_timeout, poll_interval=0.05):
+        self.slot_dir = slot_dir
+        self.slots = max(1, slots)
+        self.queue_max = max(0, queue_max)
+        self.per_user = max(1, per_user)
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._queues = collections.OrderedDict()  # user -> deque of waiting tickets, in turn order
+        self._held = 0
+        self._avg_hold = 5.0  # seconds, exponentially weighted
+        self.stats = {'granted': 0, 'rejected_queue_full': 0, 'rejected_user_share': 0, 'timed_out': 0}
+        if fcntl is not None:
+            os.makedirs(slot_dir, exist_ok=True)
+
+    def _queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _retry_after(self, ahead: int) -> int:
+        return max(1, math.ceil(self._avg_hold * (ahead + 1) / self.slots))
+
+    def _is_next(self, ticket) -> bool:
+        for queue in self._queues.values():
+            if queue:
+                return queue[0] is ticket
+        return False
+
+    def _try_slot(self):
+        if fcntl is None:
+            return -1 if self._held < self.slots else None
+        for i in range(self.slots):
+            fd = os.open(os.path.join(self.slot_dir, f'slot-{i}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                os.close(fd)
+        return None
+
+    def _remove(self, user, ticket):
+        queue = self._queues.get(user)
+        if queue is not None:
+            try:
+                queue.remove(ticket)
+            except ValueError:
+                pass
+            if not queue:
+                del self._queues[user]
+
+    def _granted(self, fd):
+        self._held += 1
+        self.stats['granted'] += 1
+        return fd
+
+    def acquire(self, user):
+        with self._cond:
+            queued = self._queued()
+            if not queued:
+                # Nobody waiting here: take a free slot straight away if any worker left one
+                fd = self._try_slot()
+                if fd is not None:
+                    return self._granted(fd)
+            if user is not _UNIDENTIFIED and len(self._queues.get(user, ())) >= self.per_user:
+                self.stats['rejected_user_share'] += 1
+                raise LLMOverloaded('Too many model requests queued for this user; retry shortly.', 429, self._retry_after(queued))
+            # Slots are shared host-wide, so this worker's own _held says nothing about whether
+            # they are all taken; the queue length alone decides
+            if queued >= self.queue_max:
+                self.stats['rejected_queue_full'] += 1
+                raise LLMOverloaded('Model capacity is saturated; retry shortly.', 503, self._retry_after(queued))
+            ticket = object()
+            self._queues.setdefault(user, collections.deque()).append(ticket)
+            deadline = time.monotonic() + self.wait_timeout
+            try:
+                while True:
+                    if self._is_next(ticket):
+                        fd = self._try_slot()
+                        if fd is not None:
+                            self._remove(user, ticket)
+                            if user in self._queues:
+                                # This user's next call goes behind everyone already waiting
+                                self._queues.move_to_end(user)
+                            self._cond.notify_all()
+                            return self._granted(fd)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timed_out'] += 1
+                        raise LLMOverloaded('Timed out waiting for model capacity; retry shortly.', 503, self._retry_after(self._queued()))
+                    self._cond.wait(min(self.poll_interval, remaining))
+            except BaseException:
+                self._remove(user, ticket)
+                self._cond.notify_all()
+                raise
+
+    def release(self, fd, held_for: float):
+        if fd >= 0:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        with self._cond:
+            self._held -= 1
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_for
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return dict(self.stats, in_flight=self._held, queued=self._queued(),
+                        users_waiting=len(self._queues), avg_call_seconds=round(self._avg_hold, 2))
+
+
+def _limiter() -> _Limiter:
+    # Keyed by pid: a limiter built before a fork keeps its waiters and counters in the parent
+    key = os.getpid()
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        with _LIMITERS_LOCK:
+            limiter = _LIMITERS.get(key)
+            if limiter is None:
+                config = current_app.config
+                limiter = _Limiter(
+                    slot_dir=config.get('LLM_SLOT_DIR') or os.path.join(current_app.instance_path, 'llm_slots'),
+                    slots=int(config.get('LLM_MAX_CONCURRENCY', 8)),
+                    queue_max=int(config.get('LLM_QUEUE_MAX', 32)),
+                    per_user=int(config.get('LLM_QUEUE_PER_USER', 4)),
+                    wait_timeout=float(config.get('LLM_QUEUE_TIMEOUT', 30)),
+                )
+                _LIMITERS[key] = limiter
+    return limiter
+
+
+def _current_user():
+    if not has_request_context():
+        return 'background'
+    user = request.headers.get('X-User-Id') or request.args.get('user')
+    if not user and request.is_json:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            user = payload.get('userId')
+    user = str(user or '').strip()
+    # Templates send 'Unknown' when nobody is logged in
+    return user if user and user != 'Unknown' else _UNIDENTIFIED
+
+
+@contextmanager
+def llm_slot():
+    """Hold one upstream model slot for the duration of a call (raises LLMOverloaded)."""
+    limiter = _limiter()
+    fd = limiter.acquire(_current_user())
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        limiter.release(fd, time.monotonic() - started)
+
+
+def get_limiter_stats() -> dict:
+    limiter = _LIMITERS.get(os.getpid())
+    return limiter.snapshot() if limiter else {}
+
+
+def overloaded_response(e: LLMOverloaded, **extra):
+    body = dict(extra, error=str(e), retry_after=e.retry_after)
+    response = jsonify(body)
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
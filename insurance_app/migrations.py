@@ -0,0 +1,956 @@
+import sqlite3
+
+# Ordered, one-shot schema migrations. Each database keeps a schema_version table recording which
+# steps have been applied, so a steady-state boot only reads the current version. New schema or
+# data changes are appended as a new (version, name, fn) step; existing steps must never be edited.
+
+
+def _columns(cursor, table: str) -> set:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {info[1] for info in cursor.fetchall()}
+
+
+def _add_columns(cursor, table: str, columns: list):
+    existing = _columns(cursor, table)
+    for name, decl in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+# ---------------- insurance_form.db ----------------
+
+def _submissions_base(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submissions (
+            unique_id TEXT PRIMARY KEY,
+            full_name TEXT,
+            timestamp TEXT NOT NULL,
+            agent TEXT,
+            form_summary TEXT NOT NULL
+        )
+    ''')
+
+    # Migration: rename created_at -> first_created_at, created_by -> first_created_by
+    # Prefer RENAME COLUMN when supported; otherwise ensure new columns exist and backfill
+    columns = _columns(cursor, 'submissions')
+    if 'first_created_at' not in columns and 'created_at' in columns:
+        try:
+            cursor.execute("ALTER TABLE submissions RENAME COLUMN created_at TO first_created_at")
+        except Exception:
+            cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_at TEXT")
+            cursor.execute("UPDATE submissions SET first_created_at = created_at WHERE first_created_at IS NULL OR TRIM(COALESCE(first_created_at,'')) = ''")
+    if 'first_created_by' not in columns and 'created_by' in columns:
+        try:
+            cursor.execute("ALTER TABLE submissions RENAME COLUMN created_by TO first_created_by")
+        except Exception:
+            cursor.execute("ALTER TABLE submissions ADD COLUMN first_created_by TEXT")
+            cursor.execute("UPDATE submissions SET first_created_by = COALESCE(first_created_by, created_by)")
+
+    _add_columns(cursor, 'submissions', [
+        ('plans_chosen', 'TEXT'),
+        ('supervisor_approval_status', "TEXT DEFAULT 'SUP_REVIEW'"),
+        ('supervisor_comments', 'TEXT'),
+        ('supervisor_selected_plans', 'TEXT'),
+        ('client_comments', 'TEXT'),
+        ('underwriter_status', 'TEXT'),
+        ('underwriter_comments', 'TEXT'),
+        ('first_created_at', 'TEXT'),
+        ('first_created_by', 'TEXT'),
+        ('supervisor_modified_at', 'TEXT'),
+        ('supervisor_modified_by', 'TEXT'),
+        ('underwriter_modified_at', 'TEXT'),
+        ('underwriter_modified_by', 'TEXT'),
+        ('client_review', 'INTEGER DEFAULT 0'),
+        # Policy outcome fields (Agent action after With_UW)
+        ('policy_outcome', 'TEXT'),
+        ('policy_outcome_comment', 'TEXT'),
+        ('policy_outcome_modified_at', 'TEXT'),
+        ('policy_outcome_modified_by', 'TEXT'),
+        # Policy details fields (captured when Policy Created)
+        ('policy_number', 'TEXT'),
+        ('member_number', 'TEXT'),
+        ('member_name', 'TEXT'),
+        ('policy_start_date', 'TEXT'),
+        ('policy_period_months', 'INTEGER'),
+        ('policy_end_date', 'TEXT'),
+        ('policy_name', 'TEXT'),
+        ('policy_details', 'TEXT'),
+        # Final application status and audit
+        ('close_status', 'TEXT'),
+        ('close_status_modified_at', 'TEXT'),
+        ('close_status_modified_by', 'TEXT'),
+        ('close_comments', 'TEXT'),
+        ('Client_Agreed_Plans', 'TEXT'),
+        # Final rolled-up status fields
+        ('application_status', 'TEXT'),
+        ('application_comments', 'TEXT'),
+        ('application_modified_at', 'TEXT'),
+        ('application_modified_by', 'TEXT'),
+    ])
+
+
+def _backfill_creation_and_contact(cursor):
+    # Backfill first_created_at for existing rows where it's NULL/empty with a fixed historical date (requested format)
+    cursor.execute("""
+        UPDATE submissions
+        SET first_created_at = '2025-08-21_00-00-00'
+        WHERE first_created_at IS NULL OR TRIM(COALESCE(first_created_at, '')) = ''
+    """)
+    # Backfill first_created_by from agent where missing
+    cursor.execute("""
+        UPDATE submissions
+        SET first_created_by = COALESCE(first_created_by, agent)
+        WHERE first_created_by IS NULL OR TRIM(COALESCE(first_created_by, '')) = ''
+    """)
+    # Ensure JSON paths under $.primaryContact exist in form_summary
+    # 1) If form_summary is NULL/blank, create a minimal JSON with unique_id and applicant_name
+    cursor.execute("""
+        UPDATE submissions
+        SET form_summary = json_object(
+            'primaryContact', json_object(
+                'unique_id', unique_id,
+                'applicant_name', COALESCE(NULLIF(full_name, ''), unique_id)
+            )
+        )
+        WHERE form_summary IS NULL OR TRIM(COALESCE(form_summary, '')) = ''
+    """)
+    # 2) If JSON exists but either unique_id or applicant_name is missing/blank, set both in one pass
+    cursor.execute("""
+        UPDATE submissions
+        SET form_summary = json_set(
+            form_summary,
+            '$.primaryContact.unique_id',
+            COALESCE(NULLIF(json_extract(form_summary, '$.primaryContact.unique_id'), ''), unique_id),
+            '$.primaryContact.applicant_name',
+            COALESCE(NULLIF(json_extract(form_summary, '$.primaryContact.applicant_name'), ''), COALESCE(NULLIF(full_name, ''), unique_id))
+        )
+        WHERE json_extract(form_summary, '$.primaryContact') IS NOT NULL
+          AND (
+                json_extract(form_summary, '$.primaryContact.unique_id') IS NULL
+             OR TRIM(COALESCE(json_extract(form_summary, '$.primaryContact.unique_id'), '')) = ''
+             OR json_extract(form_summary, '$.primaryContact.applicant_name') IS NULL
+             OR TRIM(COALESCE(json_extract(form_summary, '$.primaryContact.applicant_name'), '')) = ''
+          )
+    """)
+
+
+def _normalize_status_vocabulary(cursor):
+    # When plans_chosen is NULL/empty set supervisor_approval_status to 'OPEN'
+    cursor.execute("""
+        UPDATE submissions
+        SET supervisor_approval_status = 'OPEN'
+        WHERE (plans_chosen IS NULL OR TRIM(COALESCE(plans_chosen, '')) = '')
+          AND (supervisor_approval_status IS NULL OR TRIM(COALESCE(supervisor_approval_status, '')) = '' OR LOWER(supervisor_approval_status) IN ('pending','sup_review'))
+    """)
+    # 'pending' -> 'SUP_REVIEW', 'NA' -> 'OPEN', approved/rejected -> SUP_APPROVED/SUP_REJECTED
+    cursor.execute("""
+        UPDATE submissions
+        SET supervisor_approval_status = CASE
+            WHEN LOWER(supervisor_approval_status) = 'pending' THEN 'SUP_REVIEW'
+            WHEN UPPER(supervisor_approval_status) = 'NA' THEN 'OPEN'
+            WHEN LOWER(supervisor_approval_status) = 'approved' THEN 'SUP_APPROVED'
+            WHEN LOWER(supervisor_approval_status) = 'rejected' THEN 'SUP_REJECTED'
+        END
+        WHERE LOWER(COALESCE(supervisor_approval_status, '')) IN ('pending', 'na', 'approved', 'rejected')
+    """)
+    # Underwriter: pending -> SUP_REVIEW, NA/OPEN/blank -> NULL, rejected -> UW_Rejected, approved/UW_approved -> With_UW
+    cursor.execute("""
+        UPDATE submissions
+        SET underwriter_status = CASE
+            WHEN LOWER(underwriter_status) = 'pending' THEN 'SUP_REVIEW'
+            WHEN UPPER(underwriter_status) = 'REJECTED' THEN 'UW_Rejected'
+            WHEN UPPER(underwriter_status) IN ('APPROVED', 'UW_APPROVED') THEN 'With_UW'
+            ELSE NULL
+        END
+        WHERE underwriter_status IS NOT NULL
+          AND (UPPER(underwriter_status) IN ('PENDING', 'NA', 'OPEN', 'REJECTED', 'APPROVED', 'UW_APPROVED')
+               OR TRIM(underwriter_status) = '')
+    """)
+    cursor.execute("UPDATE submissions SET client_review = 0 WHERE client_review IS NULL")
+    # Align any application_status carrying legacy value
+    cursor.execute("UPDATE submissions SET application_status = 'With_UW' WHERE application_status = 'UW_approved'")
+
+
+# Sources of the application_* rollup: (source, modified_at, status, comments, modified_by).
+# The most recent modified_at wins; on a tie the earlier entry in this tuple wins.
+# The tie order matches the original Python rollup (a stable sort taking the last candidate):
+# application, then policy, then underwriter, then supervisor.
+ROLLUP_SOURCES = (
+    ('application', 'close_status_modified_at', 'close_status', 'close_comments', 'close_status_modified_by'),
+    ('policy', 'policy_outcome_modified_at', 'policy_outcome', 'policy_outcome_comment', 'policy_outcome_modified_by'),
+    ('underwriter', 'underwriter_modified_at', 'underwriter_status', 'underwriter_comments', 'underwriter_modified_by'),
+    ('supervisor', 'supervisor_modified_at', 'supervisor_approval_status', 'supervisor_comments', 'supervisor_modified_by'),
+)
+
+
+def _application_rollup_sql(where: str, with_source: bool = True) -> str:
+    """UPDATE that sets application_* from the latest source for the submissions matching `where`.
+
+    Used by the rollup trigger (where = "unique_id = NEW.unique_id") and for backfills. Rows whose
+    rollup is already current are not written, so the audit trigger only sees real changes.
+    """
+    keys = {
+        src: f"COALESCE(CASE WHEN TRIM(CAST({ts} AS TEXT)) <> '' THEN CAST({ts} AS TEXT) END, '')"
+        for src, ts, _, _, _ in ROLLUP_SOURCES
+    }
+    latest = f"MAX({', '.join(f'k_{src}' for src in keys)})"
+    pick_source = ' '.join(f"WHEN k_{src} THEN '{src}'" for src in keys)
+
+    def pick(index):
+        return 'CASE r.src ' + ' '.join(
+            f"WHEN '{spec[0]}' THEN submissions.{spec[index]}" for spec in ROLLUP_SOURCES
+        ) + ' END'
+
+    targets = ['application_status', 'application_comments', 'application_modified_at', 'application_modified_by']
+    values = [pick(2), pick(3), 'r.latest', pick(4)]
+    if with_source:
+        targets.append('application_source')
+        values.append('r.src')
+    assignments = ',\n            '.join(f'{t} = {v}' for t, v in zip(targets, values))
+    current = ', '.join(f'submissions.{t}' for t in targets)
+    return f'''
+        UPDATE submissions SET
+            {assignments}
+        FROM (
+            SELECT unique_id, {latest} AS latest, CASE {latest} {pick_source} END AS src
+            FROM (
+                SELECT unique_id, {', '.join(f'{expr} AS k_{src}' for src, expr in keys.items())}
+                FROM submissions WHERE {where}
+            )
+        ) AS r
+        WHERE submissions.unique_id = r.unique_id AND r.latest <> ''
+          AND ({current}) IS NOT ({', '.join(values)})
+    '''
+
+
+def _backfill_application_rollup(cursor):
+    # Backfill application_* for existing rows from the most recent of the four subsystems
+    cursor.execute(_application_rollup_sql('1', with_source=False))
+
+
+def _comments_noted(cursor):
+    # Individual comments per submission
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS comments_noted (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unique_id TEXT NOT NULL,
+            modifier TEXT NOT NULL,
+            comment TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            created_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (unique_id) REFERENCES submissions (unique_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_noted_uid ON comments_noted(unique_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_noted_timestamp ON comments_noted(timestamp DESC)')
+
+
+def _client_status_column(cursor):
+    # update_status writes client_status alongside close_status; it was never added to the schema
+    _add_columns(cursor, 'submissions', [('client_status', 'TEXT')])
+
+
+# Contact fields pulled out of form_summary. Shared by the trigger bodies (row alias NEW) and the
+# backfill (row alias submissions); the Python-side normalizers live in database.py and must match.
+# Duplicate checks match primaryContact.email / .phone OR the top-level email / phone, so each is
+# kept in its own indexed column (*_norm and *_alt_norm); `phone` is the directory's display value.
+def _contact_exprs(row: str) -> dict:
+    def path(p):
+        return f"CASE WHEN json_valid({row}.form_summary) THEN json_extract({row}.form_summary, '{p}') END"
+
+    def email_norm(p):
+        return f"NULLIF(LOWER(TRIM({path(p)})), '')"
+
+    def phone_norm(p):
+        value = f"CAST({path(p)} AS TEXT)"
+        for ch in (' ', '-', '(', ')', '.', '+'):
+            value = f"REPLACE({value}, '{ch}', '')"
+        return f"NULLIF({value}, '')"
+
+    return {
+        'name': f"COALESCE({row}.full_name, {path('$.primaryContact.applicant_name')})",
+        'email_norm': email_norm('$.primaryContact.email'),
+        'email_alt_norm': email_norm('$.email'),
+        'phone': f"COALESCE({path('$.primaryContact.phone')}, {path('$.phone')}, {path('$.primaryContact.mobile')}, {path('$.mobile')})",
+        'phone_norm': phone_norm('$.primaryContact.phone'),
+        'phone_alt_norm': phone_norm('$.phone'),
+    }
+
+
+def _contact_upsert_sql(row: str) -> str:
+    e = _contact_exprs(row)
+    return (
+        f"INSERT OR REPLACE INTO submission_contacts (unique_id, {', '.join(e)}) "
+        f"SELECT {row}.unique_id, {', '.join(e.values())}"
+    )
+
+
+def _contact_match_indexes(cursor):
+    for column in ('email_norm', 'email_alt_norm', 'phone_norm', 'phone_alt_norm'):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_submission_contacts_{column} ON submission_contacts({column})')
+
+
+def _contact_triggers(cursor):
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_contacts_insert AFTER INSERT ON submissions
+        BEGIN
+            {_contact_upsert_sql('NEW')};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_contacts_update AFTER UPDATE OF full_name, form_summary ON submissions
+        BEGIN
+            {_contact_upsert_sql('NEW')};
+        END
+    ''')
+
+
+def _submission_contacts(cursor):
+    # Side table kept in sync by triggers so duplicate checks and the client directory are index
+    # lookups instead of json_extract over every form_summary blob
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_contacts (
+            unique_id TEXT PRIMARY KEY,
+            name TEXT,
+            email_norm TEXT,
+            email_alt_norm TEXT,
+            phone TEXT,
+            phone_norm TEXT,
+            phone_alt_norm TEXT
+        )
+    ''')
+    _contact_match_indexes(cursor)
+    _contact_triggers(cursor)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_contacts_delete AFTER DELETE ON submissions
+        BEGIN
+            DELETE FROM submission_contacts WHERE unique_id = OLD.unique_id;
+        END
+    ''')
+    cursor.execute(_contact_upsert_sql('submissions') + ' FROM submissions')
+
+
+def _listing_indexes(cursor):
+    # Keyset pagination / filters used by insurance_app/listing.py (every submission has a
+    # submission_contacts row via the migration 7 triggers, so listings inner-join it)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_timestamp ON submissions(timestamp, unique_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_agent_timestamp ON submissions(agent, timestamp, unique_id)')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_submissions_status_timestamp ON submissions("
+        "LOWER(COALESCE(NULLIF(application_status, ''), supervisor_approval_status)), timestamp, unique_id)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_submission_contacts_name ON submission_contacts(COALESCE(name, ''), unique_id)")
+
+
+def _json_path_of_type(row: str, path: str, json_type: str, column: str = 'form_summary') -> str:
+    # `column` if it is valid JSON and `path` holds a value of json_type, else NULL (no rows from json_each)
+    return (f"CASE WHEN json_valid({row}.{column}) THEN "
+            f"CASE WHEN json_type({row}.{column}, '{path}') = '{json_type}' THEN {row}.{column} END END")
+
+
+def _member_name_expr(value: str) -> str:
+    return (f"COALESCE(NULLIF(TRIM(json_extract({value}, '$.name')), ''), "
+            f"NULLIF(TRIM(COALESCE(json_extract({value}, '$.first_name'), '') || ' ' || COALESCE(json_extract({value}, '$.last_name'), '')), ''))")
+
+
+def _members_sync_sql(row: str, source: str = '') -> str:
+    return f"""
+        INSERT INTO submission_members (unique_id, position, member_id, name, relationship, dob, age, gender)
+        SELECT {row}.unique_id, m.key, json_extract(m.value, '$.id'), {_member_name_expr('m.value')},
+               json_extract(m.value, '$.relationship'), json_extract(m.value, '$.dob'),
+               json_extract(m.value, '$.age'), json_extract(m.value, '$.gender')
+        FROM {source}json_each({_json_path_of_type(row, '$.members', 'array')}, '$.members') m
+        WHERE m.type = 'object'
+    """
+
+
+def _plan_meta_sync_sql(row: str, source: str = '') -> str:
+    return f"""
+        INSERT INTO submission_plan_meta (unique_id, plan_name, role, premium, sum_insured, policy_term, member_name, data)
+        SELECT {row}.unique_id, p.key, r.key,
+               json_extract(r.value, '$.premium'), json_extract(r.value, '$.sum_insured'),
+               json_extract(r.value, '$.policy_term'), json_extract(r.value, '$.memberName'), r.value
+        FROM {source}json_each({_json_path_of_type(row, '$.plan_meta', 'object')}, '$.plan_meta') p,
+             json_each(CASE WHEN p.type = 'object' THEN p.value END) r
+        WHERE r.type = 'object'
+    """
+
+
+def _members_and_plan_meta(cursor):
+    # Members and per-plan, per-role metadata derived from form_summary by triggers, mirroring
+    # submission_contacts. form_summary stays the document of record; these are its indexed view.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_members (
+            unique_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            member_id TEXT,
+            name TEXT,
+            relationship TEXT,
+            dob TEXT,
+            age TEXT,
+            gender TEXT,
+            PRIMARY KEY (unique_id, position)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_plan_meta (
+            unique_id TEXT NOT NULL,
+            plan_name TEXT NOT NULL,
+            role TEXT NOT NULL,
+            premium TEXT,
+            sum_insured TEXT,
+            policy_term TEXT,
+            member_name TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (unique_id, role, plan_name)
+        )
+    ''')
+    for event in ('INSERT', 'UPDATE OF form_summary'):
+        suffix = 'insert' if event == 'INSERT' else 'update'
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_submission_members_{suffix} AFTER {event} ON submissions
+            BEGIN
+                DELETE FROM submission_members WHERE unique_id = NEW.unique_id;
+                {_members_sync_sql('NEW')};
+                DELETE FROM submission_plan_meta WHERE unique_id = NEW.unique_id;
+                {_plan_meta_sync_sql('NEW')};
+            END
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_members_delete AFTER DELETE ON submissions
+        BEGIN
+            DELETE FROM submission_members WHERE unique_id = OLD.unique_id;
+            DELETE FROM submission_plan_meta WHERE unique_id = OLD.unique_id;
+        END
+    ''')
+    # Backfill existing submissions
+    cursor.execute('DELETE FROM submission_members')
+    cursor.execute('DELETE FROM submission_plan_meta')
+    cursor.execute(_members_sync_sql('s', source='submissions s, '))
+    cursor.execute(_plan_meta_sync_sql('s', source='submissions s, '))
+
+
+def _row_version(cursor):
+    # Optimistic concurrency for PATCH /submission/<id>. Writers that do not bump row_version
+    # themselves get it bumped by the trigger (recursive triggers are off, so it fires once).
+    _add_columns(cursor, 'submissions', [('row_version', 'INTEGER NOT NULL DEFAULT 0')])
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_submissions_row_version AFTER UPDATE ON submissions
+        WHEN NEW.row_version = OLD.row_version
+        BEGIN
+            UPDATE submissions SET row_version = OLD.row_version + 1 WHERE unique_id = NEW.unique_id;
+        END
+    ''')
+
+
+def _policy_document_files(cursor):
+    # Metadata for policy documents held in the content-addressed blob store (blob_store.py).
+    # The legacy base64 table is created too so lookups can fall back to it; its rows are moved
+    # into the blob store the first time they are read.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS policy_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unique_id TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            file_data LONGBLOB NOT NULL,
+            uploaded_at TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(unique_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS policy_document_files (
+            unique_id TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            content_type TEXT,
+            uploaded_at TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_policy_document_files_hash ON policy_document_files(content_hash)')
+
+
+def _application_rollup_trigger(cursor):
+    # application_* is derived from the supervisor / underwriter / policy / close columns by trigger,
+    # in the same statement's transaction as the change. application_source records which one won.
+    _add_columns(cursor, 'submissions', [('application_source', 'TEXT')])
+    columns = ', '.join(col for spec in ROLLUP_SOURCES for col in spec[1:])
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submissions_application_rollup')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_submissions_application_rollup AFTER UPDATE OF {columns} ON submissions
+        BEGIN
+            {_application_rollup_sql('unique_id = NEW.unique_id')};
+        END
+    ''')
+    cursor.execute(_application_rollup_sql('1'))
+
+
+_COUNTER_KEYS = ('agent', 'application_status', 'supervisor_approval_status')
+
+
+def _dashboard_counters(cursor):
+    # Submission counts per (agent, application_status, supervisor_approval_status), kept current by
+    # triggers so /stats and the dashboard tiles sum a few rows instead of scanning submissions.
+    # NULL keys are stored as '' so they can be part of the primary key.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            agent TEXT NOT NULL,
+            application_status TEXT NOT NULL,
+            supervisor_approval_status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (agent, application_status, supervisor_approval_status)
+        ) WITHOUT ROWID
+    ''')
+
+    def keys(row):
+        return ', '.join(f"COALESCE({row}.{k}, '')" for k in _COUNTER_KEYS)
+
+    def match(row):
+        return ' AND '.join(f"{k} = COALESCE({row}.{k}, '')" for k in _COUNTER_KEYS)
+
+    def add(row):
+        return f'''
+            INSERT INTO dashboard_counters ({', '.join(_COUNTER_KEYS)}, count) VALUES ({keys(row)}, 1)
+            ON CONFLICT ({', '.join(_COUNTER_KEYS)}) DO UPDATE SET count = count + 1;
+        '''
+
+    def remove(row):
+        return f'''
+            UPDATE dashboard_counters SET count = count - 1 WHERE {match(row)};
+            DELETE FROM dashboard_counters WHERE {match(row)} AND count <= 0;
+        '''
+
+    changed = ' OR '.join(f'NEW.{k} IS NOT OLD.{k}' for k in _COUNTER_KEYS)
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_submissions_counters_ai AFTER INSERT ON submissions BEGIN {add("NEW")} END')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_submissions_counters_ad AFTER DELETE ON submissions BEGIN {remove("OLD")} END')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submissions_counters_au
+        AFTER UPDATE OF {', '.join(_COUNTER_KEYS)} ON submissions WHEN {changed}
+        BEGIN {remove("OLD")} {add("NEW")} END
+    ''')
+    cursor.execute('DELETE FROM dashboard_counters')
+    cursor.execute(f'''
+        INSERT INTO dashboard_counters ({', '.join(_COUNTER_KEYS)}, count)
+        SELECT {keys('submissions')}, COUNT(*) FROM submissions GROUP BY 1, 2, 3
+    ''')
+
+
+def _plan_name_expr(value: str) -> str:
+    # Policy rows may carry "Member - Plan"; keep the plan part, as the admin view always has
+    return (f"TRIM(CASE WHEN instr({value}, ' - ') > 0 "
+            f"THEN substr({value}, instr({value}, ' - ') + 3) ELSE {value} END)")
+
+
+def _policy_plans_sync_sql(row: str, table: str = '') -> str:
+    """Plans of a created policy: policy_details.rows[].plan plus the legacy policy_name column.
+    `table` is the FROM item that binds `row` ('' inside a trigger, where row is NEW)."""
+    used_at = f"COALESCE(NULLIF({row}.close_status_modified_at, ''), datetime('now'))"
+    rows = f"json_each({_json_path_of_type(row, '$.rows', 'array', 'policy_details')}, '$.rows') p"
+    return f"""
+        INSERT OR IGNORE INTO submission_policy_plans (unique_id, plan_name, used_at)
+        SELECT unique_id, plan_name, used_at FROM (
+            SELECT {row}.unique_id AS unique_id, {_plan_name_expr("json_extract(p.value, '$.plan')")} AS plan_name, {used_at} AS used_at
+            FROM {f'{table}, ' if table else ''}{rows}
+            WHERE {row}.close_status = 'Policy_Created' AND p.type = 'object'
+            UNION ALL
+            SELECT {row}.unique_id, {_plan_name_expr(f'{row}.policy_name')}, {used_at}
+            {f'FROM {table}' if table else ''}
+            WHERE {row}.close_status = 'Policy_Created'
+        ) WHERE plan_name IS NOT NULL AND plan_name != ''
+    """
+
+
+def _policy_plan_usage(cursor):
+    # submission_policy_plans: which plans each created policy uses (trigger-maintained from
+    # submissions). policy_plan_usage: per-plan policy count and last use, maintained from it.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_policy_plans (
+            unique_id TEXT NOT NULL REFERENCES submissions(unique_id) ON DELETE CASCADE,
+            plan_name TEXT NOT NULL,
+            used_at TEXT NOT NULL,
+            PRIMARY KEY (unique_id, plan_name)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_submission_policy_plans_plan ON submission_policy_plans(plan_name, used_at)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS policy_plan_usage (
+            plan_name TEXT PRIMARY KEY,
+            policies INTEGER NOT NULL,
+            last_used_at TEXT
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_policy_plans_usage_ai AFTER INSERT ON submission_policy_plans
+        BEGIN
+            INSERT INTO policy_plan_usage (plan_name, policies, last_used_at) VALUES (NEW.plan_name, 1, NEW.used_at)
+            ON CONFLICT (plan_name) DO UPDATE SET
+                policies = policies + 1,
+                last_used_at = MAX(COALESCE(last_used_at, ''), excluded.last_used_at);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_policy_plans_usage_ad AFTER DELETE ON submission_policy_plans
+        BEGIN
+            UPDATE policy_plan_usage SET
+                policies = policies - 1,
+                last_used_at = (SELECT MAX(used_at) FROM submission_policy_plans WHERE plan_name = OLD.plan_name)
+            WHERE plan_name = OLD.plan_name;
+            DELETE FROM policy_plan_usage WHERE plan_name = OLD.plan_name AND policies <= 0;
+        END
+    ''')
+    sync = _policy_plans_sync_sql('NEW')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_submissions_policy_plans_ai AFTER INSERT ON submissions BEGIN {sync}; END')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submissions_policy_plans_au
+        AFTER UPDATE OF policy_details, policy_name, close_status, close_status_modified_at ON submissions
+        BEGIN
+            DELETE FROM submission_policy_plans WHERE unique_id = NEW.unique_id;
+            {sync};
+        END
+    ''')
+    cursor.execute(_policy_plans_sync_sql('s', table='submissions s'))
+
+
+def _member_names_sync_sql(row: str, table: str = '') -> str:
+    """All member names of a submission in the order /api/agent/member_names returns them: the
+    member_name column, policy_details.rows[].member_name, the applicant, form_summary members,
+    then plan-metadata memberName (submission_plan_meta, in row order). Values may be comma separated; names are trimmed and de-duplicated
+    keeping the first occurrence. `table` binds `row` as in _policy_plans_sync_sql."""
+    from_ = f'{table}, ' if table else ''
+    single = f'FROM {table}' if table else ''
+    rows = f"json_each({_json_path_of_type(row, '$.rows', 'array', 'policy_details')}, '$.rows') r"
+    members = f"json_each({_json_path_of_type(row, '$.members', 'array')}, '$.members') m"
+    sources = f"""
+        SELECT {row}.unique_id AS unique_id, 0 AS src, 0 AS a, 0 AS b, {row}.member_name AS raw {single}
+        UNION ALL
+        SELECT {row}.unique_id, 1, r.key, 0, json_extract(r.value, '$.member_name') FROM {from_}{rows} WHERE r.type = 'object'
+        UNION ALL
+        SELECT {row}.unique_id, 2, 0, 0, {_contact_exprs(row)['name']} {single}
+        UNION ALL
+        SELECT {row}.unique_id, 3, m.key, 0, {_member_name_expr('m.value')} FROM {from_}{members} WHERE m.type = 'object'
+        UNION ALL
+        SELECT {row}.unique_id, 4, pm.rowid, 0, pm.member_name
+        FROM {from_}submission_plan_meta pm WHERE pm.unique_id = {row}.unique_id
+    """
+    # 'a, b' -> ["a"," b"]: json_quote escapes quotes and backslashes but leaves commas alone
+    split = """json_each('[' || replace(json_quote(CAST(v.raw AS TEXT)), ',', '","') || ']') n"""
+    return f"""
+        INSERT INTO submission_member_names (unique_id, position, name)
+        SELECT unique_id, ROW_NUMBER() OVER (PARTITION BY unique_id ORDER BY MIN(ord)), name FROM (
+            SELECT v.unique_id AS unique_id, TRIM(n.value) AS name,
+                   printf('%d %010d %010d %010d', v.src, v.a, v.b, n.key) AS ord
+            FROM ({sources}) v, {split}
+            WHERE v.raw IS NOT NULL AND TRIM(n.value) != ''
+        ) GROUP BY unique_id, name
+    """
+
+
+def _member_names(cursor):
+    # Precomputed answer of /api/agent/member_names, rebuilt by trigger whenever a source column changes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS submission_member_names (
+            unique_id TEXT NOT NULL REFERENCES submissions(unique_id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (unique_id, position)
+        ) WITHOUT ROWID
+    ''')
+    sync = _member_names_sync_sql('NEW')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS trg_submission_member_names_ai AFTER INSERT ON submissions BEGIN {sync}; END')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_member_names_au
+        AFTER UPDATE OF member_name, policy_details, full_name, form_summary ON submissions
+        BEGIN
+            DELETE FROM submission_member_names WHERE unique_id = NEW.unique_id;
+            {sync};
+        END
+    ''')
+    cursor.execute('DELETE FROM submission_member_names')
+    cursor.execute(_member_names_sync_sql('s', table='submissions s'))
+
+
+def _plan_summaries(cursor):
+    # Plan selection summary per client (was plan_summaries/<uid>.plans.json). One JSON column per
+    # role so agent, supervisor and client edits never rewrite each other's data; row_version backs
+    # the ETag / If-Match checks of /plan_summary/<uid>.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS plan_summaries (
+            unique_id TEXT PRIMARY KEY,
+            proposed TEXT NOT NULL DEFAULT '{}',
+            agent_selected TEXT NOT NULL DEFAULT '[]',
+            supervisor_selected TEXT NOT NULL DEFAULT '[]',
+            client_agreed TEXT NOT NULL DEFAULT '[]',
+            row_version INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT
+        ) WITHOUT ROWID
+    ''')
+
+
+def _catalog_version_triggers(cursor, table: str, name: str):
+    """Bump catalog_versions[name] on every write to `table`. Shared by each database's
+    catalog_versions step; the versions back conditional.catalog_etag."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO catalog_versions (name, version) VALUES (?, 1)', (name,))
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_catalog_{event.lower()} AFTER {event} ON {table}
+            BEGIN
+                UPDATE catalog_versions SET version = version + 1 WHERE name = '{name}';
+            END
+        ''')
+
+
+def _submissions_catalog_version(cursor):
+    # Validator for whole-table listings (/clients)
+    _catalog_version_triggers(cursor, 'submissions', 'submissions')
+
+
+def _json_value(row: str, path: str, column: str = 'form_summary') -> str:
+    # json_extract that yields NULL instead of failing when `column` is not valid JSON
+    return f"CASE WHEN json_valid({row}.{column}) THEN json_extract({row}.{column}, '{path}') END"
+
+
+def _plan_meta_entries_sql(row: str) -> str:
+    return f"""
+        SELECT p.key AS plan_name, r.key AS role, r.value AS data
+        FROM json_each({_json_path_of_type(row, '$.plan_meta', 'object')}, '$.plan_meta') p,
+             json_each(CASE WHEN p.type = 'object' THEN p.value END) r
+        WHERE r.type = 'object'
+    """
+
+
+def _plan_meta_table_of_record(cursor):
+    # submission_plan_meta becomes the record for plan metadata: the plan-metadata endpoints upsert
+    # its rows and readers overlay it onto form_summary. A form_summary write only carries over the
+    # (plan, role) entries it changed, and members re-sync only when form_summary.members changes.
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submission_members_update')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_submission_members_update AFTER UPDATE OF form_summary ON submissions
+        WHEN ({_json_value('OLD', '$.members')}) IS NOT ({_json_value('NEW', '$.members')})
+        BEGIN
+            DELETE FROM submission_members WHERE unique_id = NEW.unique_id;
+            {_members_sync_sql('NEW')};
+        END
+    ''')
+    old, new = _plan_meta_entries_sql('OLD'), _plan_meta_entries_sql('NEW')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_submission_plan_meta_update AFTER UPDATE OF form_summary ON submissions
+        WHEN ({_json_value('OLD', '$.plan_meta')}) IS NOT ({_json_value('NEW', '$.plan_meta')})
+        BEGIN
+            DELETE FROM submission_plan_meta WHERE unique_id = NEW.unique_id AND (plan_name, role) IN (
+                SELECT plan_name, role FROM ({old}) EXCEPT SELECT plan_name, role FROM ({new})
+            );
+            INSERT INTO submission_plan_meta (unique_id, plan_name, role, premium, sum_insured, policy_term, member_name, data)
+            SELECT NEW.unique_id, n.plan_name, n.role,
+                   json_extract(n.data, '$.premium'), json_extract(n.data, '$.sum_insured'),
+                   json_extract(n.data, '$.policy_term'), json_extract(n.data, '$.memberName'), n.data
+            FROM ({new}) n
+            WHERE n.data IS NOT (SELECT o.data FROM ({old}) o WHERE o.plan_name = n.plan_name AND o.role = n.role)
+            ON CONFLICT (unique_id, role, plan_name) DO UPDATE SET
+                premium = excluded.premium, sum_insured = excluded.sum_insured, policy_term = excluded.policy_term,
+                member_name = excluded.member_name, data = excluded.data;
+        END
+    ''')
+    # submission_member_names now reads memberName from the table, so rebuild it when those change
+    for event, ref, when in (
+        ('INSERT', 'NEW', 'NEW.member_name IS NOT NULL'),
+        ('UPDATE OF member_name', 'NEW', 'OLD.member_name IS NOT NEW.member_name'),
+        ('DELETE', 'OLD', 'OLD.member_name IS NOT NULL'),
+    ):
+        names = _member_names_sync_sql('s', table=f'(SELECT * FROM submissions WHERE unique_id = {ref}.unique_id) s')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_submission_plan_meta_names_{event.split()[0].lower()}
+            AFTER {event} ON submission_plan_meta WHEN {when}
+            BEGIN
+                DELETE FROM submission_member_names WHERE unique_id = {ref}.unique_id;
+                {names};
+            END
+        ''')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submission_member_names_ai')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submission_member_names_au')
+    _member_names(cursor)
+
+
+def _contact_match_columns(cursor):
+    # Step 7 first shipped with one COALESCEd email / phone column each, which dropped matches on
+    # the top-level value when primaryContact also had one; split them and rebuild the triggers
+    _add_columns(cursor, 'submission_contacts', [('email_alt_norm', 'TEXT'), ('phone_alt_norm', 'TEXT')])
+    cursor.execute('DROP INDEX IF EXISTS idx_submission_contacts_email')
+    cursor.execute('DROP INDEX IF EXISTS idx_submission_contacts_phone')
+    _contact_match_indexes(cursor)
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submission_contacts_insert')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_submission_contacts_update')
+    _contact_triggers(cursor)
+    cursor.execute(_contact_upsert_sql('submissions') + ' FROM submissions')
+
+
+SUBMISSIONS_MIGRATIONS = [
+    (1, 'submissions_base', _submissions_base),
+    (2, 'backfill_creation_and_contact', _backfill_creation_and_contact),
+    (3, 'normalize_status_vocabulary', _normalize_status_vocabulary),
+    (4, 'backfill_application_rollup', _backfill_application_rollup),
+    (5, 'comments_noted', _comments_noted),
+    (6, 'client_status_column', _client_status_column),
+    (7, 'submission_contacts', _submission_contacts),
+    (8, 'listing_indexes', _listing_indexes),
+    (9, 'members_and_plan_meta', _members_and_plan_meta),
+    (10, 'row_version', _row_version),
+    (11, 'policy_document_files', _policy_document_files),
+    (12, 'application_rollup_trigger', _application_rollup_trigger),
+    (13, 'dashboard_counters', _dashboard_counters),
+    (14, 'policy_plan_usage', _policy_plan_usage),
+    (15, 'member_names', _member_names),
+    (16, 'plan_summaries', _plan_summaries),
+    (17, 'catalog_versions', _submissions_catalog_version),
+    (18, 'plan_meta_table_of_record', _plan_meta_table_of_record),
+    (19, 'contact_match_columns', _contact_match_columns),
+]
+
+
+# ---------------- Application_Status.db ----------------
+
+def _application_status_log(cursor):
+    cursor.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS application_status_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unique_id TEXT NOT NULL,
+            application_status TEXT,
+            application_comments TEXT,
+            application_modified_at TEXT,
+            application_modified_by TEXT,
+            source TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
+        )
+        '''
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_application_status_log_uid ON application_status_log(unique_id)')
+
+
+APPLICATION_STATUS_MIGRATIONS = [
+    (1, 'application_status_log', _application_status_log),
+]
+
+
+# ---------------- users.db ----------------
+# The Agent / Supervisor tables are provisioned outside this app; see database.init_user_db.
+
+def _user_counters(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            name TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    for table in ('Agent', 'Supervisor'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_counters_ai AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO dashboard_counters (name, count) VALUES ('{table}', 1)
+                ON CONFLICT (name) DO UPDATE SET count = count + 1;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_counters_ad AFTER DELETE ON {table}
+            BEGIN
+                UPDATE dashboard_counters SET count = count - 1 WHERE name = '{table}';
+            END
+        ''')
+        cursor.execute(
+            f"INSERT OR REPLACE INTO dashboard_counters (name, count) SELECT '{table}', COUNT(*) FROM {table}"
+        )
+
+
+def _users_catalog_version(cursor):
+    # /supervisors lists both tables, so they share one version
+    for table in ('Agent', 'Supervisor'):
+        _catalog_version_triggers(cursor, table, 'users')
+
+
+USER_MIGRATIONS = [
+    (1, 'user_counters', _user_counters),
+    (2, 'catalog_versions', _users_catalog_version),
+]
+
+
+# ---------------- derived.db ----------------
+
+def _features_catalog_version(cursor):
+    _catalog_version_triggers(cursor, 'features', 'features')
+
+
+DERIVED_MIGRATIONS = [
+    (1, 'catalog_versions', _features_catalog_version),
+]
+
+
+# ---------------- justification_reports.db ----------------
+
+def _justification_reports(cursor):
+    cursor.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS justification_reports (
+            client_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            raw_size INTEGER NOT NULL,
+            updated_at TEXT DEFAULT (datetime('now'))
+        )
+        '''
+    )
+
+
+JUSTIFICATION_MIGRATIONS = [
+    (1, 'justification_reports', _justification_reports),
+]
+
+
+# ---------------- Runner ----------------
+
+def _current_version(conn) -> int:
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, steps, logger=None) -> int:
+    """Apply every step newer than the recorded schema_version, each in its own transaction.
+
+    Returns the number of steps applied (0 on a steady-state boot). BEGIN IMMEDIATE serializes
+    workers booting at the same time; the version is re-read under the lock before each step.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT (datetime('now'))
+        )
+    ''')
+    conn.commit()
+    latest = steps[-1][0] if steps else 0
+    if _current_version(conn) >= latest:
+        return 0
+
+    applied = 0
+    for version, name, fn in steps:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if _current_version(conn) >= version:
+                conn.rollback()
+                continue
+            fn(conn.cursor())
+            conn.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)', (version, name))
+            conn.commit()
+            applied += 1
+            if logger:
+                logger.info(f"Applied schema migration {version}: {name}")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return applied
@@ -0,0 +1,127 @@
+import os
+import gzip
+import hashlib
+import threading
+
+from jinja2 import meta, nodes, TemplateNotFound
+from flask import current_app, request, render_template
+
+from .assets import _accepted_encodings
+
+# Pre-rendered pages for templates that need no per-request context. A template qualifies when
+# every variable it reads (including through extends / include) is an app-level Jinja global such
+# as asset_url or url_for; anything touching request, session, g or flashed messages, or a view
+# supplied variable, is rendered per request as before. Cached pages are kept gzip-compressed with
+# a content ETag and re-rendered when any of their template files changes on disk.
+PER_REQUEST_GLOBALS = {'request', 'session', 'g', 'get_flashed_messages'}
+CACHE_CONTROL = 'no-cache'
+
+_LOCK = threading.Lock()
+
+
+def _template_files(env, name, seen=None):
+    """Source files of `name` and everything it references, or None when it is not context-free."""
+    seen = seen if seen is not None else {}
+    if name in seen:
+        return seen
+    try:
+        source, filename, _uptodate = env.loader.get_source(env, name)
+    except TemplateNotFound:
+        return None
+    ast = env.parse(source)
+    # Undeclared variables exclude Jinja globals, so per-request globals are looked for separately
+    if meta.find_undeclared_variables(ast) or any(n.name in PER_REQUEST_GLOBALS for n in ast.find_all(nodes.Name)):
+        return None
+    seen[name] = filename
+    for ref in meta.find_referenced_templates(ast):
+        if ref is None or _template_files(env, ref, seen) is None:
+            return None
+    return seen
+
+
+def _mtimes(files) -> tuple:
+    # Size as well, for filesystems with coarse mtime resolution
+    return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, files))
+
+
+def _render(app, name, files):
+    with app.test_request_context('/'):
+        body = render_template(name).encode('utf-8')
+    return {
+        'files': files,
+        'mtimes': _mtimes(files),
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+    }
+
+
+def prerender(app) -> dict:
+    """Render every context-free template once. Returns {template name: cache entry}."""
+    env = app.jinja_env
+    pages = {}
+    for name in env.list_templates(filter_func=lambda n: n.endswith('.html')):
+        files = _template_files(env, name)
+        if files is None:
+            continue
+        try:
+            pages[name] = _render(app, name, list(files.values()))
+        except Exception as e:
+            app.logger.warning(f"Not pre-rendering {name}: {e}")
+    return pages
+
+
+def _current_entry(name):
+    pages = current_app.extensions.get('page_cache')
+    entry = pages.get(name) if pages else None
+    if entry is None:
+        return None
+    try:
+        changed = _mtimes(entry['files']) != entry['mtimes']
+    except OSError:
+        changed = True
+    if changed:
+        app = current_app._get_current_object()
+        with _LOCK:
+            entry = pages.get(name)
+            try:
+                if _mtimes(entry['files']) != entry['mtimes']:
+                    # Jinja only reloads changed templates itself when auto_reload is on
+                    env = app.jinja_env
+                    if env.cache is not None:
+                        env.cache.clear()
+                    # Re-check eligibility too: an edit may have added a context variable
+                    files = _template_files(env, name)
+                    entry = _render(app, name, list(files.values())) if files else None
+            except Exception as e:
+                app.logger.warning(f"Dropping pre-rendered {name}: {e}")
+                entry = None
+            if entry is None:
+                pages.pop(name, None)
+            else:
+                pages[name] = entry
+    return entry
+
+
+def serve(name):
+    """Response for a pre-rendered template, or None when `name` must be rendered per request."""
+    entry = _current_entry(name)
+    if entry is None:
+        return None
+    response = current_app.response_class(mimetype='text/html')
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    if request.if_none_match.contains_weak(entry['etag']):
+        response.status_code = 304
+        return response
+    if 'gzip' in _accepted_encodings():
+        response.set_data(entry['gzip'])
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(gzip.decompress(entry['gzip']))
+    return response
+
+
+def init_app(app):
+    app.extensions['page_cache'] = prerender(app)
+    app.logger.info(f"Pre-rendered {len(app.extensions['page_cache'])} context-free templates")
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from flask import current_app
+
+from .database import get_derived_db_connection
+from .conditional import catalog_etag
+
+# Read-mostly resources shared by every request in a process: JSON configs and prompts next to
+# the package (reloaded when the file changes) and the derived.db features catalog (reloaded when
+# its catalog version changes). warm() loads them at startup; under gunicorn with preload_app the
+# master does this once and workers inherit the loaded objects copy-on-write.
+_LOCK = threading.Lock()
+_FILES = {}
+_CATALOGS = {}
+_CPU_SLOTS = None
+
+
+def _read_cached(path: str, parse):
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _FILES.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        value = parse(f.read())
+    with _LOCK:
+        _FILES[path] = (key, value)
+    return value
+
+
+def app_json(name: str, root: str = None):
+    """Parsed JSON file under the package root (e.g. select_plans_config.json). Shared: do not mutate."""
+    return _read_cached(os.path.join(root or current_app.root_path, name), json.loads)
+
+
+def app_text(name: str, root: str = None) -> str:
+    """Text file under the package root (e.g. prompt.txt)."""
+    return _read_cached(os.path.join(root or current_app.root_path, name), str)
+
+
+def features_frame():
+    """SELECT * FROM features as a DataFrame (a copy, callers may modify it)."""
+    import pandas as pd
+
+    conn = get_derived_db_connection()
+    try:
+        version = catalog_etag(conn, 'features')
+        key = current_app.config.get('DERIVED_DB_PATH')
+        cached = _CATALOGS.get(key)
+        if version is not None and cached and cached[0] == version:
+            frame = cached[1]
+        else:
+            frame = pd.read_sql_query('SELECT * FROM features', conn)
+            if version is not None:
+                with _LOCK:
+                    _CATALOGS[key] = (version, frame)
+    finally:
+        conn.close()
+    return frame.copy()
+
+
+def warm(app):
+    """Load configs, prompts and the plan catalog ahead of the first request."""
+    loaded = []
+    with app.app_context():
+        for name in ('proposed_plans_config.json', 'select_plans_config.json'):
+            try:
+                app_json(name)
+                loaded.append(name)
+            except Exception as e:
+                app.logger.warning(f"Preload of {name} failed: {e}")
+        try:
+            app_text('prompt.txt')
+            loaded.append('prompt.txt')
+        except Exception as e:
+            app.logger.warning(f"Preload of prompt.txt failed: {e}")
+        try:
+            loaded.append(f'features ({len(features_frame())} plans)')
+        except Exception as e:
+            app.logger.warning(f"Preload of the features catalog failed: {e}")
+    return loaded
+
+
+@contextmanager
+def cpu_slot():
+    """Hold one of ANALYSIS_CPU_SLOTS while running CPU-bound plan scoring.
+
+    Requests spend most of their time waiting on Gemini, so workers run many threads. When several
+    of them reach the pandas scoring at once they would otherwise share the GIL and all finish
+    late; the slots make them take turns so each finishes as soon as possible.
+    """
+    global _CPU_SLOTS
+    if _CPU_SLOTS is None:
+        with _LOCK:
+            if _CPU_SLOTS is None:
+                slots = int(current_app.config.get('ANALYSIS_CPU_SLOTS') or os.cpu_count() or 1)
+                _CPU_SLOTS = threading.BoundedSemaphore(max(1, slots))
+    with _CPU_SLOTS:
+        yield
+
+
+class StartupTimings:
+    """Wall-clock time of each create_app phase, logged once startup completes."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - t0) * 1000, 1)
+
+    def report(self) -> dict:
+        return {'pid': os.getpid(), 'phases_ms': dict(self.phases),
+                'total_ms': round((time.perf_counter() - self.started) * 1000, 1)}
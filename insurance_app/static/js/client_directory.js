@@ -17,22 +17,58 @@ document.addEventListener('DOMContentLoaded', async () => {
   const tbody = document.getElementById('results-body');
   const countEl = document.getElementById('result-count');
 
+  const btnMore = document.getElementById('btn-more');
+  const PAGE_SIZE = 100;
+
   let supervisors = [];
   let clients = [];
+  let nextCursor = null;
+
+  // Supervisor, status and Unique ID / name search are applied server-side; pages are fetched by cursor
+  async function fetchClients(cursor) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE, fields: 'name,unique_id,agent,supervisor_status,application_status' });
+    const st = normalizeStatus(selStatus.value);
+    const q = inpUid.value.trim();
+    if (st) params.set('status', st);
+    if (q) params.set('q', q);
+    supervisorAgents().forEach(a => params.append('agent', a));
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`/clients?${params.toString()}`);
+    const page = await res.json();
+    nextCursor = res.headers.get('X-Next-Cursor');
+    return Array.isArray(page) ? page : [];
+  }
+
+  async function reloadClients() {
+    try {
+      clients = await fetchClients(null);
+    } catch (e) {
+      console.error('Failed to load clients', e);
+      clients = [];
+      nextCursor = null;
+    }
+    render();
+  }
+
+  async function loadMore() {
+    if (!nextCursor) return;
+    try {
+      clients = clients.concat(await fetchClients(nextCursor));
+    } catch (e) {
+      console.error('Failed to load more clients', e);
+    }
+    render();
+  }
 
   async function loadData() {
     try {
-      const [supRes, cliRes] = await Promise.all([
-        fetch('/supervisors'),
-        fetch('/clients')
-      ]);
+      const supRes = await fetch('/supervisors');
       supervisors = await supRes.json();
-      clients = await cliRes.json();
       populateSupervisors();
-      render();
     } catch (e) {
       console.error('Failed to load data', e);
     }
+    await reloadClients();
   }
 
   function populateSupervisors() {
@@ -48,24 +84,17 @@ document.addEventListener('DOMContentLoaded', async () => {
 
   function normalizeStatus(s) { return (s || '').toString().trim().toLowerCase(); }
 
-  function applyFilters(list) {
+  // Agent ids for the selected supervisor (their own id too, for clients they submitted themselves)
+  function supervisorAgents() {
     const sup = selSupervisor.value.trim();
-    const st = normalizeStatus(selStatus.value);
-    const q = inpUid.value.trim().toLowerCase();
-
-    return list.filter(c => {
-      const matchUid = !q || (c.unique_id || '').toLowerCase().includes(q);
-      // Prefer application_status for filtering if present; fallback to supervisor_status otherwise
-      const statusForFilter = (c.application_status != null && c.application_status !== '') ? c.application_status : c.supervisor_status;
-      const matchStatus = !st || normalizeStatus(statusForFilter) === st;
-      // No supervisor id on clients list; if available via Agent -> Supervisor mapping, extend later
-      const matchSup = !sup || (c.agent || '').includes(sup) || (c.supervisor_id === sup);
-      return matchUid && matchStatus && matchSup;
-    });
+    if (!sup) return [];
+    const s = (Array.isArray(supervisors) ? supervisors : []).find(x => (x.user_id || x.name || '') === sup);
+    const agents = ((s && s.agents) || []).map(a => a.user_id).filter(Boolean);
+    return [sup, ...agents];
   }
 
   function render() {
-    const filtered = applyFilters(Array.isArray(clients) ? clients : []);
+    const filtered = Array.isArray(clients) ? clients : [];
     tbody.innerHTML = '';
     filtered.forEach(c => {
       const tr = document.createElement('tr');
@@ -80,17 +109,19 @@ document.addEventListener('DOMContentLoaded', async () => {
       `;
       tbody.appendChild(tr);
     });
-    countEl.textContent = `${filtered.length} result${filtered.length === 1 ? '' : 's'}`;
+    countEl.textContent = `${filtered.length}${nextCursor ? '+' : ''} result${filtered.length === 1 ? '' : 's'}`;
+    if (btnMore) btnMore.style.display = nextCursor ? '' : 'none';
   }
 
   // No row-level click handler needed; Unique ID is a direct link.
 
-  btnApply.addEventListener('click', render);
+  btnApply.addEventListener('click', reloadClients);
+  if (btnMore) btnMore.addEventListener('click', loadMore);
   btnClear.addEventListener('click', () => {
     selSupervisor.value = '';
     selStatus.value = '';
     inpUid.value = '';
-    render();
+    reloadClients();
   });
   btnBack.addEventListener('click', () => {
     window.location.href = '/html/Health_Insurance_Proposal_Request.html';
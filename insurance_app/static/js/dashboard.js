@@ -52,6 +52,7 @@ document.addEventListener('DOMContentLoaded', function() {
   // DATA LOADING AND TABLE POPULATION
   // ===================================
   let proposalsData = [];
+  let dashboardStats = null; // Server-side tallies from /stats (trigger-maintained counters)
   let allAgentsFromDb = []; // Agents fetched from /agents endpoint (includes agents with 0 submissions)
   let currentAgentFilter = ''; // Will be set to logged-in user by default
 
@@ -116,10 +117,13 @@ document.addEventListener('DOMContentLoaded', function() {
       const tableBody = document.getElementById('proposalsTableBody');
       tableBody.innerHTML = '<tr><td colspan="5" style="text-align: center; padding: 2rem;">Loading proposals...</td></tr>';
 
-      // Fetch clients data and agents list in parallel
-      const [clientsResponse, agentsResponse] = await Promise.all([
+      // Fetch clients data, agents list and tile counts in parallel
+      const isSupervisorRole = userRole && userRole.toLowerCase() === 'supervisor';
+      const statsUrl = isSupervisorRole ? '/stats' : `/stats?agent=${encodeURIComponent(userId)}`;
+      const [clientsResponse, agentsResponse, statsResponse] = await Promise.all([
         fetch('/clients'),
-        fetch('/agents')
+        fetch('/agents'),
+        fetch(statsUrl).catch(() => null)
       ]);
       
       if (!clientsResponse.ok) {
@@ -128,6 +132,13 @@ document.addEventListener('DOMContentLoaded', function() {
 
       const clients = await clientsResponse.json();
       console.log(clients);
+
+      // Tile counts come from the server; fall back to counting the loaded rows if unavailable
+      dashboardStats = null;
+      if (statsResponse && statsResponse.ok) {
+        const stats = await statsResponse.json();
+        dashboardStats = stats.submissions || null;
+      }
       
       // Store agents from database (includes agents with 0 submissions)
       if (agentsResponse.ok) {
@@ -162,33 +173,9 @@ document.addEventListener('DOMContentLoaded', function() {
         // Supervisors see all proposals by default
         currentAgentFilter = '';
       } else {
-        // Agents see ONLY their own proposals - never all proposals
-        const agentName = `${userId}`;
-        
-        // Check if user has proposals
-        const userHasProposals = proposalsData.some(p => 
-          p.agent && p.agent.toLowerCase().includes(userId.toLowerCase())
-        );
-        
-        if (userHasProposals) {
-          currentAgentFilter = agentName;
-        } else {
-          // If exact match not found, try partial match
-          const partialMatch = proposalsData.find(p => 
-            p.agent && (
-              p.agent.toLowerCase().includes(userId.toLowerCase()) ||
-              userId.toLowerCase().includes(p.agent.toLowerCase())
-            )
-          );
-          
-          if (partialMatch) {
-            currentAgentFilter = partialMatch.agent;
-          } else {
-            // IMPORTANT: Agents should NOT see all applications if they have none
-            // Keep their filter set to their userId so they see 0 results instead of all
-            currentAgentFilter = agentName;
-          }
-        }
+        // Agents see ONLY their own proposals - never all proposals. Matched exactly on their id,
+        // like the /stats?agent= counts on the tiles, so they see 0 rows rather than someone else's
+        currentAgentFilter = userId;
       }
       
       populateTable();
@@ -496,19 +483,19 @@ document.addEventListener('DOMContentLoaded', function() {
   function filterTable() {
     const searchTerm = searchInput ? searchInput.value.toLowerCase() : '';
     const statusValue = statusFilter ? statusFilter.value.toLowerCase() : 'all';
-    const agentValue = selectedAgent === 'All Agents' ? '' : selectedAgent.toLowerCase();
+    const agentValue = selectedAgent === 'All Agents' ? '' : selectedAgent;
 
     filteredRows = allRows.filter(row => {
       const name = row.querySelector('.client-name')?.textContent.toLowerCase() || '';
       const phone = (row.getAttribute('data-phone') || '').toLowerCase();
       const statusBadge = row.querySelector('.status-badge');
       const status = statusBadge?.textContent.toLowerCase() || '';
-      const agentCell = row.cells[2]?.textContent.toLowerCase() || '';
+      const agentCell = row.cells[2]?.textContent || '';
 
       // Search matches if the search term is found in name OR phone
       const matchesSearch = name.includes(searchTerm) || phone.includes(searchTerm);
       const matchesStatus = statusValue === 'all' || status.includes(statusValue);
-      const matchesAgent = !agentValue || agentCell.includes(agentValue);
+      const matchesAgent = !agentValue || isSameAgent(agentCell, agentValue);
 
       return matchesSearch && matchesStatus && matchesAgent;
     });
@@ -672,6 +659,23 @@ document.addEventListener('DOMContentLoaded', function() {
 // ===================================
 let activeStatFilter = null; // Track which stat card is active
 
+// Agent match used by the table filter and the tiles. Exact, as /stats?agent= counts on the
+// server, so the tile counts and the listed rows always agree.
+function isSameAgent(agent, agentId) {
+  return (agent || '').trim() === (agentId || '').trim();
+}
+
+// Server status counts keyed by display status, or null when /stats was unavailable
+function serverStatusCounts() {
+  if (!dashboardStats || !dashboardStats.by_status) return null;
+  const counts = {};
+  Object.entries(dashboardStats.by_status).forEach(([rawStatus, count]) => {
+    const status = normalizeStatus(rawStatus);
+    counts[status] = (counts[status] || 0) + count;
+  });
+  return { counts, total: dashboardStats.total };
+}
+
 function updateStatCards() {
   const statsSection = document.getElementById('statsSection');
   if (!statsSection) return;
@@ -686,13 +690,16 @@ function updateStatCards() {
     // supervisor view
     
     // Count all proposals by status
-    const statusCounts = {};
-    let totalCount = proposalsData.length;
-
-    proposalsData.forEach(p => {
-      const status = p.status || 'Open/Draft';
-      statusCounts[status] = (statusCounts[status] || 0) + 1;
-    });
+    const server = serverStatusCounts();
+    const statusCounts = server ? server.counts : {};
+    let totalCount = server ? server.total : proposalsData.length;
+
+    if (!server) {
+      proposalsData.forEach(p => {
+        const status = p.status || 'Open/Draft';
+        statusCounts[status] = (statusCounts[status] || 0) + 1;
+      });
+    }
 
     // Count proposals approved by this specific supervisor
     const userIdLower = userId.toLowerCase();
@@ -733,20 +740,20 @@ function updateStatCards() {
 
   } else {
     // agent view
-    const userIdLower = userId.toLowerCase();
-    const userProposals = proposalsData.filter(p =>
-      p.agent && p.agent.toLowerCase().includes(userIdLower)
-    );
-
-    // Count proposals by status
-    const statusCounts = {};
-    let totalCount = 0;
-
-    userProposals.forEach(p => {
-      const status = p.status || 'Open/Draft';
-      statusCounts[status] = (statusCounts[status] || 0) + 1;
-      totalCount++;
-    });
+    const userProposals = proposalsData.filter(p => isSameAgent(p.agent, userId));
+
+    // Count proposals by status (server counts are for this agent's id)
+    const server = serverStatusCounts();
+    const statusCounts = server ? server.counts : {};
+    let totalCount = server ? server.total : 0;
+
+    if (!server) {
+      userProposals.forEach(p => {
+        const status = p.status || 'Open/Draft';
+        statusCounts[status] = (statusCounts[status] || 0) + 1;
+        totalCount++;
+      });
+    }
 
     // Add total card first
     const totalCard = createStatCard('Total Proposals', totalCount, 'fa-folder', 'total', 'all');
@@ -848,7 +855,7 @@ function handleStatCardClick(filterValue, clickedCard) {
 function filterTable() {
   const searchTerm = searchInput ? searchInput.value.toLowerCase() : '';
   const statusValue = statusFilter ? statusFilter.value.toLowerCase() : 'all';
-  const agentValue = selectedAgent === 'All Agents' ? '' : selectedAgent.toLowerCase();
+  const agentValue = selectedAgent === 'All Agents' ? '' : selectedAgent;
   
   const userIdLower = userId.toLowerCase();
   const isSupervisor = userRole && userRole.toLowerCase() === 'supervisor';
@@ -858,12 +865,12 @@ function filterTable() {
     const phone = (row.getAttribute('data-phone') || '').toLowerCase();
     const statusBadge = row.querySelector('.status-badge');
     const status = statusBadge?.textContent.toLowerCase() || '';
-    const agentCell = row.cells[2]?.textContent.toLowerCase() || '';
+    const agentCell = row.cells[2]?.textContent || '';
 
     // Search matches if the search term is found in name OR phone
     const matchesSearch = name.includes(searchTerm) || phone.includes(searchTerm);
     const matchesStatus = statusValue === 'all' || status.includes(statusValue);
-    const matchesAgent = !agentValue || agentCell.includes(agentValue);
+    const matchesAgent = !agentValue || isSameAgent(agentCell, agentValue);
     
     // Apply stat card filter
     let matchesStatFilter = true;
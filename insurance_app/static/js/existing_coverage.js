@@ -151,11 +151,12 @@ function loadSavedDocument() {
             return null;
         })
         .then(data => {
-            if (data && data.success && data.fileData) {
+            if (data && data.success && data.fileUrl) {
                 console.log('[Existing Coverage] Found document on server:', data.fileName);
+                // Keep only metadata locally; the file itself is served (and cached) from fileUrl
                 const docData = {
                     fileName: data.fileName,
-                    fileData: data.fileData,
+                    fileUrl: data.fileUrl,
                     uploadedAt: data.uploadedAt
                 };
                 // Sync back to local
@@ -168,20 +169,27 @@ function loadSavedDocument() {
         .catch(error => console.log('[Existing Coverage] Error fetching document from server:', error));
 }
 
-async function saveDocumentToServer(uniqueId, docData) {
+async function saveDocumentToServer(uniqueId, docData, file) {
     try {
-        const response = await fetch('/api/save-policy-document', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                unique_id: uniqueId,
-                fileName: docData.fileName,
-                fileData: docData.fileData,
-                uploadedAt: docData.uploadedAt
-            })
-        });
+        if (!file) {
+            if (!docData.fileData) return;
+            // Rebuild the file from the locally kept data URL (documents attached before an ID existed)
+            file = await (await fetch(docData.fileData)).blob();
+        }
+        const body = new FormData();
+        body.append('unique_id', uniqueId);
+        body.append('uploadedAt', docData.uploadedAt || '');
+        body.append('file', file, docData.fileName);
+        const response = await fetch('/api/save-policy-document', { method: 'POST', body });
         if (!response.ok) {
             console.warn('Failed to save document to server:', response.status);
+            return;
+        }
+        const saved = await response.json();
+        if (saved && saved.fileUrl) {
+            // The server copy is authoritative: drop the data URL from localStorage
+            const stored = { fileName: docData.fileName, fileUrl: saved.fileUrl, uploadedAt: docData.uploadedAt };
+            localStorage.setItem(POLICY_DOC_STORAGE_KEY + uniqueId, JSON.stringify(stored));
         }
     } catch (error) {
         console.warn('Error saving document to server:', error);
@@ -324,7 +332,7 @@ document.addEventListener('click', function (e) {
 
                 // Only save to server if we have a real uniqueId
                 if (uniqueId) {
-                    saveDocumentToServer(uniqueId, docData);
+                    saveDocumentToServer(uniqueId, docData, file);
                 }
 
                 fileInput.value = ''; // Reset input
@@ -349,7 +357,9 @@ document.addEventListener('click', function (e) {
 
         if (docDataStr) {
             const docData = JSON.parse(docDataStr);
-            if (docData.fileData) {
+            if (docData.fileUrl) {
+                window.open(docData.fileUrl, '_blank');
+            } else if (docData.fileData) {
                 const win = window.open();
                 if (win) {
                     win.document.write(
@@ -94,12 +94,15 @@
         return null;
     }
 
-    async function getClientAgreedTimestamp(uid) {
+    async function getClientAgreedTimestamp(uid, history) {
         if (!uid) return null;
         try {
-            const r = await fetch('/api/agent/application_status_history/' + encodeURIComponent(uid));
-            if (!r.ok) return null;
-            const h = await r.json();
+            let h = history;
+            if (!Array.isArray(h)) {
+                const r = await fetch('/api/agent/application_status_history/' + encodeURIComponent(uid));
+                if (!r.ok) return null;
+                h = await r.json();
+            }
             if (!Array.isArray(h)) return null;
             const row = h.find(x => {
                 const s = (x.application_status || '').toUpperCase().trim();
@@ -143,14 +146,23 @@
             uid = localStorage.getItem('currentUniqueId');
         }
         
-        // Fetch data if we have uid but no data
+        // Fetch data if we have uid but no data (submission + status history in one request)
+        let history = null;
         if (!d && uid) {
             try {
-                const r = await fetch('/api/agent/submission/' + encodeURIComponent(uid));
+                const r = await fetch('/api/submissions/batch', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ unique_ids: [uid], facets: ['submission', 'history'] })
+                });
                 if (r.ok) {
-                    d = await r.json();
-                    // Cache for future use
-                    window.currentSubmissionData = d;
+                    const entry = ((await r.json()).results || {})[uid] || {};
+                    if (entry.submission) {
+                        d = entry.submission;
+                        history = entry.history || null;
+                        // Cache for future use
+                        window.currentSubmissionData = d;
+                    }
                 }
             } catch (e) {
                 console.warn('Error fetching submission data:', e);
@@ -164,7 +176,7 @@
 
         // Try to populate client_agreed_at if missing
         if (uid && !d.client_agreed_at) {
-            const ts = await getClientAgreedTimestamp(uid);
+            const ts = await getClientAgreedTimestamp(uid, history);
             if (ts) {
                 d.client_agreed_at = ts;
             } else if (d.close_status_modified_at) {
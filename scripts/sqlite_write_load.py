@@ -0,0 +1,115 @@
+"""Load test for the SQLite write path: concurrent writers through run_write() plus concurrent readers.
+
+Runs against a throwaway database, never the instance folder. Compare modes with e.g.
+
+    python scripts/sqlite_write_load.py                         # WAL + write queue (default)
+    python scripts/sqlite_write_load.py --journal DELETE --no-queue
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from insurance_app import config, database
+from insurance_app.db_writer import run_write, get_writer_stats
+
+
+def _insert_comment(conn, unique_id, n):
+    conn.execute(
+        'INSERT INTO comments_noted (unique_id, modifier, comment, timestamp) VALUES (?, ?, ?, ?)',
+        (unique_id, 'loadtest', f'comment {n}', time.strftime('%Y-%m-%dT%H:%M:%S'))
+    )
+
+
+def _seed_submission(conn, unique_id):
+    conn.execute(
+        "INSERT OR IGNORE INTO submissions (unique_id, full_name, timestamp, agent, form_summary) VALUES (?, ?, ?, ?, '{}')",
+        (unique_id, unique_id, time.strftime('%Y-%m-%dT%H:%M:%S'), 'loadtest')
+    )
+
+
+def build_app(db_dir, journal_mode, use_queue):
+    app = Flask('sqlite_write_load')
+    app.config.from_object(config)
+    app.config['DATABASE_PATH'] = os.path.join(db_dir, 'insurance_form.db')
+    app.config['APPLICATION_STATUS_DB_PATH'] = os.path.join(db_dir, 'Application_Status.db')
+    app.config['SQLITE_JOURNAL_MODE'] = journal_mode
+    app.config['SQLITE_WRITE_QUEUE'] = use_queue
+    database.init_app(app)
+    with app.app_context():
+        database.init_db()
+    database.set_journal_mode(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=500, help='writes per writer thread')
+    parser.add_argument('--journal', default='WAL')
+    parser.add_argument('--no-queue', action='store_true', help='commit each write on its own connection')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        app = build_app(db_dir, args.journal, not args.no_queue)
+        with app.app_context():
+            for i in range(args.writers):
+                run_write(_seed_submission, f'load_{i}')
+        errors = []
+        reads = [0] * args.readers
+        done = threading.Event()
+
+        def writer(idx):
+            with app.app_context():
+                for n in range(args.writes):
+                    try:
+                        run_write(_insert_comment, f'load_{idx}', n)
+                    except Exception as e:
+                        errors.append(str(e))
+
+        def reader(idx):
+            while not done.is_set():
+                with app.app_context():
+                    conn = database.get_db_connection()
+                    try:
+                        conn.execute('SELECT COUNT(*) FROM comments_noted').fetchone()
+                        reads[idx] += 1
+                    except Exception as e:
+                        errors.append(str(e))
+                    finally:
+                        conn.close()
+
+        readers = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+        writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        for t in readers:
+            t.start()
+        start = time.perf_counter()
+        for t in writers:
+            t.start()
+        for t in writers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        for t in readers:
+            t.join()
+
+        total = args.writers * args.writes
+        print(f"journal={args.journal} queue={'off' if args.no_queue else 'on'} "
+              f"writers={args.writers} readers={args.readers}")
+        print(f"writes: {total - len(errors)}/{total} in {elapsed:.2f}s -> {total / elapsed:.0f} writes/s")
+        print(f"reads:  {sum(reads)} -> {sum(reads) / elapsed:.0f} reads/s")
+        print(f"errors: {len(errors)}{' (first: ' + errors[0] + ')' if errors else ''}")
+        for path, stats in get_writer_stats().items():
+            avg = stats['jobs'] / stats['batches'] if stats['batches'] else 0
+            print(f"writer: {stats} avg_batch={avg:.1f}")
+
+
+if __name__ == '__main__':
+    main()